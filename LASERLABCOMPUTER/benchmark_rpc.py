@@ -0,0 +1,67 @@
+"""
+Round-trip benchmark: XML-RPC vs. the persistent binary RPC, against a local
+stand-in of the laser server (no hardware needed).
+
+    python LASERLABCOMPUTER/benchmark_rpc.py [n_calls] [command_delay_s]
+"""
+import os
+import sys
+import threading
+import time
+import xmlrpc.client
+from xmlrpc.server import SimpleXMLRPCServer
+from socketserver import ThreadingMixIn
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from src.devices.binary_rpc import BinaryRPCServer, BinaryRPCClient
+from src.simulation.hardware_mocks import MockLaserServerInterface
+
+class ThreadedXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    pass
+
+def summarize(name, durations):
+    durations = sorted(durations)
+    n = len(durations)
+    print(f"{name:<28} mean {1e3 * sum(durations) / n:7.3f} ms   "
+          f"p50 {1e3 * durations[n // 2]:7.3f} ms   p99 {1e3 * durations[int(n * 0.99) - 1]:7.3f} ms")
+
+def time_calls(fn, n):
+    durations = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - t0)
+    return durations
+
+def main():
+    n_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    command_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    interface = MockLaserServerInterface(command_delay=command_delay)
+
+    xml_server = ThreadedXMLRPCServer(("127.0.0.1", 0), allow_none=True, logRequests=False)
+    xml_server.register_instance(interface)
+    threading.Thread(target=xml_server.serve_forever, daemon=True).start()
+    binary_server = BinaryRPCServer(interface, "127.0.0.1", 0)
+    binary_server.serve_in_background()
+
+    xml_proxy = xmlrpc.client.ServerProxy(f"http://127.0.0.1:{xml_server.server_address[1]}", allow_none=True)
+    binary = BinaryRPCClient("127.0.0.1", binary_server.server_address[1])
+
+    print(f"{n_calls} qPOS calls, server command delay {command_delay * 1e3:.1f} ms")
+    summarize("XML-RPC qPOS", time_calls(lambda: xml_proxy.qPOS(1), n_calls))
+    summarize("Binary qPOS", time_calls(lambda: binary.qPOS(1), n_calls))
+
+    # Pipelined: all requests in flight before the first response is read
+    t0 = time.perf_counter()
+    futures = [binary.call_async("qPOS", 1) for _ in range(n_calls)]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - t0
+    print(f"{'Binary qPOS, pipelined':<28} {1e3 * elapsed / n_calls:7.3f} ms per call")
+
+    binary.close()
+    binary_server.shutdown()
+    xml_server.shutdown()
+
+if __name__ == "__main__":
+    main()
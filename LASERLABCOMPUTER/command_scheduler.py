@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class CommandScheduler:
+    """
+    Serializes the commands for one device on a worker thread, keeping at least
+    min_gap_s between the end of one command and the start of the next (what the
+    controller needs, instead of a fixed sleep inside every call).
+    Position reads are answered from a cache younger than position_cache_s, and
+    concurrent reads share one queued query. A MOV invalidates the cache once it has
+    run, and a read that started before it is not cached.
+    """
+    def __init__(self, name, min_gap_s=0.1, position_cache_s=0.05):
+        self.name = name
+        self.min_gap_s = min_gap_s
+        self.position_cache_s = position_cache_s
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.position_cache = {} # axis -> (value, timestamp)
+        self.position_pending = {} # axis -> Future of the queued read
+        self.position_generation = {} # axis -> number of moves run, to drop reads from before a move
+        self.last_command_end = 0.0
+
+        self.commands = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.total_latency = 0.0 # Submit to completion
+        self.max_latency = 0.0
+        self.total_service = 0.0 # Time spent in the device call
+        self.min_service = float('inf')
+        self.measured_gap_s = None # Result of the last measure_gap()
+
+        self.running = True
+        self.worker = threading.Thread(target=self._run, name=f"{name}-scheduler", daemon=True)
+        self.worker.start()
+
+    def submit(self, fn, *args):
+        """Queues fn(*args) and returns a Future for its result."""
+        return self._enqueue(fn, args, Future())
+
+    def _enqueue(self, fn, args, future):
+        self.queue.put((fn, args, future, time.time()))
+        return future
+
+    def call(self, fn, *args, timeout=None):
+        return self.submit(fn, *args).result(timeout=timeout)
+
+    def move(self, fn, axis, target, timeout=None):
+        """A command that changes the position: later reads must not come from the cache."""
+        with self.lock:
+            # Reads requested from now on must not share one queued before the move
+            self.position_pending.pop(axis, None)
+        return self.call(self._move_and_invalidate, fn, axis, target, timeout=timeout)
+
+    def _move_and_invalidate(self, fn, axis, target):
+        try:
+            return fn(axis, target)
+        finally:
+            # Runs on the worker after the move, so a read queued before it cannot refill the cache
+            with self.lock:
+                self.position_generation[axis] = self.position_generation.get(axis, 0) + 1
+                self.position_cache.pop(axis, None)
+
+    def read_position(self, fn, axis, timeout=None):
+        """Position of `axis` via fn(axis), from the cache if it is fresh enough."""
+        with self.lock:
+            cached = self.position_cache.get(axis)
+            if cached is not None and time.time() - cached[1] < self.position_cache_s:
+                self.cache_hits += 1
+                return cached[0]
+            future = self.position_pending.get(axis)
+            if future is None:
+                future = Future()
+                self.position_pending[axis] = future
+                self._enqueue(self._read_and_cache, (fn, axis, future), future)
+            else:
+                self.cache_hits += 1 # Shares the read already queued
+        return future.result(timeout=timeout)
+
+    def _read_and_cache(self, fn, axis, future):
+        with self.lock:
+            generation = self.position_generation.get(axis, 0)
+        try:
+            value = fn(axis)
+            with self.lock:
+                if self.position_generation.get(axis, 0) == generation:
+                    self.position_cache[axis] = (value, time.time())
+            return value
+        finally:
+            with self.lock:
+                if self.position_pending.get(axis) is future:
+                    self.position_pending.pop(axis, None)
+
+    def measure_gap(self, fn, *args, candidates=(0.1, 0.05, 0.02, 0.01, 0.005, 0.0), repeats=10, slowdown=1.5):
+        """
+        Probes the device with fn(*args), a harmless query such as qPOS, at decreasing gaps
+        and returns the smallest gap at which no call failed and the mean service time stayed
+        within `slowdown` times the one at the largest gap (a busy controller answers late).
+        Runs as one job on the worker, so no other command interleaves. Does not change
+        min_gap_s. Returns (suggested gap, {gap: (mean service s, errors)}).
+        """
+        def probe():
+            results = {}
+            for gap in sorted(candidates, reverse=True):
+                services, errors = [], 0
+                for _ in range(repeats):
+                    time.sleep(gap)
+                    start = time.time()
+                    try:
+                        fn(*args)
+                    except Exception:
+                        errors += 1
+                    services.append(time.time() - start)
+                results[gap] = (sum(services) / len(services), errors)
+            return results
+
+        results = self.call(probe)
+        baseline = results[max(results)][0]
+        suggested = max(results)
+        for gap in sorted(results, reverse=True):
+            mean_service, errors = results[gap]
+            if errors or mean_service > slowdown * baseline:
+                break
+            suggested = gap
+        with self.lock:
+            self.measured_gap_s = suggested
+        return suggested, results
+
+    def _run(self):
+        while self.running:
+            try:
+                fn, args, future, submitted = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if fn is None:
+                break
+            wait = self.last_command_end + self.min_gap_s - time.time()
+            if wait > 0:
+                time.sleep(wait)
+
+            start = time.time()
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self.errors += 1
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            end = time.time()
+            self.last_command_end = end
+
+            with self.lock:
+                self.commands += 1
+                latency = end - submitted
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                self.total_service += end - start
+                self.min_service = min(self.min_service, end - start)
+
+    def stop(self):
+        self.running = False
+        self.queue.put((None, (), None, 0.0))
+        self.worker.join(timeout=2.0)
+
+    def stats(self):
+        """Queue depth, command counts and latencies (seconds)."""
+        with self.lock:
+            n = self.commands
+            return {
+                "device": self.name,
+                "queue_depth": self.queue.qsize(),
+                "commands": n,
+                "cache_hits": self.cache_hits,
+                "errors": self.errors,
+                "mean_latency_s": self.total_latency / n if n else 0.0,
+                "max_latency_s": self.max_latency,
+                "mean_service_s": self.total_service / n if n else 0.0,
+                "min_service_s": self.min_service if n else 0.0,
+                "min_gap_s": self.min_gap_s,
+                "measured_gap_s": self.measured_gap_s,
+            }
@@ -4,9 +4,11 @@ import threading
 import time
 from xmlrpc.server import SimpleXMLRPCServer
 from socketserver import ThreadingMixIn
-from pylablib.devices import Sirah
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from src.devices.binary_rpc import BinaryRPCServer
+from src.control.server_go_to import GoToRunner
+from command_scheduler import CommandScheduler
 
 SIMULATION = os.environ.get('SIMULATION', '0') == '1'
 
@@ -18,6 +20,7 @@ if SIMULATION:
 else:
     try:
         from pipython import GCSDevice,pitools
+        from pylablib.devices import Sirah
         import epics
     except ImportError as e:
         print(f"[Server] Hardware libraries missing: {e}. Use SIMULATION=1 for testing.")
@@ -28,22 +31,36 @@ COM_PORT = 5
 BAUD_RATE = 19200
 SERVER_IP = '0.0.0.0'
 SERVER_PORT = 8000
+BINARY_PORT = 8001 # Persistent binary RPC (PIGCSDevice transport 'binary')
+# Minimum time between commands per device: the PI controller had a fixed 0.1 s sleep after
+# every command, the Sirah never waited. LASER_MIN_COMMAND_GAP_S overrides both.
+DEVICE_COMMAND_GAP_S = {'pi': 0.1, 'sirah': 0.0}
+MIN_COMMAND_GAP_S = os.environ.get('LASER_MIN_COMMAND_GAP_S')
+MEASURE_GAP = os.environ.get('LASER_MEASURE_GAP', '0') == '1' # Measure the gap at startup and use it
+POSITION_CACHE_S = 0.05 # qPOS answers younger than this are reused
 
 class ThreadedXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
     """Allows the server to handle multiple requests (like non-blocking queries) simultaneously."""
     pass
 
+class ServerWavemeter:
+    """caget() for the go_to loop: the wavemeter PVs read from this machine."""
+    def caget(self, pvname):
+        if SIMULATION:
+            return mock_caget(pvname)
+        return epics.caget(pvname)
+
 class LaserServerInterface:
     def __init__(self):
-        self.lock = threading.Lock()
         self.laser = False
+        self.use_pi = SIMULATION or self.laser # The mock device stands in for the PI controller
+        self.go_to_runner = None
         try:
             print(f"[Server] Initializing {CONTROLLERNAME}...")
             if SIMULATION:
                 self.pi = get_mock_device()
                 self.pi.ConnectRS232(comport=COM_PORT, baudrate=BAUD_RATE)
                 self.pi.SVO(1, 1)
-                return
             elif self.laser:
                 self.pi = GCSDevice(CONTROLLERNAME)
                 self.pi.ConnectRS232(comport=COM_PORT, baudrate=BAUD_RATE)
@@ -58,16 +75,31 @@ class LaserServerInterface:
             print(f"[Server] CRITICAL HARDWARE ERROR: {e}")
             self.pi = None
 
+        # All device I/O goes through one queue that enforces the inter-command gap
+        if MIN_COMMAND_GAP_S is not None:
+            min_gap_s = float(MIN_COMMAND_GAP_S)
+        else:
+            min_gap_s = DEVICE_COMMAND_GAP_S['pi' if self.use_pi else 'sirah']
+        self.scheduler = CommandScheduler(CONTROLLERNAME if self.use_pi else "Sirah",
+                                          min_gap_s=min_gap_s, position_cache_s=POSITION_CACHE_S)
+        if MEASURE_GAP:
+            self.measure_command_gap(apply=True)
+
+    def _device_mov(self, axis, target):
+        if self.use_pi:
+            self.pi.MOV(axis, target)
+        else:
+            self.sirah.ask(f'SCAN:NOW {target}')
+
+    def _device_qpos(self, axis):
+        if self.use_pi:
+            return self.pi.qPOS(axis)[axis]
+        return self.sirah.ask(f'SCAN:NOW?')
+
     def MOV(self, axis, target):
         print(f"[CMD] MOV Axis {axis} -> {target}")
         try:
-            with self.lock:
-                if self.laser:
-                    self.pi.MOV(axis, float(target))
-                    time.sleep(0.1) # Critical: Small pause
-                else:
-                    print()
-                    self.sirah.ask(f'SCAN:NOW {float(target)}')
+            self.scheduler.move(self._device_mov, axis, float(target))
             return True
         except Exception as e:
             print(f"Hardware Error in MOV: {e}")
@@ -75,19 +107,59 @@ class LaserServerInterface:
 
     def qPOS(self, axis):
         try:
-            with self.lock:
-                if self.laser:
-                    val = self.pi.qPOS(axis)[axis]
-                    time.sleep(0.1) # Critical: Small pause after serial talk
-                else:
-                    val = self.sirah.ask(f'SCAN:NOW?')
-            return float(val)   
+            return float(self.scheduler.read_position(self._device_qpos, axis))
         except Exception as e:
             print(f"Hardware Error in qPOS: {e}")
             return 0.0
 
+    def scheduler_stats(self):
+        """Queue depth, command rate and latency of the device queue."""
+        return self.scheduler.stats()
+
+    def measure_command_gap(self, apply=False):
+        """
+        Measures the controller's minimum inter-command gap with qPOS probes (see
+        CommandScheduler.measure_gap). With apply=True the scheduler uses it from now on.
+        """
+        try:
+            gap, results = self.scheduler.measure_gap(self._device_qpos, 1)
+        except Exception as e:
+            print(f"Hardware Error in gap measurement: {e}")
+            return {"measured_gap_s": None, "min_gap_s": self.scheduler.min_gap_s}
+        for probe_gap, (service, errors) in sorted(results.items(), reverse=True):
+            print(f"[Server] Gap {probe_gap * 1000:.0f} ms: service {service * 1000:.2f} ms, {errors} errors")
+        if apply:
+            self.scheduler.min_gap_s = gap
+        print(f"[Server] Measured command gap: {gap * 1000:.0f} ms (in use: {self.scheduler.min_gap_s * 1000:.0f} ms)")
+        return {"measured_gap_s": gap, "min_gap_s": self.scheduler.min_gap_s}
+
+    def _runner(self):
+        if self.go_to_runner is None:
+            self.go_to_runner = GoToRunner(self, ServerWavemeter())
+        return self.go_to_runner
+
+    def go_to(self, target_wn, params=None, timeout_s=120.0):
+        """
+        Closed-loop move to target_wn, run next to the hardware. Blocks until settled,
+        aborted or timed out and returns the final state (see go_to_status).
+        """
+        print(f"[CMD] go_to {target_wn}")
+        try:
+            return self._runner().go_to(target_wn, params, timeout_s)
+        except Exception as e:
+            print(f"Error in go_to: {e}")
+            return {"state": "error", "error": str(e)}
+
+    def go_to_status(self):
+        """Progress of the running go_to (state, wavenumber, position, moves, elapsed_s)."""
+        return self._runner().status()
+
+    def go_to_abort(self):
+        return self._runner().abort()
+
     def close(self):
-        if self.laser:
+        self.scheduler.stop()
+        if self.use_pi:
             self.pi.CloseConnection()
         else:
             self.sirah.close()
@@ -97,11 +169,15 @@ if __name__ == "__main__":
     import socket
     socket.setdefaulttimeout(120)
 
+    interface = LaserServerInterface()
     server = ThreadedXMLRPCServer((SERVER_IP, SERVER_PORT), allow_none=True)
-    server.register_instance(LaserServerInterface())
+    server.register_instance(interface)
+    # Same interface (and command queue) over the binary protocol
+    binary_server = BinaryRPCServer(interface, SERVER_IP, BINARY_PORT)
+    binary_server.serve_in_background()
 
     print(f"==========================================")
-    print(f" LASER SERVER RUNNING ON PORT {SERVER_PORT}")
+    print(f" LASER SERVER RUNNING ON PORT {SERVER_PORT} (binary: {BINARY_PORT})")
     print(f"==========================================")
     try:
         print("Server active. Press Ctrl+C to stop.")
@@ -0,0 +1,226 @@
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+from src.devices.tagger import EVENT_DTYPE, count_new_bunches, empty_batch
+
+# Header slots (int64) at the start of the shared memory block
+HEADER_BYTES = 64
+RELEASED_SEQ = 0 # Segments released by the main process, written only by the consumer
+
+class SharedEventRing:
+    """
+    Ring of fixed-size event segments in a multiprocessing.shared_memory block.
+    The acquisition process fills a segment and announces it over the pipe by sequence number;
+    the main process copies it out and marks it free in the shared header.
+    """
+    def __init__(self, n_segments, segment_rows, name=None, create=False):
+        self.n_segments = int(n_segments)
+        self.segment_rows = int(segment_rows)
+        size = HEADER_BYTES + self.n_segments * self.segment_rows * EVENT_DTYPE.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+
+        self.header = np.ndarray((HEADER_BYTES // 8,), dtype=np.int64, buffer=self.shm.buf)
+        self.segments = np.ndarray((self.n_segments, self.segment_rows), dtype=EVENT_DTYPE,
+                                   buffer=self.shm.buf, offset=HEADER_BYTES)
+        if create:
+            self.header[:] = 0
+
+    def has_free_segment(self, seq):
+        return seq - int(self.header[RELEASED_SEQ]) < self.n_segments
+
+    def write_segment(self, seq, rows):
+        self.segments[seq % self.n_segments, :len(rows)] = rows
+
+    def read_segment(self, seq, n_rows):
+        return self.segments[seq % self.n_segments, :n_rows].copy()
+
+    def release(self, seq):
+        self.header[RELEASED_SEQ] = seq + 1
+
+    def close(self):
+        # Views must be dropped before the buffer can be closed
+        self.header = None
+        self.segments = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def acquisition_main(conn, shm_name, n_segments, segment_rows, simulation_mode, tagger_params, idle_sleep):
+    """
+    Entry point of the acquisition process: reads the tagger, keeps triggers and
+    channel-2 hits, counts them and hands the rows to the main process through shared memory.
+    Only ('block', seq, n_rows, n_events, n_bunches, overflow_rows) counters and
+    ('stopped', stats) go back over the pipe.
+    """
+    ring = SharedEventRing(n_segments, segment_rows, name=shm_name)
+
+    # The card handle cannot cross processes, so the tagger is opened here
+    if simulation_mode:
+        from src.simulation.sim_tagger import MockTagger
+        tagger = MockTagger(initialization_params=tagger_params)
+    else:
+        from src.devices.tagger import Tagger
+        tagger = Tagger(index=0)
+    tagger.start_reading()
+
+    seq = 0
+    last_bunch = -1
+    rows_read = 0
+    overflow_rows = 0
+    try:
+        while True:
+            if conn.poll() and conn.recv()[0] == 'stop':
+                break
+
+            try:
+                batch = tagger.get_data(as_array=True)
+            except Exception as e:
+                print(f"[Acquisition] Error reading tagger: {e}")
+                batch = empty_batch()
+
+            if len(batch) == 0:
+                time.sleep(idle_sleep)
+                continue
+            rows_read += len(batch)
+
+            keep = (batch['channel'] == -1) | (batch['channel'] == 2)
+            rows = batch[keep]
+
+            for offset in range(0, len(rows), ring.segment_rows):
+                chunk = rows[offset:offset + ring.segment_rows]
+                if not ring.has_free_segment(seq):
+                    overflow_rows += len(chunk)
+                    continue
+
+                hit_bunches = chunk['bunch_id'][chunk['channel'] == 2]
+                n_events = len(hit_bunches)
+                n_bunches = int(np.count_nonzero(chunk['channel'] == -1)) + count_new_bunches(hit_bunches, last_bunch)
+                if n_events:
+                    last_bunch = int(hit_bunches[-1])
+
+                ring.write_segment(seq, chunk)
+                conn.send(('block', seq, len(chunk), n_events, n_bunches, overflow_rows))
+                seq += 1
+    finally:
+        tagger.stop()
+        ring.close()
+        conn.send(('stopped', {"segments_sent": seq, "rows_read": rows_read, "overflow_rows": overflow_rows}))
+        conn.close()
+
+
+class AcquisitionProcess:
+    """
+    Runs the tagger read, the trigger/channel-2 filter and the rate counts in a separate
+    process so GUI work in the main interpreter cannot hold the GIL against tagger draining.
+    Bin accounting, block building and save preparation stay in the main process
+    (DAQSystem._process_batch): they need the scanner and the saver.
+    """
+    def __init__(self, simulation_mode=True, tagger_params=None, n_segments=64, segment_rows=65536, idle_sleep=0.0005):
+        self.simulation_mode = simulation_mode
+        self.tagger_params = tagger_params or {}
+        self.n_segments = n_segments
+        self.segment_rows = segment_rows
+        self.idle_sleep = idle_sleep
+
+        self.ring = None
+        self.conn = None
+        self.process = None
+
+        self.segments_received = 0
+        self.rows_received = 0
+        self.overflow_rows = 0
+
+    def start(self):
+        self.ring = SharedEventRing(self.n_segments, self.segment_rows, create=True)
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(
+            target=acquisition_main,
+            args=(child_conn, self.ring.name, self.n_segments, self.segment_rows,
+                  self.simulation_mode, self.tagger_params, self.idle_sleep),
+            daemon=True
+        )
+        self.process.start()
+        print(f"[Acquisition] Started process {self.process.pid} (shared memory: {self.ring.name})")
+
+    def read(self, timeout=0.1):
+        """
+        Collects all announced blocks. Returns (rows, n_events, n_bunches) where the counts
+        were computed in the acquisition process.
+        """
+        try:
+            if self.conn is None or not self.conn.poll(timeout):
+                return empty_batch(), 0, 0
+            messages = []
+            while self.conn.poll():
+                messages.append(self.conn.recv())
+        except (EOFError, OSError):
+            # Acquisition process went away
+            return empty_batch(), 0, 0
+        return self._take_blocks(messages)
+
+    def _take_blocks(self, messages):
+        """Copies the announced blocks out of the ring and frees their segments."""
+        blocks = []
+        n_events = 0
+        n_bunches = 0
+        for msg in messages:
+            if msg[0] == 'stopped':
+                self.overflow_rows = msg[1]["overflow_rows"]
+            if msg[0] != 'block':
+                continue
+            _, seq, n_rows, ev, bu, overflow = msg
+            blocks.append(self.ring.read_segment(seq, n_rows))
+            self.ring.release(seq)
+            n_events += ev
+            n_bunches += bu
+            self.overflow_rows = overflow
+            self.segments_received += 1
+            self.rows_received += n_rows
+
+        if not blocks:
+            return empty_batch(), 0, 0
+        return np.concatenate(blocks), n_events, n_bunches
+
+    def stop(self, timeout=2.0):
+        """
+        Stops the process. Returns (rows, n_events, n_bunches) of the blocks that were
+        still in flight, like read(), so the caller can process them.
+        """
+        if self.process is None:
+            return empty_batch(), 0, 0
+        messages = []
+        try:
+            self.conn.send(('stop',))
+            deadline = time.time() + timeout
+            while time.time() < deadline and self.conn.poll(max(deadline - time.time(), 0)):
+                msg = self.conn.recv()
+                messages.append(msg)
+                if msg[0] == 'stopped':
+                    break
+        except (EOFError, OSError):
+            pass
+        remaining = self._take_blocks(messages)
+
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.ring.close()
+        self.ring.unlink()
+        self.process = None
+        print(f"[Acquisition] Stopped. {self.rows_received} rows received, {self.overflow_rows} rows dropped.")
+        return remaining
+
+    def stats(self):
+        return {
+            "segments_received": self.segments_received,
+            "rows_received": self.rows_received,
+            "overflow_rows": self.overflow_rows,
+            "n_segments": self.n_segments,
+            "segment_rows": self.segment_rows,
+        }
@@ -0,0 +1,72 @@
+import bisect
+import threading
+import numpy as np
+
+class BinStore:
+    """
+    Scan results keyed by wavenumber, kept as parallel lists sorted by wavenumber.
+    A measured bin is matched to an existing one within a tolerance by bisection,
+    and only that entry of the (wn, rate, events, bunches) progress list is touched.
+    """
+    def __init__(self, tolerance=0.01):
+        self.tolerance = tolerance
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.wavenumbers = []
+            self.events = []
+            self.bunches = []
+            self.progress = [] # (wn, rate, events, bunches), same order
+
+    def __len__(self):
+        return len(self.wavenumbers)
+
+    def find(self, wn, tolerance=None):
+        """Index of the stored bin closest to wn within tolerance, or None."""
+        tolerance = self.tolerance if tolerance is None else tolerance
+        i = bisect.bisect_left(self.wavenumbers, wn)
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(self.wavenumbers):
+                distance = abs(self.wavenumbers[j] - wn)
+                if distance <= tolerance and (best is None or distance < abs(self.wavenumbers[best] - wn)):
+                    best = j
+        return best
+
+    def add(self, wn, n_events, n_bunches, tolerance=None):
+        """
+        Adds counts to the bin matching wn, creating it (at wn rounded to 1e-6) if none matches.
+        Returns (bin_wavenumber, total_events, total_bunches) of the updated bin.
+        """
+        with self.lock:
+            i = self.find(wn, tolerance)
+            if i is None:
+                key = round(wn, 6)
+                i = bisect.bisect_left(self.wavenumbers, key)
+                self.wavenumbers.insert(i, key)
+                self.events.insert(i, 0)
+                self.bunches.insert(i, 0)
+                self.progress.insert(i, None)
+
+            self.events[i] += n_events
+            self.bunches[i] += n_bunches
+            ev = self.events[i]
+            bu = self.bunches[i]
+            self.progress[i] = (self.wavenumbers[i], ev / bu if bu > 0 else 0, ev, bu)
+            return self.wavenumbers[i], ev, bu
+
+    def snapshot(self):
+        """Copy of the progress list, sorted by wavenumber."""
+        with self.lock:
+            return list(self.progress)
+
+    def as_arrays(self):
+        """Array view for plotting and snapshots: (wavenumbers, rates, events, bunches)."""
+        with self.lock:
+            wavenumbers = np.array(self.wavenumbers, dtype=np.float64)
+            events = np.array(self.events, dtype=np.int64)
+            bunches = np.array(self.bunches, dtype=np.int64)
+        rates = np.divide(events, bunches, out=np.zeros(len(events)), where=bunches > 0)
+        return wavenumbers, rates, events, bunches
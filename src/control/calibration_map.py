@@ -0,0 +1,113 @@
+import bisect
+import json
+import os
+import threading
+import time
+import numpy as np
+
+class CalibrationMap:
+    """
+    Persistent table of settled (position, wavenumber, timestamp) points, sorted by wavenumber.
+    lookup() interpolates the stage position for a target wavenumber from points that
+    are not older than max_age_s. A new settle replaces the points within merge_wn
+    of it, so entries that drifted get refreshed instead of piling up.
+    `device` identifies the stage the points were taken on; a file saved for another
+    device (e.g. the simulated stage) is neither used nor overwritten.
+    """
+    def __init__(self, filename=None, max_age_s=6 * 3600.0, merge_wn=None, max_extrapolation_wn=1.0, device=None):
+        self.filename = filename
+        self.device = device
+        self.max_age_s = max_age_s
+        self.merge_wn = merge_wn # Default: set by the controller to its tolerance
+        self.max_extrapolation_wn = max_extrapolation_wn
+        self.lock = threading.Lock()
+        self.wavenumbers = []
+        self.positions = []
+        self.timestamps = []
+        if filename:
+            self.load()
+
+    def __len__(self):
+        return len(self.wavenumbers)
+
+    def record(self, position, wavenumber, timestamp=None, merge_wn=None):
+        """Adds a settled point, replacing older points within merge_wn of it."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        merge_wn = merge_wn if merge_wn is not None else (self.merge_wn or 0.0)
+        with self.lock:
+            lo = bisect.bisect_left(self.wavenumbers, wavenumber - merge_wn)
+            hi = bisect.bisect_right(self.wavenumbers, wavenumber + merge_wn)
+            del self.wavenumbers[lo:hi], self.positions[lo:hi], self.timestamps[lo:hi]
+            self.wavenumbers.insert(lo, float(wavenumber))
+            self.positions.insert(lo, float(position))
+            self.timestamps.insert(lo, float(timestamp))
+
+    def expire(self, now=None):
+        """Drops points older than max_age_s. Returns the number removed."""
+        cutoff = (now or time.time()) - self.max_age_s
+        with self.lock:
+            keep = [i for i, t in enumerate(self.timestamps) if t >= cutoff]
+            removed = len(self.timestamps) - len(keep)
+            if removed:
+                self.wavenumbers = [self.wavenumbers[i] for i in keep]
+                self.positions = [self.positions[i] for i in keep]
+                self.timestamps = [self.timestamps[i] for i in keep]
+        return removed
+
+    def lookup(self, wavenumber, now=None):
+        """
+        Interpolated stage position for `wavenumber`, or None if fewer than two valid
+        points exist or the target lies more than max_extrapolation_wn outside them.
+        """
+        self.expire(now)
+        with self.lock:
+            if len(self.wavenumbers) < 2:
+                return None
+            wns = np.array(self.wavenumbers)
+            positions = np.array(self.positions)
+
+        if wavenumber < wns[0] - self.max_extrapolation_wn or wavenumber > wns[-1] + self.max_extrapolation_wn:
+            return None
+        if wns[0] <= wavenumber <= wns[-1]:
+            return float(np.interp(wavenumber, wns, positions))
+        # Just outside the table: extend the outermost segment
+        i = 0 if wavenumber < wns[0] else len(wns) - 2
+        if wns[i + 1] == wns[i]:
+            return float(positions[i])
+        slope = (positions[i + 1] - positions[i]) / (wns[i + 1] - wns[i])
+        return float(positions[i] + slope * (wavenumber - wns[i]))
+
+    def save(self):
+        if not self.filename:
+            return
+        with self.lock:
+            entries = [{"position": p, "wavenumber": w, "timestamp": t}
+                       for p, w, t in zip(self.positions, self.wavenumbers, self.timestamps)]
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+            tmp = self.filename + ".tmp"
+            with open(tmp, 'w') as f:
+                json.dump({"device": self.device, "entries": entries}, f, indent=1)
+            os.replace(tmp, self.filename)
+        except Exception as e:
+            print(f"[Calibration] Failed to save {self.filename}: {e}")
+
+    def load(self):
+        if not self.filename or not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r') as f:
+                table = json.load(f)
+        except Exception as e:
+            print(f"[Calibration] Failed to load {self.filename}: {e}")
+            return
+        stored = table.get("device")
+        if self.device and stored and stored != self.device:
+            print(f"[Calibration] {self.filename} was recorded on {stored}, not {self.device}: not used.")
+            self.filename = None # Keep the other device's table as it is
+            return
+        entries = table.get("entries", [])
+        for entry in sorted(entries, key=lambda e: e["timestamp"]):
+            self.record(entry["position"], entry["wavenumber"], entry["timestamp"], merge_wn=0.0)
+        removed = self.expire()
+        print(f"[Calibration] Loaded {len(self)} points from {self.filename} ({removed} expired).")
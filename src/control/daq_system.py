@@ -8,16 +8,23 @@ import csv
 import json
 
 from src.simulation.sim_tagger import MockTagger
-from src.simulation.sim_sensors import MockMultimeter, MockSpectrometreReader, MockWavenumberReader
+from src.simulation.sim_sensors import MockMultimeter, MockSerialMultimeter, MockSpectrometreReader, MockWavenumberReader
 
 from src.simulation.hardware_mocks import MockPIGCSDevice, MockEpicsClient
 from src.control.laser_controller import LaserController
-from src.control.data_saver import DataSaver
-from src.control.scanner import Scanner
+from src.control.data_saver import (DataSaver, DurabilityPolicy, RECORD_DTYPE, EVENT_RECORD_DTYPE,
+                                   SCAN_BIN_EARLY, SCAN_BIN_OVERSHOOT)
+from src.control.storage import STORAGE_BACKENDS
+from src.control.scanner import Scanner, ROW_EARLY, ROW_IN_BIN
+from src.control.tagger_reader import EventRing, TaggerReader
+from src.control.acquisition_process import AcquisitionProcess
+from src.control.sensor_hub import SensorHub
+from src.utils.tof_histogram import ToFHistogram
 
 # Real Hardware Imports
-from src.devices.tagger import Tagger
+from src.devices.tagger import Tagger, count_new_bunches, new_bunch_flags
 from src.devices.laser import PIGCSDevice, ComClient
+from src.devices.async_io import DeviceIO
 from src.devices.sensors import HP_Multimeter, SpectrometreReader, WavenumberReader, VoltageReader
 
 class DAQSystem:
@@ -31,32 +38,71 @@ class DAQSystem:
         control_config = self.config.get("control_settings", {})
         laser_control_settings = control_config.get("laser", {})
         self.wavechannel = int(laser_control_settings.get("wavechannel", 3))
+        daq_settings = self.config.get("daq_settings", {})
+        self.batch_mode = daq_settings.get("batch_mode", False)
+        # The reader thread delivers batches, so it implies batch mode
+        self.use_reader_thread = daq_settings.get("reader_thread", False)
+        self.batch_mode = self.batch_mode or self.use_reader_thread
+        self.ring_capacity = int(daq_settings.get("ring_capacity", 1 << 20))
+        self.reader_idle_sleep = daq_settings.get("reader_idle_sleep", 0.0005)
+        # Tagger reading and event processing in a separate process (implies batch mode)
+        self.use_acquisition_process = daq_settings.get("acquisition_process", False)
+        self.batch_mode = self.batch_mode or self.use_acquisition_process
+        hist_settings = daq_settings.get("tof_histogram", {})
+        self.tof_hist = ToFHistogram(
+            n_bins=hist_settings.get("bins", 200),
+            tof_min=hist_settings.get("tof_min", 0.0),
+            tof_max=hist_settings.get("tof_max", 0.020),
+            scale=hist_settings.get("scale", "linear")
+        )
 
         simulation_mode = self.config.get("simulation_mode", True)
         print(f"[DAQ] System Model: {'SIMULATION' if simulation_mode else 'REAL HARDWARE'}")
 
+        self.acquisition = None
+        if self.use_acquisition_process:
+            # The acquisition process owns the tagger, it must not be opened here
+            self.acquisition = AcquisitionProcess(
+                simulation_mode=simulation_mode,
+                tagger_params=sim_config.get("tagger", {}),
+                n_segments=daq_settings.get("shm_segments", 64),
+                segment_rows=daq_settings.get("shm_segment_rows", 65536),
+                idle_sleep=self.reader_idle_sleep
+            )
+
+        burst_settings = daq_settings.get("multimeter_burst", {})
+
         if simulation_mode: # Simulation Mode
-            self.tagger = MockTagger(initialization_params=sim_config.get("tagger", {}))
+            self.tagger = None if self.acquisition else MockTagger(initialization_params=sim_config.get("tagger", {}))
 
             self.pi_device = MockPIGCSDevice("Simulated_PI", initialization_params=laser_sim_settings)
 
             self.epics_client = MockEpicsClient(self.pi_device, initialization_params=epics_sim_settings)
 
-            self.multimeter = MockMultimeter("COM1", initialization_params=sim_config.get("multimeter", {}))
+            if burst_settings.get("samples", 0) > 0:
+                # The real driver against a simulated serial port, so the burst path runs too
+                self.multimeter = HP_Multimeter("COM1", serial_device=MockSerialMultimeter(sim_config.get("multimeter", {})))
+            else:
+                self.multimeter = MockMultimeter("COM1", initialization_params=sim_config.get("multimeter", {}))
             self.spec_reader = MockSpectrometreReader()
             self.wave_reader = MockWavenumberReader(source=None)
 
         else: # Real Hardware
             print("Using real ")
-            self.tagger = Tagger(index=0)
+            self.tagger = None if self.acquisition else Tagger(index=0)
 
-            self.pi_device = PIGCSDevice("PI")
+            self.pi_device = PIGCSDevice("PI", initialization_params={
+                "transport": daq_settings.get("laser_transport", "xmlrpc"),
+                "port": daq_settings.get("laser_binary_port", 8001)
+            })
             self.epics_client = ComClient(self.pi_device, initialization_params=epics_sim_settings)
 
             self.hp_multimeter = HP_Multimeter(port="COM16")
-            self.multimeter = VoltageReader(self.hp_multimeter)
-            self.spec_reader = SpectrometreReader()
-            self.wave_reader = WavenumberReader()
+            self.multimeter = self.hp_multimeter # Polled by the sensor hub
+            # EPICS monitor mode: PV callbacks keep the latest values, reads are memory lookups
+            epics_monitor = daq_settings.get("epics_monitor", False)
+            self.spec_reader = SpectrometreReader(monitor=epics_monitor)
+            self.wave_reader = WavenumberReader(monitor=epics_monitor)
 
         if hasattr(self.pi_device, 'SVO'):
              try:
@@ -64,40 +110,111 @@ class DAQSystem:
              except Exception as e:
                  print(f"[DAQ] Warning: Failed to enable Servo: {e}")
 
+        if simulation_mode and laser_control_settings.get("calibration_file"):
+            # Positions learned on the mock stage must not seed the real one
+            root, ext = os.path.splitext(laser_control_settings["calibration_file"])
+            laser_control_settings = dict(laser_control_settings, calibration_file=f"{root}_sim{ext}")
         self.laser = LaserController(self.pi_device, self.epics_client, config=laser_control_settings)
 
         if simulation_mode:
             self.wave_reader.source = self.laser
 
+        # Async device layer: per-device workers with timeouts; the control loop overlaps its reads
+        self.device_io = None
+        if daq_settings.get("async_io", False):
+            self.device_io = DeviceIO(self.pi_device, self.epics_client, self.multimeter,
+                                      timeout=daq_settings.get("io_timeout", 5.0))
+            self.laser.attach_device_io(self.device_io)
+        read_voltage = self.device_io.read_voltage if self.device_io else self.multimeter.getVoltage
+        read_position = self.device_io.read_position if self.device_io else lambda: self.pi_device.qPOS(1)[1]
+
+        # All slow sensor reads go through the hub; DAQ loop, scanner and GUI read its cache
+        hub_settings = daq_settings.get("sensor_hub", {})
+        self.sensor_hub = SensorHub(history=hub_settings.get("history", 1024))
+        # Events get the sensor values at their own timestamp: "linear", "previous" or "off" (latest cached)
+        self.event_interpolation = hub_settings.get("event_interpolation", "linear")
+        # Saver blocks wait up to this long for sensor reads newer than their events
+        self.annotation_holdback = hub_settings.get("annotation_holdback_s", 1.0)
+        self.pending_blocks = deque() # (saver, block, sensors, queued_at)
+        self.burst_settings = burst_settings
+        self.voltage_reader = None # Created on start in burst mode
+        if burst_settings.get("samples", 0) > 0:
+            # Pushed by the burst reader, no poller
+            self.sensor_hub.add_source("voltage", None, None, initial=0.0)
+        else:
+            self.sensor_hub.add_source("voltage", read_voltage,
+                                       hub_settings.get("voltage_interval", 0.5), initial=0.0)
+        self.sensor_hub.add_source("spectrum", self.spec_reader.get_spec,
+                                   hub_settings.get("spectrum_interval", 0.2), initial=0.0)
+        if getattr(self.wave_reader, 'monitor', False):
+            # Pushed by the wavemeter PV monitors, no poller
+            self.sensor_hub.add_source("wavenumbers", None, None, initial=[0.0] * 4)
+            self.wave_reader.add_listener(lambda wns, ts: self.sensor_hub.publish("wavenumbers", wns, ts))
+        else:
+            # The wavemeter PVs update slower than they are polled: a repeated value is not a new reading
+            self.sensor_hub.add_source("wavenumbers", self.wave_reader.get_wavenumbers,
+                                       hub_settings.get("wavemeter_interval", 0.05), initial=[0.0] * 4,
+                                       changes_only=True)
+        # Off by default: nothing reads it, and every poll is a qPOS competing with the control loop
+        position_interval = hub_settings.get("position_interval", 0.0)
+        if position_interval > 0:
+            self.sensor_hub.add_source("laser_position", read_position, position_interval, initial=0.0)
+        self.laser.attach_sensor_hub(self.sensor_hub)
+
         self.saver = None
-        self.scanner = Scanner(self.laser, self.wave_reader, wavechannel=self.wavechannel)
+        self.drift_check_interval = daq_settings.get("drift_check_interval", 0.1)
+        self.pipelined_scan = daq_settings.get("pipelined_scan", False)
+        self.scanner = self._make_scanner()
 
         self.running = False
         self.events_processed = 0
         self.event_timestamps = deque(maxlen=1000)
 
         self.daq_thread = None
+        self.event_ring = None
+        self.tagger_reader = None
 
         self.pending_events_count = 0
         self.pending_bunches_count = 0
         self.rate_lock = threading.Lock()
 
-        self.cached_voltage = 0.0
-        self.cached_wavenumbers = [0.0] * 4
-        self.cached_spectrum = 0.0
-        self.sensor_lock = threading.Lock()
+        # Bunch continuity across batches (batch mode)
+        self.last_rate_bunch = -1
+        self.last_scan_bunch = -1
 
         self.last_scan_filename = None
 
+    def _make_scanner(self):
+        return Scanner(self.laser, self.sensor_hub, wavechannel=self.wavechannel,
+                       drift_check_interval=self.drift_check_interval,
+                       pipelined=self.pipelined_scan)
+
     def start(self):
         if self.running: return
         print("[DAQ] Starting system...")
         self.running = True
-        self.tof_buffer = []
-
-        self.spec_reader.start()
-        self.multimeter.start()
-        self.tagger.start_reading()
+        self.tof_hist.reset()
+
+        self.sensor_hub.start()
+        if self.burst_settings.get("samples", 0) > 0:
+            # Buffered bursts: the meter is configured once and streamed, every reading is pushed
+            self.voltage_reader = VoltageReader(self.multimeter,
+                                                burst_samples=self.burst_settings.get("samples", 10),
+                                                nplc=self.burst_settings.get("nplc", 1),
+                                                line_frequency=self.burst_settings.get("line_frequency", 50.0),
+                                                history=self.burst_settings.get("history", 4096))
+            self.voltage_reader.add_listener(lambda v, ts: self.sensor_hub.publish("voltage", v, ts))
+            self.voltage_reader.start()
+
+        if self.acquisition:
+            self.acquisition.start()
+        else:
+            self.tagger.start_reading()
+
+        if self.use_reader_thread and not self.acquisition:
+            self.event_ring = EventRing(self.ring_capacity)
+            self.tagger_reader = TaggerReader(self.tagger, self.event_ring, idle_sleep=self.reader_idle_sleep)
+            self.tagger_reader.start()
 
         self.daq_thread = threading.Thread(target=self._daq_loop, daemon=True)
         self.daq_thread.start()
@@ -106,6 +223,19 @@ class DAQSystem:
         self.running = False
         print("[DAQ] Stopping system...")
 
+        # The loop exits on its next iteration; wait so it does not read from a closed source,
+        # and so the pending blocks and the saver below are no longer touched by it
+        if self.daq_thread and self.daq_thread is not threading.current_thread():
+            self.daq_thread.join(timeout=2.0)
+            if self.daq_thread.is_alive():
+                print("[DAQ] Warning: DAQ loop did not stop within 2 s.")
+
+        if self.acquisition:
+            # Blocks announced after the loop's last read, processed while the bin is still open
+            data, n_events, n_bunches = self.acquisition.stop()
+            self._process_batch(data, self.sensor_hub.get_voltage(), self.sensor_hub.get_spectrum(),
+                                self.sensor_hub.get_wavenumbers(), (n_events, n_bunches))
+
         if self.scanner.is_alive():
             self.scanner.stop()
 
@@ -113,37 +243,73 @@ class DAQSystem:
             self.laser.stop()
 
         if self.saver:
+            self._release_blocks(force=True)
             self.saver.stop()
             self.saver = None
 
-        self.tagger.stop()
+        if self.tagger_reader:
+            self.tagger_reader.stop()
+            stats = self.tagger_reader.stats()
+            if stats["overflow_rows"]:
+                print(f"[DAQ] Warning: {stats['overflow_rows']} tagger rows dropped on ring overflow.")
+            self.tagger_reader = None
+
+        if not self.acquisition:
+            self.tagger.stop()
+        self.sensor_hub.stop()
+        if self.voltage_reader:
+            self.voltage_reader.stop()
+            self.voltage_reader.join(timeout=2.0)
+            self.voltage_reader = None
         self.spec_reader.stop()
-        self.multimeter.stop()
+        self.wave_reader.stop()
+        if self.device_io:
+            self.device_io.close()
 
-    def start_scan(self, start_wn, end_wn, step, stop_mode, stop_value, loops=1):
+    def start_scan(self, start_wn, end_wn, step, stop_mode, stop_value, loops=1, min_bunches=0, max_bunches=0,
+                   refinement=None):
         if not self.scanner.is_alive() and self.scanner.running == False:
-            self.scanner = Scanner(self.laser, self.wave_reader, wavechannel=self.wavechannel)
+            self.scanner = self._make_scanner()
 
         if self.scanner.is_alive():
              print("[DAQ] Scanner already running.")
              return
 
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename_csv = f"data/scan_{timestamp}.csv"
-        self.last_scan_filename = filename_csv
-        filename_meta = f"data/scan_{timestamp}_meta.json"
-        filename_final = f"data/final_scan_{timestamp}.csv"
+        # Before any file is opened, so invalid parameters leave nothing behind
+        self.scanner.configure(start_wn, end_wn, step, stop_mode, stop_value, loops, self._on_loop_complete,
+                               min_bunches=min_bunches, max_bunches=max_bunches, refinement=refinement)
 
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         data_settings = self.config.get("data_settings", {})
         save_continuously = data_settings.get("save_continuously", True)
+        storage_format = data_settings.get("storage_format", "csv")
+        normalized = data_settings.get("normalized", False)
+        extension = STORAGE_BACKENDS[storage_format].extension
+        durability_settings = data_settings.get("durability", {})
+        durability = DurabilityPolicy(
+            mode=durability_settings.get("mode", "batch"),
+            interval_s=durability_settings.get("interval_s", 5.0),
+            interval_mb=durability_settings.get("interval_mb", 64.0)
+        )
 
-        self.saver = DataSaver(
-            filename_csv,
+        filename_data = f"data/scan_{timestamp}{extension}"
+        self.last_scan_filename = filename_data
+        filename_meta = f"data/scan_{timestamp}_meta.json"
+        filename_final = f"data/final_scan_{timestamp}{extension}"
+        filename_snapshots = f"data/scan_{timestamp}_snapshots{extension}" if normalized else None
+        filename_final_snapshots = f"data/final_scan_{timestamp}_snapshots{extension}" if normalized else None
+
+        saver = DataSaver(
+            filename_data,
             save_continuously=save_continuously,
-            final_filename=filename_final
+            final_filename=filename_final,
+            storage_format=storage_format,
+            durability=durability,
+            snapshot_filename=filename_snapshots,
+            final_snapshot_filename=filename_final_snapshots
         )
-        self.saver.start()
-        print(f"[DAQ] Started logging to {filename_csv} (Continuous: {save_continuously})")
+        saver.start()
+        print(f"[DAQ] Started logging to {filename_data} (Continuous: {save_continuously}, Format: {storage_format}, Durability: {durability.mode})")
 
         metadata = {
             "timestamp": timestamp,
@@ -153,9 +319,18 @@ class DAQSystem:
                 "step_size": step,
                 "stop_mode": stop_mode,
                 "stop_value": stop_value,
+                "min_bunches": min_bunches,
+                "max_bunches": max_bunches,
+                "refinement": refinement or {},
                 "loops": loops,
                 "loops_completed": 0
             },
+            "storage_format": storage_format,
+            "layout": "normalized" if normalized else "flat",
+            "durability": {
+                "mode": durability.mode,
+                "loss_window_bound_s": durability.loss_window_bound(saver.flush_interval)
+            },
             "laser_settings": self.config.get("control_settings", {}).get("laser", {}),
             "simulation_settings": self.config.get("simulation_settings", {})
         }
@@ -170,32 +345,47 @@ class DAQSystem:
         except Exception as e:
             print(f"[DAQ] Failed to save metadata: {e}")
 
-        self.scanner.configure(start_wn, end_wn, step, stop_mode, stop_value, loops, self._on_loop_complete)
         self.scanner.reset()
-        self.tof_buffer = [] # Clear buffer on new scan
+        self.tof_hist.reset() # Clear histogram on new scan
 
         self.scanner.start()
+        # Publish the saver only once the scanner thread is alive, otherwise the DAQ loop
+        # may take the scan as finished and stop the saver right away
+        self.saver = saver
 
     def _daq_loop(self):
         previous_bunch=-1
         previous_bunch2=-1
         while self.running:
-            if self.saver and not self.scanner.running:
+            if self.saver and not self.scanner.is_alive():
                 print("[DAQ] Scan finished. Stopping saver.")
+                self._release_blocks(force=True)
                 self.saver.stop()
                 self.saver = None
 
-            data = self.tagger.get_data()
+            rate_counts = None
+            if self.acquisition:
+                # Rows and their rate counts come from the acquisition process
+                data, n_events, n_bunches = self.acquisition.read(timeout=self.config["gui_settings"]["refresh_rate_ms"]/1000)
+                rate_counts = (n_events, n_bunches)
+            elif self.tagger_reader:
+                # Blocks until the reader delivers data, no fixed sleep needed
+                data = self.event_ring.read(timeout=self.config["gui_settings"]["refresh_rate_ms"]/1000)
+            else:
+                data = self.tagger.get_data(as_array=self.batch_mode)
             # print(data)
 
-            with self.sensor_lock:
-                self.cached_voltage = self.multimeter.get_voltage()
-                self.cached_spectrum = self.spec_reader.spectrum
-                self.cached_wavenumbers = self.wave_reader.get_wavenumbers()
+            # Cached sensor values, no I/O in the event path
+            current_voltage = self.sensor_hub.get_voltage()
+            current_spec = self.sensor_hub.get_spectrum()
+            current_wns = self.sensor_hub.get_wavenumbers()
 
-                current_voltage = self.cached_voltage
-                current_spec = self.cached_spectrum
-                current_wns = self.cached_wavenumbers
+            if self.batch_mode:
+                self._process_batch(data, current_voltage, current_spec, current_wns, rate_counts)
+                self._release_blocks()
+                data = []
+            loop_snapshot = None # (saver, snapshot_id) shared by this iteration's events
+            loop_tofs = {} # scan bin index -> ToFs, added to the histogram once per iteration
 
             for entry in data:
                 channel = entry[2]
@@ -220,7 +410,7 @@ class DAQSystem:
                                 'scan_bin_index': self.scanner.current_bin_index,
                                 'bunch_id': entry[0] # Global ID from tagger
                             }
-                             self.saver.add_event(record)
+                             loop_snapshot = self._save_record(self.saver, record, loop_snapshot)
 
                 if channel == 2:
                     self.events_processed += 1
@@ -245,14 +435,171 @@ class DAQSystem:
                     }
 
                     if self.scanner.is_accumulating and self.saver:
-                        self.saver.add_event(record)
-                        self.tof_buffer.append(entry[3]) # entry[3] is ToF
+                        loop_snapshot = self._save_record(self.saver, record, loop_snapshot)
+                        loop_tofs.setdefault(self.scanner.current_bin_index, []).append(entry[3]) # entry[3] is ToF
                         self.scanner.report_event(is_bunch=False)
                         if entry[0] != previous_bunch2:
                             self.scanner.report_event(is_bunch=True)
                             previous_bunch2 = entry[0]
 
-            time.sleep(self.config["gui_settings"]["refresh_rate_ms"]/1000)
+            for bin_index, tofs in loop_tofs.items():
+                self.tof_hist.add(tofs, bin_index)
+
+            if not (self.tagger_reader or self.acquisition):
+                time.sleep(self.config["gui_settings"]["refresh_rate_ms"]/1000)
+
+    def _process_batch(self, batch, voltage, spectrum, wavenumbers, rate_counts=None):
+        """
+        Array version of the per-entry loop in _daq_loop for an EVENT_DTYPE batch.
+        Counters are updated once per batch and the saver receives one block (one per bin
+        the rows were booked to in the normalized layout). Rows the scanner did not count
+        towards the current bin are saved with SCAN_BIN_EARLY / SCAN_BIN_OVERSHOOT.
+        rate_counts: (events, bunches) already counted upstream, e.g. by the acquisition process.
+        """
+        if len(batch) == 0:
+            return
+
+        is_trigger = batch['channel'] == -1
+        is_hit = batch['channel'] == 2
+        hit_bunches = batch['bunch_id'][is_hit]
+        n_triggers = int(np.count_nonzero(is_trigger))
+        n_hits = len(hit_bunches)
+
+        if rate_counts is None:
+            rate_counts = (n_hits, n_triggers + count_new_bunches(hit_bunches, self.last_rate_bunch))
+        if n_hits:
+            self.last_rate_bunch = hit_bunches[-1]
+            self.events_processed += n_hits
+            self.event_timestamps.extend(hit_bunches[-self.event_timestamps.maxlen:].tolist())
+
+        with self.rate_lock:
+            self.pending_events_count += rate_counts[0]
+            self.pending_bunches_count += rate_counts[1]
+
+        if not self.scanner.is_accumulating:
+            return
+
+        # Empty bunches always count towards the bin, events only while saving
+        saver = self.saver
+        row_events = np.zeros(len(batch), dtype=np.int64)
+        row_bunches = is_trigger.astype(np.int64)
+        if saver:
+            row_events[is_hit] = 1
+            row_bunches[is_hit] = new_bunch_flags(hit_bunches, self.last_scan_bunch)
+            if n_hits:
+                self.last_scan_bunch = hit_bunches[-1]
+        bin_index = self.scanner.current_bin_index
+        placement = self.scanner.report_rows(batch['timestamp'], row_events, row_bunches)
+        if not saver:
+            return
+
+        # Rows are saved with the bin they were counted in, the others are marked
+        saved = is_trigger | is_hit
+        rows = batch[saved]
+        row_bins = np.select([placement[saved] == ROW_IN_BIN, placement[saved] == ROW_EARLY],
+                             [bin_index, SCAN_BIN_EARLY], SCAN_BIN_OVERSHOOT)
+        cached = {
+            'voltage': voltage,
+            'spectrum_peak': spectrum if spectrum is not None else np.nan,
+            'wavemeter_wn': wavenumbers[int(self.wavechannel-1)],
+            'laser_target_wn': self.scanner.current_wavenumber,
+        }
+        if saver.normalized:
+            # One snapshot per bin the batch's rows went to (added on release), events only reference it
+            groups = [row_bins == label for label in (SCAN_BIN_EARLY, bin_index, SCAN_BIN_OVERSHOOT)]
+        else:
+            groups = [np.ones(len(rows), dtype=bool)]
+        for group in groups:
+            if not np.any(group):
+                continue
+            group_rows = rows[group]
+            sensors = dict(cached, timestamp=float(group_rows['timestamp'][-1]),
+                           scan_bin_index=int(row_bins[group][-1]))
+            if saver.normalized:
+                block = np.empty(len(group_rows), dtype=EVENT_RECORD_DTYPE)
+            else:
+                block = np.empty(len(group_rows), dtype=RECORD_DTYPE)
+                for name, value in sensors.items():
+                    block[name] = value
+                block['timestamp'] = group_rows['timestamp']
+                block['scan_bin_index'] = row_bins[group]
+            block['bunch_id'] = group_rows['bunch_id']
+            block['channel'] = group_rows['channel']
+            block['tof'] = group_rows['tof']
+            # The sensor values are filled in once the sensors have been read past these events
+            self.pending_blocks.append((saver, block, sensors, time.time()))
+        self._release_blocks()
+
+        self.tof_hist.add(batch['tof'][is_hit & (placement == ROW_IN_BIN)], bin_index)
+
+    def _release_blocks(self, force=False):
+        """
+        Hands pending blocks to their saver with the sensor values at their event times.
+        A block is released once every sensor with history has a read at or after its last
+        event, after annotation_holdback_s at the latest, or right away when forced
+        (scan end) or with event_interpolation "off".
+        """
+        if not self.pending_blocks:
+            return
+        read_times = [self.sensor_hub.get_sample(name)[1] for name in ("voltage", "spectrum", "wavenumbers")]
+        read_times = [t for t in read_times if t > 0]
+        sensors_read_until = min(read_times) if read_times else float('inf')
+        now = time.time()
+        while self.pending_blocks:
+            saver, block, sensors, queued_at = self.pending_blocks[0]
+            if not (force or self.event_interpolation == "off"
+                    or sensors['timestamp'] <= sensors_read_until
+                    or now - queued_at >= self.annotation_holdback):
+                break # Blocks are in event order, the rest is newer
+            self.pending_blocks.popleft()
+            if saver.normalized:
+                # The snapshot values are taken at the snapshot timestamp
+                sensors.update({name: float(values[0]) for name, values in
+                                self._sensor_values_at(np.array([sensors['timestamp']]), sensors).items()})
+                block['snapshot_id'] = saver.add_snapshot(sensors)
+            else:
+                for name, values in self._sensor_values_at(block['timestamp'], sensors).items():
+                    block[name] = values
+            saver.add_block(block)
+
+    def _sensor_values_at(self, timestamps, cached):
+        """
+        Voltage, spectrum and wavenumber at each event timestamp from the sensor hub history,
+        instead of the values cached when the batch was read. Sources without history keep
+        their cached value. Empty with event_interpolation "off".
+        """
+        if self.event_interpolation == "off":
+            return {}
+        method = self.event_interpolation
+        return {
+            'voltage': self.sensor_hub.interpolate("voltage", timestamps, method=method,
+                                                   default=cached['voltage']),
+            'spectrum_peak': self.sensor_hub.interpolate("spectrum", timestamps, method=method,
+                                                         default=cached['spectrum_peak']),
+            'wavemeter_wn': self.sensor_hub.interpolate("wavenumbers", timestamps, int(self.wavechannel-1),
+                                                        method=method, default=cached['wavemeter_wn']),
+        }
+
+    def _save_record(self, saver, record, loop_snapshot):
+        """
+        Hands a flat record to the saver. In the normalized layout the sensor values are
+        stored once per loop iteration as a snapshot and the event row references it.
+        Returns the (saver, snapshot_id) to reuse for the rest of the iteration.
+        """
+        if record['spectrum_peak'] is None:
+            record['spectrum_peak'] = np.nan # Written as "nan" so the file stays numeric
+        if not saver.normalized:
+            saver.add_event(record)
+            return loop_snapshot
+        if loop_snapshot is None or loop_snapshot[0] is not saver:
+            loop_snapshot = (saver, saver.add_snapshot(record))
+        saver.add_event({
+            'bunch_id': record['bunch_id'],
+            'channel': record['channel'],
+            'tof': record['tof'],
+            'snapshot_id': loop_snapshot[1]
+        })
+        return loop_snapshot
 
     def update_laser_settings(self, new_config: dict):
         """
@@ -284,17 +631,26 @@ class DAQSystem:
             return events / bunches
         return 0.0
 
+    def get_reader_stats(self):
+        """Ring fill and overflow counters of the tagger reader or acquisition process, or None if neither is used."""
+        if self.tagger_reader:
+            return self.tagger_reader.stats()
+        if self.acquisition:
+            return self.acquisition.stats()
+        return None
+
     def get_latest_voltage(self):
-        with self.sensor_lock:
-            return self.cached_voltage
+        return self.sensor_hub.get_voltage()
 
     def get_latest_wavenumbers(self):
-        with self.sensor_lock:
-            return list(self.cached_wavenumbers)
+        return self.sensor_hub.get_wavenumbers()
 
     def get_latest_spectrum(self):
-        with self.sensor_lock:
-            return self.cached_spectrum
+        return self.sensor_hub.get_spectrum()
+
+    def get_sensor_stats(self):
+        """Age, read and error counts of every sensor source."""
+        return self.sensor_hub.stats()
 
     def _on_loop_complete(self, loop_number):
         """Callback from scanner when a loop finishes."""
@@ -1,17 +1,147 @@
 import threading
 import time
 import queue
-import csv
 import os
+import shutil
+import numpy as np
+
+from src.control.storage import make_storage
+
+# Column layout of a saved event row. Blocks passed to add_block use this dtype.
+RECORD_DTYPE = np.dtype([
+    ('timestamp', np.float64),
+    ('channel', np.int8),
+    ('tof', np.float64),
+    ('voltage', np.float64),
+    ('spectrum_peak', np.float64),
+    ('wavemeter_wn', np.float64),
+    ('laser_target_wn', np.float64),
+    ('scan_bin_index', np.int64),
+    ('bunch_id', np.int64),
+])
+
+# scan_bin_index of rows acquired while no bin was counting them: before the bin
+# started (laser still moving) or after its stop condition was met
+SCAN_BIN_EARLY = -1
+SCAN_BIN_OVERSHOOT = -2
+
+# Normalized layout: compact event rows that reference a sensor snapshot by id,
+# and the snapshots themselves (one per acquisition loop instead of one per event).
+EVENT_RECORD_DTYPE = np.dtype([
+    ('bunch_id', np.int64),
+    ('channel', np.int8),
+    ('tof', np.float64),
+    ('snapshot_id', np.int64),
+])
+
+SNAPSHOT_DTYPE = np.dtype([
+    ('snapshot_id', np.int64),
+    ('timestamp', np.float64),
+    ('voltage', np.float64),
+    ('spectrum_peak', np.float64),
+    ('wavemeter_wn', np.float64),
+    ('laser_target_wn', np.float64),
+    ('scan_bin_index', np.int64),
+])
+
+class DurabilityPolicy:
+    """
+    Decides when the saver fsyncs its file and accounts for what that costs.
+      'batch':    fsync after every batch flush
+      'interval': fsync once interval_s seconds have passed or interval_mb of unsynced data accumulated
+      'stop':     fsync only when the saver stops
+    Data that is written but not yet fsynced is lost on a power cut or OS crash;
+    the policy tracks the oldest such data to report the worst-case loss window.
+    """
+    MODES = ('batch', 'interval', 'stop')
+
+    def __init__(self, mode='batch', interval_s=5.0, interval_mb=64.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown durability mode '{mode}'. Options: {self.MODES}")
+        self.mode = mode
+        self.interval_s = interval_s
+        self.interval_bytes = interval_mb * 1024 * 1024
+
+        self.last_sync = time.time()
+        self.oldest_unsynced = None # Time the oldest unsynced write was made
+        self.unsynced_bytes = 0
+
+        self.fsync_count = 0
+        self.fsync_time_total = 0.0
+        self.fsync_time_max = 0.0
+        self.max_loss_window = 0.0 # Largest observed age of unsynced data
+
+    def record_write(self, n_bytes, now):
+        if n_bytes <= 0:
+            return
+        if self.oldest_unsynced is None:
+            self.oldest_unsynced = now
+        self.unsynced_bytes += n_bytes
+
+    def should_sync(self, now):
+        if self.oldest_unsynced is None:
+            return False
+        if self.mode == 'batch':
+            return True
+        if self.mode == 'interval':
+            return (now - self.last_sync >= self.interval_s) or (self.unsynced_bytes >= self.interval_bytes)
+        return False
+
+    def record_sync(self, duration, now):
+        if self.oldest_unsynced is not None:
+            self.max_loss_window = max(self.max_loss_window, now - self.oldest_unsynced)
+        self.oldest_unsynced = None
+        self.unsynced_bytes = 0
+        self.last_sync = now
+        self.fsync_count += 1
+        self.fsync_time_total += duration
+        self.fsync_time_max = max(self.fsync_time_max, duration)
+
+    def loss_window_bound(self, flush_interval):
+        """Configured worst-case loss window in seconds (None = until stop)."""
+        if self.mode == 'batch':
+            return flush_interval
+        if self.mode == 'interval':
+            return flush_interval + self.interval_s
+        return None
+
+    def stats(self, now=None):
+        now = now or time.time()
+        current = now - self.oldest_unsynced if self.oldest_unsynced is not None else 0.0
+        return {
+            "mode": self.mode,
+            "fsync_count": self.fsync_count,
+            "fsync_time_total_s": self.fsync_time_total,
+            "fsync_time_max_s": self.fsync_time_max,
+            "unsynced_bytes": self.unsynced_bytes,
+            "current_loss_window_s": current,
+            "max_loss_window_s": max(self.max_loss_window, current),
+        }
+
 
 class DataSaver(threading.Thread):
-    def __init__(self, filename, flush_interval=1.0, batch_size=1000, save_continuously=True, final_filename=None):
+    def __init__(self, filename, flush_interval=1.0, batch_size=1000, save_continuously=True, final_filename=None,
+                 storage_format="csv", durability=None, snapshot_filename=None, final_snapshot_filename=None):
+        """
+        snapshot_filename: if given, the saver writes the normalized layout: event rows
+        (EVENT_RECORD_DTYPE) to filename and sensor snapshots (SNAPSHOT_DTYPE) to snapshot_filename.
+        """
         super().__init__()
         self.filename = filename
+        self.snapshot_filename = snapshot_filename
+        self.final_snapshot_filename = final_snapshot_filename
+        self.normalized = snapshot_filename is not None
+        self.event_dtype = EVENT_RECORD_DTYPE if self.normalized else RECORD_DTYPE
+        self.next_snapshot_id = 0
+        self.storage_format = storage_format
+        self.durability = durability or DurabilityPolicy()
         self.flush_interval = flush_interval
         self.batch_size = batch_size
         self.save_continuously = save_continuously
         self.final_filename = final_filename
+        self.files = {"events": (filename, final_filename, self.event_dtype)}
+        if self.normalized:
+            self.files["snapshots"] = (snapshot_filename, final_snapshot_filename, SNAPSHOT_DTYPE)
         self.queue = queue.Queue()
         self.stop_event = threading.Event()
 
@@ -20,10 +150,6 @@ class DataSaver(threading.Thread):
         if self.final_filename:
             os.makedirs(os.path.dirname(os.path.abspath(final_filename)), exist_ok=True)
 
-        self.headers_written = False
-        if self.save_continuously and os.path.exists(filename):
-            self.headers_written = True
-
         # Register atexit handler to ensure data is saved on crash/exit
         import atexit
         atexit.register(self.stop)
@@ -31,21 +157,44 @@ class DataSaver(threading.Thread):
     def add_event(self, data: dict):
         """
         Add a dictionary of data to the save queue.
-        Keys must remain consistent for CSV writing.
+        Keys must remain consistent for CSV writing and match RECORD_DTYPE for binary storage.
         """
         self.queue.put(data)
 
+    def add_block(self, block: np.ndarray):
+        """
+        Add a structured array of rows (RECORD_DTYPE, or EVENT_RECORD_DTYPE when normalized)
+        to the save queue in one call.
+        """
+        if len(block):
+            self.queue.put(block)
+
+    def add_snapshot(self, values: dict):
+        """
+        Queue a sensor snapshot (SNAPSHOT_DTYPE fields except snapshot_id) and return
+        the id that event rows should reference. Only used in the normalized layout.
+        """
+        snapshot_id = self.next_snapshot_id
+        self.next_snapshot_id += 1
+        record = {'snapshot_id': snapshot_id}
+        for name in SNAPSHOT_DTYPE.names[1:]:
+            record[name] = values[name]
+        self.queue.put(("snapshots", record))
+        return snapshot_id
+
     def run(self):
         last_flush = time.time()
-        buffer = []
-        self.full_buffer = [] # Buffer for non-continuous mode or final backup if needed
+        buffers = {stream: [] for stream in self.files}
+        buffered_rows = 0
+        self.full_buffer = {stream: [] for stream in self.files} # Buffer for non-continuous mode
 
         try:
-            f = None
-            writer = None
+            storages = {}
 
             if self.save_continuously:
-                 f = open(self.filename, 'a', newline='')
+                for stream, (filename, _, dtype) in self.files.items():
+                    storages[stream] = make_storage(self.storage_format, filename, dtype)
+                    storages[stream].open()
 
             while True:
                 # We continue looping if we haven't stopped OR if there's still data
@@ -56,73 +205,59 @@ class DataSaver(threading.Thread):
                     # If stopped, don't wait long (effectively drain mode)
                     timeout = 0.1 if not self.stop_event.is_set() else 0.0
                     item = self.queue.get(timeout=timeout)
-                    buffer.append(item)
+                    stream = "events"
+                    if isinstance(item, tuple):
+                        stream, item = item
+                    buffers[stream].append(item)
+                    buffered_rows += len(item) if isinstance(item, np.ndarray) else 1
                     if not self.save_continuously:
-                        self.full_buffer.append(item)
+                        self.full_buffer[stream].append(item)
                 except queue.Empty:
-                    continue
+                    # Idle: still honour the flush interval and the durability policy
+                    pass
 
                 # Periodic or Batch Flush
                 now = time.time()
-                if (now - last_flush >= self.flush_interval) or (len(buffer) >= self.batch_size):
-                    if buffer and self.save_continuously and f:
-                        if writer is None:
-                            keys = buffer[0].keys()
-                            writer = csv.DictWriter(f, fieldnames=keys)
-                            if not self.headers_written:
-                                writer.writeheader()
-                                self.headers_written = True
-                                f.flush()
-                                os.fsync(f.fileno())
-
-                        writer.writerows(buffer)
-                        f.flush()
-                        os.fsync(f.fileno()) # Force write to disk for safety
-                        buffer = []
+                if (now - last_flush >= self.flush_interval) or (buffered_rows >= self.batch_size):
+                    for stream, storage in storages.items():
+                        if buffers[stream]:
+                            self._write(storage, buffers[stream])
+                            buffers[stream] = []
+                    buffered_rows = 0
                     last_flush = now
 
+                if storages and self.durability.should_sync(now):
+                    self._sync(storages)
+
             # Final flush on exit
-            if buffer and self.save_continuously and f:
-                    if writer is None and buffer:
-                        keys = buffer[0].keys()
-                        writer = csv.DictWriter(f, fieldnames=keys)
-                        if not self.headers_written:
-                            writer.writeheader()
-                            self.headers_written = True
-
-                    if writer:
-                        writer.writerows(buffer)
-                        f.flush()
-                        os.fsync(f.fileno())
-
-            if f:
-                f.close()
+            if storages:
+                for stream, storage in storages.items():
+                    if buffers[stream]:
+                        self._write(storage, buffers[stream])
+                self._sync(storages)
+                for storage in storages.values():
+                    storage.close()
+                self._report_durability()
 
             # --- FINAL BACKUP SAVE ---
-            if self.final_filename:
-                print(f"[Saver] Writing final backup to {self.final_filename}...")
+            for stream, (filename, final_filename, dtype) in self.files.items():
+                if not final_filename:
+                    continue
+                print(f"[Saver] Writing final backup to {final_filename}...")
                 if self.save_continuously:
                     # Robust copy
-                    import shutil
                     # Ensure source exists (it should, as we just closed it)
-                    if os.path.exists(self.filename):
-                         shutil.copy2(self.filename, self.final_filename)
+                    if os.path.exists(filename):
+                         shutil.copy2(filename, final_filename)
                     else:
-                         print(f"[Saver] Warning: Source file {self.filename} missing for backup copy.")
+                         print(f"[Saver] Warning: Source file {filename} missing for backup copy.")
                 else:
                     # Write from memory buffer
-                    if self.full_buffer:
-                        keys = self.full_buffer[0].keys()
-                        with open(self.final_filename, 'w', newline='') as ff:
-                            writer = csv.DictWriter(ff, fieldnames=keys)
-                            writer.writeheader()
-                            writer.writerows(self.full_buffer)
-                            ff.flush()
-                            os.fsync(ff.fileno())
-                    else:
-                        # Create empty file
-                        with open(self.final_filename, 'w') as ff:
-                            pass
+                    final_storage = make_storage(self.storage_format, final_filename, dtype)
+                    final_storage.open()
+                    final_storage.write(self.full_buffer[stream])
+                    final_storage.sync()
+                    final_storage.close()
 
         except Exception as e:
             print(f"[Saver] Critical Error: {e}")
@@ -131,6 +266,35 @@ class DataSaver(threading.Thread):
         finally:
             print(f"[Saver] Thread stopped. File: {self.filename}")
 
+    def _write(self, storage, items):
+        """Hands items to the OS; they are durable only after the next sync."""
+        before = storage.position()
+        storage.write(items)
+        storage.flush()
+        self.durability.record_write(storage.position() - before, time.time())
+
+    def _sync(self, storages):
+        t0 = time.time()
+        for storage in storages.values():
+            storage.sync()
+        t1 = time.time()
+        self.durability.record_sync(t1 - t0, t1)
+
+    def get_stats(self):
+        """fsync cost and data-loss window of the running saver."""
+        stats = self.durability.stats()
+        stats["loss_window_bound_s"] = self.durability.loss_window_bound(self.flush_interval)
+        stats["queue_size"] = self.queue.qsize()
+        return stats
+
+    def _report_durability(self):
+        stats = self.get_stats()
+        bound = stats["loss_window_bound_s"]
+        bound_text = f"{bound:.1f} s" if bound is not None else "until stop"
+        print(f"[Saver] Durability '{stats['mode']}': {stats['fsync_count']} fsyncs, "
+              f"{stats['fsync_time_total_s']:.3f} s total (max {stats['fsync_time_max_s']:.3f} s), "
+              f"worst observed loss window {stats['max_loss_window_s']:.2f} s (bound: {bound_text}).")
+
     def stop(self):
         if not self.stop_event.is_set():
             self.stop_event.set()
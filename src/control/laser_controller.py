@@ -1,17 +1,25 @@
 import time
 import threading
 from src.simulation.hardware_mocks import MockPIGCSDevice, MockEpicsClient
+from src.control.wavenumber_model import WavenumberModel
+from src.control.calibration_map import CalibrationMap
+from src.control.settle_detector import SettleDetector
 
 class LaserController:
     """
     Encapsulates the logic from the 'go_to' script to control the Laser
     via a PI Stage and a Wavemeter (EPICS).
     """
-    def __init__(self, pi_device, epics_client, axis=1, config: dict = {}):
+    def __init__(self, pi_device, epics_client, axis=1, config: dict = {}, sensor_hub=None):
         self.device = pi_device
         self.epics = epics_client
         self.axis = axis
         self.config = config
+        # If set, wavenumbers come from the hub cache instead of one EPICS read per call
+        self.sensor_hub = sensor_hub
+        self.hub_wavemeter_index = 0 # 'LaserLab:wavenumber_1'
+        # Optional async device layer (DeviceIO): overlaps the position read with the wavemeter read
+        self.device_io = None
 
         # Control Loop Parameters
         self.tolerance = self.config.get("tolerance", 0.01)
@@ -20,6 +28,31 @@ class LaserController:
         self.poll_interval = self.config.get("poll_interval", 1)
         self.coarse_approach_thresh = self.config.get("coarse_approach_threshold", 1.0)
         self.required_stable_samples = self.config.get("required_stable_samples", 4)
+        # Settled once the in-tolerance readings are statistically inside the band (see SettleDetector)
+        self.settle = SettleDetector(
+            self.tolerance,
+            min_samples=self.required_stable_samples,
+            window=self.config.get("settle_window", 20),
+            n_sigma=self.config.get("settle_n_sigma", 2.0)
+        )
+        self.last_settle = None # Metrics of the last settled target
+        # 'fixed': step_fine/step_coarse walk; 'model': jump using the learned wavenumber(position) model;
+        # 'server': the laser server runs the loop (device.go_to), see _server_go_to
+        self.control_mode = self.config.get("control_mode", "fixed")
+        self.model = WavenumberModel(
+            history=self.config.get("model_history", 20),
+            max_jump=self.config.get("model_max_jump", 1.0),
+            initial_slope=self.config.get("model_initial_slope")
+        )
+        self.last_direction = 0 # Sign of the last stage move, for the hysteresis-aware model
+        # Settled (position, wavenumber) points from earlier moves and scans, for the first MOV of a target
+        self.calibration = CalibrationMap(
+            filename=self.config.get("calibration_file"),
+            max_age_s=self.config.get("calibration_max_age_s", 6 * 3600.0),
+            merge_wn=self.tolerance,
+            device=type(pi_device).__name__
+        )
+        self.moves_last_target = 0
 
         self.target_wn = 0.0
         self.current_wn = 0.0
@@ -42,7 +75,15 @@ class LaserController:
             self.poll_interval = self.config.get("poll_interval", 0.5)
             self.coarse_approach_thresh = self.config.get("coarse_approach_threshold", 1.0)
             self.required_stable_samples = self.config.get("required_stable_samples", 4)
-            print(f"[LaserController] Config updated: tol={self.tolerance}, poll={self.poll_interval}")
+            self.settle.tolerance = self.tolerance
+            self.settle.min_samples = max(int(self.required_stable_samples), 1)
+            self.settle.n_sigma = self.config.get("settle_n_sigma", 2.0)
+            self.control_mode = self.config.get("control_mode", "fixed")
+            self.model.max_jump = self.config.get("model_max_jump", 1.0)
+            self.model.initial_slope = self.config.get("model_initial_slope")
+            self.calibration.max_age_s = self.config.get("calibration_max_age_s", 6 * 3600.0)
+            self.calibration.merge_wn = self.tolerance
+            print(f"[LaserController] Config updated: tol={self.tolerance}, poll={self.poll_interval}, mode={self.control_mode}")
 
     def set_wavenumber(self, target_wn):
         """
@@ -60,12 +101,55 @@ class LaserController:
                  self.control_thread = threading.Thread(target=self._control_loop, daemon=True)
                  self.control_thread.start()
 
-    def get_wavenumber(self):
+    def attach_sensor_hub(self, sensor_hub):
+        self.sensor_hub = sensor_hub
+
+    def attach_device_io(self, device_io):
+        self.device_io = device_io
+
+    def read_position(self):
+        return self.device.qPOS(self.axis)[self.axis]
+
+    def read_state(self, newer_than=None):
+        """
+        (wavenumber, reading time, position) after a move. With a DeviceIO the stage
+        query runs while the wavemeter reading is awaited, instead of after it.
         """
-        Returns the current wavenumber from EPICS.
+        if self.device_io is None:
+            wn, read_time = self.get_wavenumber_sample(newer_than)
+            return wn, read_time, self.read_position()
+        position = self.device_io.submit(self.device_io.laser.qpos(self.axis))
+        wn, read_time = self.get_wavenumber_sample(newer_than)
+        return wn, read_time, position.result(timeout=self.device_io.timeout + 1.0)
+
+    def read_wavenumber(self):
+        """
+        Reads the current wavenumber directly from EPICS (one round trip).
         """
         return float(self.epics.caget('LaserLab:wavenumber_1'))
 
+    def get_wavenumber(self, newer_than=None):
+        """
+        Returns the current wavenumber, from the sensor hub cache if one is attached.
+        newer_than: epoch seconds; waits (up to 2 poll intervals) for a reading taken after it.
+        """
+        return self.get_wavenumber_sample(newer_than)[0]
+
+    def get_wavenumber_sample(self, newer_than=None):
+        """
+        Like get_wavenumber, but returns (wavenumber, timestamp of the reading).
+        If no newer reading arrived in time, the timestamp is <= newer_than.
+        """
+        if self.sensor_hub is None:
+            return self.read_wavenumber(), time.time()
+        if newer_than is not None:
+            wns, timestamp = self.sensor_hub.wait_for_update("wavenumbers", newer_than, timeout=2 * self.poll_interval)
+        else:
+            wns, timestamp = self.sensor_hub.get_sample("wavenumbers")
+        if not wns:
+            return self.read_wavenumber(), time.time()
+        return float(wns[self.hub_wavemeter_index]), timestamp
+
     def is_stable(self, tolerance=None):
         """
         Returns True if current WN is within tolerance of Target WN.
@@ -78,6 +162,11 @@ class LaserController:
 
     def stop(self):
         self.stop_event.set()
+        if self.control_mode == "server" and self.is_moving and hasattr(self.device, 'go_to_abort'):
+            try:
+                self.device.go_to_abort()
+            except Exception as e:
+                print(f"[LaserController] go_to_abort failed: {e}")
         if self.control_thread:
             self.control_thread.join()
 
@@ -86,6 +175,9 @@ class LaserController:
         The logic from 'go_to' script.
         """
         print(f"[LaserController] Starting control loop for Target {self.target_wn}")
+        if self.control_mode == "server" and hasattr(self.device, 'go_to'):
+            self._server_go_to()
+            return
         # try:
         # 1. Read initial state
         wn = self.get_wavenumber()
@@ -95,53 +187,150 @@ class LaserController:
         prevpos = position
 
         # 2. Control Loop with Stability Check
-        stable_samples = 0
-        REQUIRED_STABLE_SAMPLES = self.required_stable_samples
+        started = time.time()
+        self.settle.reset(self.target_wn, started)
+        self.last_settle = None
 
+        last_read = None # Only use wavemeter readings taken after this (last move or last sample)
+        dwelling = False # In band, collecting settle samples; the position hardly matters then
+        last_sample = None # Last wavenumber given to the settle detector while dwelling
+        self.moves_last_target = 0
+
+        # First MOV from the calibration table, if it covers the target
+        if abs(wn - self.target_wn) >= self.tolerance:
+            calibrated = self.calibration.lookup(self.target_wn)
+            if calibrated is not None and not self.stop_event.is_set():
+                print(f"[LaserController] Calibrated move to {calibrated:.5f} for {self.target_wn}")
+                self.device.MOV(self.axis, calibrated)
+                self.moves_last_target += 1
+                if abs(calibrated - position) > 1e-9:
+                    self.last_direction = 1 if calibrated > position else -1
+                if not self.stop_event.wait(0.5):
+                    last_read = time.time()
+
+        model_error = None # Error before the last model move, to detect a move that did not help
         while not self.stop_event.is_set():
-            wn = self.get_wavenumber()
-            position = self.device.qPOS(self.axis)[self.axis]
+            # After a move, only trust a wavemeter reading taken once the move settled
+            if dwelling:
+                wn, read_time = self.get_wavenumber_sample(newer_than=last_read)
+                position = None
+            else:
+                wn, read_time, position = self.read_state(newer_than=last_read)
+            if self.settle.target != self.target_wn:
+                started = time.time() # Target changed while running
+                self.settle.reset(self.target_wn, started)
+            if last_read is not None and read_time <= last_read and abs(wn - self.target_wn) < self.tolerance:
+                continue # Dwelling and the wavemeter has not updated yet: do not count a reading twice
+            if dwelling and wn == last_sample:
+                # Same value again: a poll of a PV that has not updated, not a new measurement
+                last_read = read_time
+                if self.sensor_hub is None and self.stop_event.wait(self.poll_interval):
+                    break
+                continue
+            if position is None:
+                position = self.read_position()
+            if self.last_direction:
+                self.model.observe(position, wn, self.last_direction)
 
             # Check stability
             if abs(wn - self.target_wn) < self.tolerance:
-                stable_samples += 1
-                print(f"[LaserController] Within tolerance.. stabilizing ({stable_samples}/{REQUIRED_STABLE_SAMPLES})")
-                if stable_samples >= REQUIRED_STABLE_SAMPLES:
+                if self.settle.add(wn, read_time):
+                    self.last_settle = self.settle.metrics()
+                    self.last_settle["moves"] = self.moves_last_target
+                    print(f"[LaserController] Settled after {self.last_settle['time_to_settle_s']:.2f} s "
+                          f"({self.last_settle['samples']} samples, std {self.last_settle['std_wn']:.5f})")
+                    # Remember where this wavenumber was found (refreshes nearby entries)
+                    self.calibration.record(position, wn)
+                    self.calibration.save()
                     break
 
-                # Small dwell time to ensure we aren't just flying by
-                time.sleep(0.5)
+                # Next sample: the hub waits for a fresh reading, a direct read paces itself
+                last_read = read_time
+                last_sample = wn
+                dwelling = True
+                if self.sensor_hub is None and self.stop_event.wait(self.poll_interval):
+                    break
                 continue
             else:
-                stable_samples = 0 # Reset if we pop out of tolerance
+                self.settle.add(wn) # Out of band: drops the samples collected so far
+                dwelling = False
+                last_sample = None
 
             step_fine = self.step_fine
             step_coarse = self.step_coarse
-            move_cmd = 0.0
+            move_cmd = None
 
-            if wn >= self.target_wn + self.tolerance:
-                # WN is too high, need to decrease it (decrease position)
-                if abs((position - step_fine) - prevpos) > 1e-9:
-                    move_cmd = position - step_fine
+            error = abs(wn - self.target_wn)
+            if self.control_mode == "model":
+                if model_error is not None and error >= model_error:
+                    # The last predicted move did not get closer: take one fixed step instead
+                    model_error = None
                 else:
-                    move_cmd = position + step_coarse
-            else:
-                # WN is too low, need to increase it (increase position)
-                if abs((position + step_fine) - prevpos) > 1e-9:
-                    move_cmd = position + step_fine
+                    move_cmd = self.model.predict_position(position, wn, self.target_wn, self.last_direction)
+                    model_error = error if move_cmd is not None else None
+
+            if move_cmd is None:
+                if wn >= self.target_wn + self.tolerance:
+                    # WN is too high, need to decrease it (decrease position)
+                    if abs((position - step_fine) - prevpos) > 1e-9:
+                        move_cmd = position - step_fine
+                    else:
+                        move_cmd = position + step_coarse
                 else:
-                    move_cmd = position - step_coarse
+                    # WN is too low, need to increase it (increase position)
+                    if abs((position + step_fine) - prevpos) > 1e-9:
+                        move_cmd = position + step_fine
+                    else:
+                        move_cmd = position - step_coarse
 
             self.device.MOV(self.axis, move_cmd)
+            self.moves_last_target += 1
+            if abs(move_cmd - position) > 1e-9:
+                self.last_direction = 1 if move_cmd > position else -1
 
             # Wait for move to complete (or user stop)
             if self.stop_event.wait(0.5):
                 break
+            last_read = time.time()
 
             prevpos = position
             print(f"[LaserController] Pos: {position:.5f}, WN: {wn:.4f} (Target: {self.target_wn})")
 
-        print(f"[LaserController] Target reached or stopped. Final WN: {wn:.4f}")
+        print(f"[LaserController] Target reached or stopped. Final WN: {wn:.4f} after {self.moves_last_target} moves ({self.control_mode})")
+        self.is_moving = False
+
+    # Settings forwarded to the server-side loop (client paths such as calibration_file stay local)
+    SERVER_PARAM_KEYS = ("tolerance", "step_fine", "step_coarse", "poll_interval", "coarse_approach_threshold",
+                         "required_stable_samples", "settle_window", "settle_n_sigma",
+                         "model_history", "model_max_jump", "model_initial_slope")
+
+    def _server_go_to(self):
+        """
+        'server' mode: one blocking go_to call per target instead of a qPOS and a
+        wavemeter round trip per step. Repeats if the target changed meanwhile.
+        """
+        params = {k: self.config[k] for k in self.SERVER_PARAM_KEYS if self.config.get(k) is not None}
+        params["control_mode"] = self.config.get("server_control_mode", "fixed")
+        timeout_s = self.config.get("server_timeout_s", 120.0)
+
+        result = {}
+        while not self.stop_event.is_set():
+            target = self.target_wn
+            started = time.time()
+            try:
+                result = self.device.go_to(target, params, timeout_s)
+            except Exception as e:
+                print(f"[LaserController] Server go_to failed: {e}")
+                result = {"state": "error", "error": str(e)}
+            self.moves_last_target = result.get("moves", 0)
+            if result.get("state") == "settled":
+                self.last_settle = dict(result.get("settle") or {})
+                self.last_settle.update({"time_to_settle_s": time.time() - started, "moves": self.moves_last_target})
+            if self.target_wn == target or result.get("state") != "settled":
+                break
+
+        print(f"[LaserController] Server go_to {result.get('state')}: WN {result.get('wavenumber', 0.0):.4f} "
+              f"after {self.moves_last_target} moves")
         self.is_moving = False
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import math
+import numpy as np
+
+def refine_scan_points(wavenumbers, events, bunches, fine_step, rate_threshold=None,
+                       gradient_threshold=None, significance=3.0, min_spacing=0.0):
+    """
+    Wavenumbers of the extra bins to measure after a coarse pass (sorted array).
+
+    A bin is interesting if its rate (events/bunch) is at least rate_threshold, or
+    if its events exceed the baseline (median rate) by `significance` Poisson sigmas.
+    An interval between two bins is interesting if the rate changes by more than
+    gradient_threshold per cm^-1 across it. Interesting intervals, and both intervals
+    next to an interesting bin, are filled at fine_step. Criteria set to None are off.
+    Points closer than min_spacing to a measured bin are dropped, since they would be
+    merged into it.
+    """
+    wavenumbers = np.asarray(wavenumbers, dtype=np.float64)
+    events = np.asarray(events, dtype=np.float64)
+    bunches = np.asarray(bunches, dtype=np.float64)
+    if len(wavenumbers) < 2 or fine_step <= 0:
+        return np.array([], dtype=np.float64)
+
+    order = np.argsort(wavenumbers)
+    wavenumbers, events, bunches = wavenumbers[order], events[order], bunches[order]
+    measured = bunches > 0
+    rates = np.divide(events, bunches, out=np.zeros(len(events)), where=measured)
+
+    interesting = np.zeros(len(wavenumbers), dtype=bool)
+    if rate_threshold is not None:
+        interesting |= measured & (rates >= rate_threshold)
+    if significance is not None and measured.any():
+        baseline = np.median(rates[measured])
+        expected = baseline * bunches
+        z = (events - expected) / np.sqrt(np.maximum(expected, 1.0))
+        interesting |= measured & (z >= significance)
+
+    # Interval j lies between bin j and bin j+1
+    intervals = interesting[:-1] | interesting[1:]
+    if gradient_threshold is not None:
+        gradient = np.abs(np.diff(rates)) / np.maximum(np.diff(wavenumbers), 1e-12)
+        intervals |= measured[:-1] & measured[1:] & (gradient >= gradient_threshold)
+
+    points = []
+    for j in np.flatnonzero(intervals):
+        lo, hi = wavenumbers[j], wavenumbers[j + 1]
+        n = math.ceil((hi - lo) / fine_step - 1e-9)
+        points.extend(lo + k * (hi - lo) / n for k in range(1, n))
+
+    points = np.unique(np.round(points, 6))
+    if min_spacing > 0 and len(points):
+        nearest = np.min(np.abs(points[:, None] - wavenumbers[None, :]), axis=1)
+        points = points[nearest > min_spacing]
+    return points
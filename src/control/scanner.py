@@ -1,9 +1,18 @@
+import math
 import time
 import threading
 import numpy as np
 
+from src.control.bin_store import BinStore
+from src.control.scan_refinement import refine_scan_points
+
+# Placement of a row reported with report_rows
+ROW_EARLY = -1 # Acquired before the bin started (laser still moving)
+ROW_IN_BIN = 0
+ROW_LATE = 1 # After the bin's stop condition was met, or while paused
+
 class Scanner(threading.Thread):
-    def __init__(self, laser, wavemeter=None, wavechannel=3):
+    def __init__(self, laser, wavemeter=None, wavechannel=3, drift_check_interval=0.1, pipelined=False):
         super().__init__()
         self.laser = laser
         self.wavemeter = wavemeter
@@ -18,8 +27,14 @@ class Scanner(threading.Thread):
         self.start_wn = 16666.0
         self.end_wn = 16680.0
         self.step_size = 0.5 # cm^-1
-        self.stop_mode = 'events' # 'events' or 'time'
-        self.stop_value = 100 # count or seconds
+        self.stop_mode = 'events' # 'events', 'bunches', 'time' or 'precision'
+        self.stop_value = 100 # count, seconds, or target relative uncertainty of events/bunch
+        self.min_bunches = 0 # Precision mode: never stop a bin before this many bunches
+        self.max_bunches = 0 # Precision mode: always stop here (0 = no limit)
+        # Adaptive mode: passes, fine_step, rate_threshold, gradient_threshold, significance
+        # (see refine_scan_points); no passes means a plain grid scan
+        self.refinement = {}
+        self.refine_passes_done = 0
         self.loops = 1
         self.loop_callback = None
 
@@ -30,24 +45,51 @@ class Scanner(threading.Thread):
         self.accumulated_bunches = 0
         self.is_accumulating = False # If True, we are in the "Measurement" phase
 
-        # Aggregation
-        self.histogram = {} # wn -> [accum_events, accum_bunches]
-
-        # Results (for plotting)
-        self.scan_progress = []
+        # Bin counters are shared with the DAQ thread, guarded by count_lock
+        self.count_lock = threading.Lock()
+        self.bin_start_time = 0.0
+        self.target_reached = False
+        self.overshoot_events = 0 # Counts that arrived after the stop condition was met
+        self.overshoot_bunches = 0
+        self.early_events = 0 # Counts acquired before the bin started (laser still moving)
+        self.early_bunches = 0
+
+        # Set by the data pipeline when the bin target is reached, and by stop/pause/resume,
+        # so the accumulation loop sleeps instead of polling
+        self.wake_event = threading.Event()
+        self.drift_check_interval = drift_check_interval # Seconds between laser.is_stable() checks
+
+        # Pipelined: the next target goes to the laser as soon as a bin's stop condition is met,
+        # before the bin is booked, instead of after it
+        self.pipelined = pipelined
+        self.plan = [] # (loop_idx, bin_idx, wavenumber), see build_plan()
+        self.move_issued_at = 0.0
+
+        # Aggregation and results (for plotting), sorted by wavenumber
+        self.bins = BinStore()
 
         # Timing for ETA
         self.start_timestamp = 0
         self.bins_completed = 0
+        self.last_bin_completed_at = 0.0
         self.total_bins = 0
         self.bin_paused_duration = 0.0
 
+        # Dead time per bin: seconds from the laser move until it reported stable
+        self.settle_times = [] # (target_wn, seconds)
+        self.settle_time_total = 0.0
+
     def set_wavemeter(self, wavemeter):
         self.wavemeter = wavemeter
 
     def set_wavechannel(self, channel):
         self.wavechannel = channel
 
+    @property
+    def scan_progress(self):
+        """List of (wavenumber, rate, total_events, total_bunches), sorted by wavenumber."""
+        return self.bins.snapshot()
+
     def wavenumber_to_wavelength(self, wn):
         """Converts cm^-1 to nm."""
         if wn == 0: return 0.0
@@ -55,16 +97,24 @@ class Scanner(threading.Thread):
 
     def reset(self):
         """Clears scan progress and internal counters."""
-        self.scan_progress = []
-        self.histogram = {}
+        self.bins.clear()
         self.bins_completed = 0
+        self.last_bin_completed_at = 0.0
         self.start_timestamp = 0
         self.accumulated_events = 0
         self.accumulated_bunches = 0
         self.current_bin_index = 0
+        self.settle_times = []
+        self.settle_time_total = 0.0
         print("[Scanner] Scan history reset.")
 
-    def configure(self, start_wn, end_wn, step, stop_mode='events', stop_value=100, loops=1, loop_callback=None):
+    def configure(self, start_wn, end_wn, step, stop_mode='events', stop_value=100, loops=1, loop_callback=None,
+                  min_bunches=0, max_bunches=0, refinement=None):
+        if stop_mode == 'precision' and not 0 < stop_value < 1:
+            raise ValueError(f"Precision mode needs a relative uncertainty between 0 and 1, got {stop_value}.")
+        self.refinement = refinement or {}
+        self.min_bunches = min_bunches
+        self.max_bunches = max_bunches
         self.start_wn = start_wn
         self.end_wn = end_wn
         self.step_size = step
@@ -73,170 +123,179 @@ class Scanner(threading.Thread):
         self.loops = loops
         self.loop_callback = loop_callback
 
+    def build_plan(self):
+        """
+        Scan order for all loops, computed up front: list of (loop_idx, bin_idx, wavenumber).
+        Odd loops run backwards.
+        """
+        plan = []
+        forward = self.end_wn >= self.start_wn
+        for loop_idx in range(self.loops):
+            if loop_idx % 2 == 1:
+                loop_start, loop_end = self.end_wn, self.start_wn
+                sign = -1 if forward else 1
+            else:
+                loop_start, loop_end = self.start_wn, self.end_wn
+                sign = 1 if forward else -1
+
+            # Buffer to include endpoint
+            wavenumbers = np.arange(loop_start, loop_end + sign * self.step_size * 0.1, sign * self.step_size)
+            plan.extend((loop_idx, i, wn) for i, wn in enumerate(wavenumbers))
+        return plan
+
+    def _extend_plan_with_refinement(self, loop_idx):
+        """Appends one refinement pass (see refine_scan_points) to the plan. Returns the number of bins added."""
+        self.refine_passes_done += 1
+        wavenumbers, _, events, bunches = self.bins.as_arrays()
+        points = refine_scan_points(
+            wavenumbers, events, bunches,
+            fine_step=self.refinement.get("fine_step", self.step_size / 4),
+            rate_threshold=self.refinement.get("rate_threshold"),
+            gradient_threshold=self.refinement.get("gradient_threshold"),
+            significance=self.refinement.get("significance", 3.0),
+            min_spacing=getattr(self.laser, 'tolerance', 0.01)
+        )
+        if self.end_wn < self.start_wn:
+            points = points[::-1]
+        self.plan.extend((loop_idx, i, wn) for i, wn in enumerate(points))
+        self.total_bins += len(points)
+        print(f"[Scanner] Refinement pass {self.refine_passes_done}: {len(points)} extra bins.")
+        return len(points)
+
+    def _move_laser(self, wn):
+        self.move_issued_at = time.time()
+        if hasattr(self.laser, 'set_wavenumber'):
+            self.laser.set_wavenumber(wn)
+        else:
+            target_nm = self.wavenumber_to_wavelength(wn)
+            self.laser.set_wavelength(target_nm)
+
     def run(self):
         self.running = True
         self.start_timestamp = time.time()
 
         try:
-            # Initialize Histogram if not already
-            if not self.histogram:
-                 self.histogram = {}
-
-            # Loop logic
-            for loop_idx in range(self.loops):
+            self.plan = self.build_plan()
+            self.total_bins = len(self.plan)
+            self.refine_passes_done = 0
+            prepared_wn = None # Target already sent to the laser at the end of the previous bin
+
+            step = 0
+            while step < len(self.plan):
+                loop_idx, i, wn = self.plan[step]
                 if self.stop_event.is_set(): break
-
-                print(f"[Scanner] Starting Loop {loop_idx + 1}/{self.loops}...")
-
-                # Determine direction for this loop
-                forward = self.end_wn >= self.start_wn
-                is_reversed = (loop_idx % 2 == 1)
-
-                if is_reversed:
-                    loop_start = self.end_wn
-                    loop_end = self.start_wn
-                    sign = -1 if forward else 1
-                else:
-                    loop_start = self.start_wn
-                    loop_end = self.end_wn
-                    sign = 1 if forward else -1
-
-                # Buffer to include endpoint
-                wavenumbers = np.arange(loop_start, loop_end + sign * self.step_size * 0.1, sign * self.step_size)
-
-                # Initial estimate (only first time)
-                if loop_idx == 0:
-                     self.total_bins = len(wavenumbers) * self.loops
-
-                print(f"[Scanner] Generating {len(wavenumbers)} bins. {loop_start} -> {loop_end}")
-
-                for i, wn in enumerate(wavenumbers):
+                if i == 0 and loop_idx < self.loops:
+                    n_bins = sum(1 for entry in self.plan if entry[0] == loop_idx)
+                    print(f"[Scanner] Starting Loop {loop_idx + 1}/{self.loops}...")
+                    print(f"[Scanner] Generating {n_bins} bins. {wn} -> {self.plan[step + n_bins - 1][2]}")
+                self.wait_for_pause()
+
+                self.current_bin_index = i
+                self.current_wavenumber = wn
+
+                # Bin Loop (Retry logic for drift)
+                bin_complete = False
+                while True:
                     if self.stop_event.is_set(): break
-                    self.wait_for_pause()
 
-                    self.current_bin_index = i
-                    self.current_wavenumber = wn
-
-                    # Bin Loop (Retry logic for drift)
+                    # 1. Move Laser (unless it was sent ahead while the last bin was wrapped up)
+                    if prepared_wn != wn:
+                        self._move_laser(wn)
+                    prepared_wn = None
+
+                    # 2. Wait for stable
+                    while not self.laser.is_stable():
+                        if self.stop_event.is_set(): return
+                        self.wait_for_pause()
+                        time.sleep(0.05)
+                    self._record_settle(wn, time.time() - self.move_issued_at)
+
+                    # 3. Start Accumulating
+                    self.bin_measured_wns = []
+                    self.bin_paused_duration = 0.0
+                    start_time = self._start_accumulating()
+
+                    # Accumulation Loop: woken by report_batch when the target is reached,
+                    # otherwise only for drift checks and the end of a time bin
+                    next_drift_check = start_time + self.drift_check_interval
                     while True:
-                        if self.stop_event.is_set(): break
-
-                        # 1. Move Laser
-                        if hasattr(self.laser, 'set_wavenumber'):
-                            self.laser.set_wavenumber(wn)
-                        else:
-                            target_nm = self.wavenumber_to_wavelength(wn)
-                            self.laser.set_wavelength(target_nm)
-
-                        # 2. Wait for stable
-                        while not self.laser.is_stable():
-                            if self.stop_event.is_set(): return
-                            self.wait_for_pause()
-                            time.sleep(0.05)
-
-                        # 3. Start Accumulating
-                        self.accumulated_events = 0
-                        self.accumulated_bunches = 0
-                        self.bin_measured_wns = []
-                        self.is_accumulating = True
-                        self.bin_paused_duration = 0.0
-
-                        start_time = time.time()
-                        bin_complete = False
-
-                        # Accumulation Loop
-                        while True:
-                            if self.stop_event.is_set(): return
-                            self.wait_for_pause()
+                        self.wake_event.clear()
+                        if self.stop_event.is_set(): return
+                        self.wait_for_pause()
+
+                        # Check Stop Condition
+                        now = time.time()
+                        if self._check_stop_condition(now):
+                            bin_complete = True
+                            break
 
+                        if now >= next_drift_check:
                             if not self.laser.is_stable():
                                 print(f"[Scanner] Drift detected at {wn:.4f}. Resetting bin...")
-                                self.is_accumulating = False
+                                self._stop_accumulating()
                                 break
 
-                            # Check Stop Condition
-                            current_time = time.time()
-                            current_duration = current_time - start_time - self.bin_paused_duration
-
-                            if self.stop_mode == 'events':
-                                if self.accumulated_events >= self.stop_value:
-                                    bin_complete = True
-                                    break
-                            elif self.stop_mode == 'bunches':
-                                if self.accumulated_bunches >= self.stop_value:
-                                    bin_complete = True
-                                    break
-                            elif self.stop_mode == 'time':
-                                if current_duration >= self.stop_value:
-                                    bin_complete = True
-                                    break
-
                             # Track Measured Wavenumber
                             if self.wavemeter:
                                 wn_status = self.wavemeter.get_wavenumbers()
                                 if wn_status and wn_status[int(self.wavechannel-1)] > 0:
                                     self.bin_measured_wns.append(wn_status[int(self.wavechannel-1)])
 
-                            time.sleep(0.005)
-
-                        if bin_complete:
-                            break # Break Retry Loop -> Bin Done
-
-                    # --- Post Bin Processing ---
-                    self.is_accumulating = False
+                            next_drift_check = time.time() + self.drift_check_interval
 
-                    total_elapsed = time.time() - start_time
-                    effective_duration = total_elapsed - self.bin_paused_duration
+                        timeout = next_drift_check - time.time()
+                        if self.stop_mode == 'time':
+                            remaining = self.stop_value - (time.time() - start_time - self.bin_paused_duration)
+                            timeout = min(timeout, remaining)
+                        self.wake_event.wait(max(timeout, 0.0))
 
-                    # Determine Tolerance (default to 0.01 if not found)
-                    tolerance = 0.01
-                    if hasattr(self.laser, 'tolerance'):
-                        tolerance = self.laser.tolerance
+                    if bin_complete:
+                        break # Break Retry Loop -> Bin Done
 
-                    # Fuzzy Bin Matching
-                    wn_key = None
-                    # sorted_keys = sorted(self.histogram.keys()) # Optimization: Could just check neighbours if sorted
-                    # But straightforward iteration is safer for now.
+                if not bin_complete:
+                    break
 
-                    for existing_key in self.histogram.keys():
-                        if abs(wn - existing_key) <= tolerance:
-                            wn_key = existing_key
-                            break
-
-                    if wn_key is None:
-                        wn_key = round(wn, 6) # Fallback to new bin (rounded)
+                # --- Post Bin Processing ---
+                self._stop_accumulating()
 
-                    # Update Histogram
-                    if wn_key not in self.histogram:
-                        self.histogram[wn_key] = [0, 0]
+                # Send the next target right away, so the move overlaps the bookkeeping below
+                if self.pipelined and step + 1 < len(self.plan):
+                    prepared_wn = self.plan[step + 1][2]
+                    self._move_laser(prepared_wn)
 
-                    self.histogram[wn_key][0] += self.accumulated_events
-                    self.histogram[wn_key][1] += self.accumulated_bunches
+                total_elapsed = time.time() - start_time
+                effective_duration = total_elapsed - self.bin_paused_duration
 
-                    # Recalculate Scan Progress (Sorted List) for GUI
-                    sorted_wns = sorted(self.histogram.keys())
-                    new_progress = []
-                    for w in sorted_wns:
-                        ev = self.histogram[w][0]
-                        bu = self.histogram[w][1]
-                        r = ev / bu if bu > 0 else 0
-                        new_progress.append((w, r, ev, bu))
+                # Determine Tolerance (default to 0.01 if not found)
+                tolerance = 0.01
+                if hasattr(self.laser, 'tolerance'):
+                    tolerance = self.laser.tolerance
 
-                    self.scan_progress = new_progress
+                # Fuzzy Bin Matching: merge into an existing bin within tolerance
+                wn_key, total_events, _ = self.bins.add(wn, self.accumulated_events, self.accumulated_bunches, tolerance)
 
-                    rate_bin = self.accumulated_events / self.accumulated_bunches if self.accumulated_bunches > 0 else 0
-                    print(f"[Scanner] Bin {wn:.6f} done. {self.accumulated_events} ev ({rate_bin:.4f} epb). Total: {self.histogram[wn_key][0]} ev.")
+                rate_bin = self.accumulated_events / self.accumulated_bunches if self.accumulated_bunches > 0 else 0
+                print(f"[Scanner] Bin {wn:.6f} done. {self.accumulated_events} ev ({rate_bin:.4f} epb). Total: {total_events} ev. "
+                      f"Overshoot: {self.overshoot_events} ev / {self.overshoot_bunches} bunches. "
+                      f"Before bin start: {self.early_events} ev / {self.early_bunches} bunches.")
 
-                    self.bins_completed += 1
+                self.bins_completed += 1
+                self.last_bin_completed_at = time.time()
 
                 # End of Loop Iteration
-                if self.loop_callback:
+                last_of_loop = step + 1 == len(self.plan) or self.plan[step + 1][0] != loop_idx
+                if last_of_loop and self.loop_callback:
                     print(f"[Scanner] Loop {loop_idx+1} complete. Saving snapshot...")
                     try:
                         self.loop_callback(loop_idx + 1)
                     except Exception as e:
                         print(f"Callback error: {e}")
 
+                # Adaptive mode: once the plan is done, append finer bins where the signal is
+                if step + 1 == len(self.plan) and self.refine_passes_done < self.refinement.get("passes", 0):
+                    self._extend_plan_with_refinement(loop_idx + 1)
+                step += 1
+
             print("[Scanner] Scan complete.")
         except Exception as e:
             print(f"[Scanner] Crashed: {e}")
@@ -245,6 +304,15 @@ class Scanner(threading.Thread):
         finally:
             self.running = False
 
+    def _record_settle(self, wn, seconds):
+        self.settle_times.append((wn, seconds))
+        self.settle_time_total += seconds
+        detail = ""
+        metrics = getattr(self.laser, 'last_settle', None)
+        if metrics:
+            detail = f" ({metrics['samples']} samples, {metrics['moves']} moves)"
+        print(f"[Scanner] Laser settled at {wn:.4f} after {seconds:.2f} s{detail}")
+
     def wait_for_pause(self):
         """Blocks if pause_event is cleared."""
         if not self.pause_event.is_set():
@@ -255,35 +323,47 @@ class Scanner(threading.Thread):
 
     def pause(self):
         self.pause_event.clear()
+        self.wake_event.set()
         print("[Scanner] Paused.")
 
     def resume(self):
         self.pause_event.set()
+        self.wake_event.set()
         print("[Scanner] Resumed.")
 
     def get_status(self):
         """Returns a dict with current status for GUI."""
-        elapsed = time.time() - self.start_timestamp if self.start_timestamp > 0 else 0
-
+        # Average over the finished bins only (start to last completion), so data-dependent
+        # bin lengths (precision mode) are accounted for; the current bin only counts with
+        # the part still missing
+        bin_progress = self.bin_progress()
         eta_seconds = 0
-        if self.bins_completed > 0:
-            avg_per_bin = elapsed / self.bins_completed
+        if self.bins_completed > 0 and self.start_timestamp > 0:
+            avg_per_bin = (self.last_bin_completed_at - self.start_timestamp) / self.bins_completed
             remaining_bins = self.total_bins - self.bins_completed
-            eta_seconds = remaining_bins * avg_per_bin
+            eta_seconds = max(remaining_bins - bin_progress, 0.0) * avg_per_bin
 
         measured_wn = 0.0
+        measured_wn_age = None
         if self.wavemeter:
             wns = self.wavemeter.get_wavenumbers()
             if wns and wns[int(self.wavechannel-1)] > 0:
                 measured_wn = wns[int(self.wavechannel-1)]
+            if hasattr(self.wavemeter, 'age'):
+                # Cached reading (sensor hub): report how old it is
+                measured_wn_age = self.wavemeter.age("wavenumbers")
 
         return {
             "target_wn": self.current_wavenumber,
             "measured_wn": measured_wn,
+            "measured_wn_age": measured_wn_age,
             "stop_mode": self.stop_mode,
             "stop_value": self.stop_value,
             "accumulated": self.accumulated_events,
             "accumulated_bunches": self.accumulated_bunches,
+            "bin_progress": bin_progress,
+            "min_bunches": self.min_bunches,
+            "max_bunches": self.max_bunches,
             "bin_index": self.current_bin_index,
             "total_bins": self.total_bins,
             "bins_completed": self.bins_completed,
@@ -291,11 +371,19 @@ class Scanner(threading.Thread):
             "is_paused": not self.pause_event.is_set(),
             "is_stopping": self.stop_event.is_set(),
             "is_running": self.running,
-            "is_accumulating": self.is_accumulating
+            "is_accumulating": self.is_accumulating,
+            "overshoot_events": self.overshoot_events,
+            "overshoot_bunches": self.overshoot_bunches,
+            "early_events": self.early_events,
+            "early_bunches": self.early_bunches,
+            "last_settle_s": self.settle_times[-1][1] if self.settle_times else None,
+            "mean_settle_s": self.settle_time_total / len(self.settle_times) if self.settle_times else None,
+            "settle_time_total_s": self.settle_time_total
         }
 
     def stop(self, wait=True):
         self.stop_event.set()
+        self.wake_event.set()
         if hasattr(self.laser, 'stop'):
             self.laser.stop()
 
@@ -305,10 +393,202 @@ class Scanner(threading.Thread):
         if wait:
             self.join()
 
+    def _start_accumulating(self):
+        """Resets the bin counters and opens the bin. Returns the bin start time."""
+        with self.count_lock:
+            self.accumulated_events = 0
+            self.accumulated_bunches = 0
+            self.overshoot_events = 0
+            self.overshoot_bunches = 0
+            self.early_events = 0
+            self.early_bunches = 0
+            self.target_reached = False
+            self.wake_event.clear()
+            self.bin_start_time = time.time()
+            self.is_accumulating = True
+            return self.bin_start_time
+
+    def _stop_accumulating(self):
+        with self.count_lock:
+            self.is_accumulating = False
+
+    def _check_stop_condition(self, now):
+        """Marks the bin target as reached if the stop condition holds at time `now`."""
+        with self.count_lock:
+            if not self.target_reached:
+                if self.stop_mode == 'events':
+                    self.target_reached = self.accumulated_events >= self.stop_value
+                elif self.stop_mode == 'bunches':
+                    self.target_reached = self.accumulated_bunches >= self.stop_value
+                elif self.stop_mode == 'time':
+                    self.target_reached = now - self.bin_start_time - self.bin_paused_duration >= self.stop_value
+                elif self.stop_mode == 'precision':
+                    self.target_reached = self._precision_reached(self.accumulated_events, self.accumulated_bunches)
+            return self.target_reached
+
+    def required_events(self):
+        """Precision mode: events needed for a relative uncertainty of stop_value (Poisson, 1/sqrt(N))."""
+        if self.stop_value <= 0:
+            return math.inf
+        return math.ceil(1.0 / self.stop_value ** 2)
+
+    def _precision_reached(self, n_events, n_bunches):
+        if self.max_bunches and n_bunches >= self.max_bunches:
+            return True
+        return n_bunches >= max(self.min_bunches, 1) and n_events >= self.required_events()
+
+    def bin_progress(self, now=None):
+        """Fraction (0..1) of the current bin's stop condition reached so far."""
+        now = now or time.time()
+        with self.count_lock:
+            if not self.is_accumulating:
+                return 0.0
+            events, bunches = self.accumulated_events, self.accumulated_bunches
+            elapsed = now - self.bin_start_time - self.bin_paused_duration
+        if self.stop_value <= 0:
+            return 0.0
+        if self.stop_mode == 'events':
+            progress = events / self.stop_value
+        elif self.stop_mode == 'bunches':
+            progress = bunches / self.stop_value
+        elif self.stop_mode == 'time':
+            progress = elapsed / self.stop_value
+        elif self.stop_mode == 'precision':
+            progress = min(events / self.required_events(), bunches / max(self.min_bunches, 1))
+            if self.max_bunches:
+                progress = max(progress, bunches / self.max_bunches)
+        else:
+            progress = 0.0
+        return min(progress, 1.0)
+
+    def _bin_share(self, n_events, n_bunches, timestamp):
+        """
+        Splits a batch into the part that belongs to the current bin and the part
+        that arrived after the stop condition was met. A batch straddling an
+        event/bunch target is split pro rata so the bin's events-per-bunch stays unbiased.
+        """
+        if self.stop_mode == 'events' and n_events > 0:
+            remaining = math.ceil(self.stop_value - self.accumulated_events)
+            if n_events >= remaining:
+                self.target_reached = True
+                in_events = max(remaining, 0)
+                return in_events, round(n_bunches * in_events / n_events)
+        elif self.stop_mode == 'bunches' and n_bunches > 0:
+            remaining = math.ceil(self.stop_value - self.accumulated_bunches)
+            if n_bunches >= remaining:
+                self.target_reached = True
+                in_bunches = max(remaining, 0)
+                return round(n_events * in_bunches / n_bunches), in_bunches
+        elif self.stop_mode == 'precision' and n_bunches > 0:
+            # Bunches needed for both min_bunches and the event count, assuming events spread evenly
+            needed = max(self.min_bunches - self.accumulated_bunches, 1 - self.accumulated_bunches, 0)
+            missing_events = self.required_events() - self.accumulated_events
+            if missing_events > 0:
+                needed = max(needed, math.ceil(n_bunches * missing_events / n_events) if n_events > 0 else math.inf)
+            if self.max_bunches:
+                needed = min(needed, max(self.max_bunches - self.accumulated_bunches, 0))
+            if n_bunches >= needed:
+                self.target_reached = True
+                return round(n_events * needed / n_bunches), needed
+        elif self.stop_mode == 'time' and timestamp is not None:
+            if timestamp - self.bin_start_time - self.bin_paused_duration >= self.stop_value:
+                self.target_reached = True
+                return 0, 0
+        return n_events, n_bunches
+
     def report_event(self, is_bunch=False):
         """Called by the data pipeline when an event is processed while accumulating."""
-        if self.is_accumulating and self.pause_event.is_set():
-            if is_bunch:
-                self.accumulated_bunches += 1
+        if is_bunch:
+            self.report_batch(0, 1)
+        else:
+            self.report_batch(1, 0)
+
+    def report_rows(self, timestamps, events, bunches):
+        """
+        Exact form of report_batch for a batch with per-row information, in acquisition order.
+        events/bunches: what each row adds to the bin (0 or 1). Rows acquired before the bin
+        started are booked as early, rows after the one that meets the stop condition as
+        overshoot. Returns the placement of every row (ROW_EARLY, ROW_IN_BIN, ROW_LATE), so
+        the pipeline can save each row with the bin it was counted in.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        events = np.asarray(events, dtype=np.int64)
+        bunches = np.asarray(bunches, dtype=np.int64)
+        placement = np.full(len(timestamps), ROW_LATE, dtype=np.int8)
+        with self.count_lock:
+            if not (self.is_accumulating and self.pause_event.is_set()):
+                return placement
+
+            early = timestamps < self.bin_start_time
+            placement[early] = ROW_EARLY
+            self.early_events += int(events[early].sum())
+            self.early_bunches += int(bunches[early].sum())
+
+            candidate = ~early
+            if not self.target_reached:
+                if self.stop_mode == 'time':
+                    late = timestamps - self.bin_start_time - self.bin_paused_duration >= self.stop_value
+                    in_bin = candidate & ~late
+                    self.target_reached = bool(np.any(candidate & late))
+                else:
+                    cum_events = self.accumulated_events + np.cumsum(np.where(candidate, events, 0))
+                    cum_bunches = self.accumulated_bunches + np.cumsum(np.where(candidate, bunches, 0))
+                    if self.stop_mode == 'events':
+                        done = cum_events >= self.stop_value
+                    elif self.stop_mode == 'bunches':
+                        done = cum_bunches >= self.stop_value
+                    elif self.stop_mode == 'precision':
+                        done = (cum_bunches >= max(self.min_bunches, 1)) & (cum_events >= self.required_events())
+                        if self.max_bunches:
+                            done |= cum_bunches >= self.max_bunches
+                    else:
+                        done = np.zeros(len(timestamps), dtype=bool)
+                    done &= candidate
+                    in_bin = candidate.copy()
+                    if np.any(done):
+                        # The row that meets the target is the last one in the bin
+                        in_bin[np.argmax(done) + 1:] = False
+                        self.target_reached = True
+                placement[in_bin] = ROW_IN_BIN
+                self.accumulated_events += int(events[in_bin].sum())
+                self.accumulated_bunches += int(bunches[in_bin].sum())
+
+            late = placement == ROW_LATE
+            self.overshoot_events += int(events[late].sum())
+            self.overshoot_bunches += int(bunches[late].sum())
+            if self.target_reached:
+                self.wake_event.set()
+        return placement
+
+    def report_batch(self, n_events, n_bunches, timestamp=None, first_timestamp=None):
+        """
+        Called by the data pipeline once per processed batch while accumulating.
+        `timestamp` is the acquisition time of the batch's last row and `first_timestamp`
+        that of its first (seconds since the epoch). Counts acquired before the current
+        bin started are not credited to it: a batch straddling the bin start is split
+        pro rata by time, the leading part is booked as early_events/early_bunches.
+        """
+        with self.count_lock:
+            if not (self.is_accumulating and self.pause_event.is_set()):
+                return
+            if timestamp is not None and timestamp < self.bin_start_time:
+                self.early_events += n_events
+                self.early_bunches += n_bunches
+                return
+            if first_timestamp is not None and first_timestamp < self.bin_start_time < timestamp:
+                fraction = (timestamp - self.bin_start_time) / (timestamp - first_timestamp)
+                kept_events, kept_bunches = round(n_events * fraction), round(n_bunches * fraction)
+                self.early_events += n_events - kept_events
+                self.early_bunches += n_bunches - kept_bunches
+                n_events, n_bunches = kept_events, kept_bunches
+            if self.target_reached:
+                in_events, in_bunches = 0, 0
             else:
-                self.accumulated_events += 1
+                in_events, in_bunches = self._bin_share(n_events, n_bunches, timestamp)
+
+            self.accumulated_events += in_events
+            self.accumulated_bunches += in_bunches
+            self.overshoot_events += n_events - in_events
+            self.overshoot_bunches += n_bunches - in_bunches
+            if self.target_reached:
+                self.wake_event.set()
@@ -0,0 +1,200 @@
+import time
+import threading
+import numpy as np
+
+from src.utils.time_series import TimeSeriesRing
+
+class SensorPoller(threading.Thread):
+    """
+    Reads one source at a fixed interval and publishes the value to the hub.
+    A failed read keeps the last value, so its age keeps growing.
+    With changes_only, a read returning the value already published is dropped as well:
+    polling a PV that has not updated must not look like a fresh reading.
+    """
+    def __init__(self, hub, name, read_fn, interval, changes_only=False):
+        super().__init__(daemon=True)
+        self.hub = hub
+        self.name = name
+        self.read_fn = read_fn
+        self.interval = interval
+        self.changes_only = changes_only
+        self.last_value = None
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                value = self.read_fn()
+            except Exception as e:
+                self.hub._record_error(self.name, e)
+            else:
+                if not (self.changes_only and value == self.last_value):
+                    self.last_value = value
+                    self.hub.publish(self.name, value)
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class SensorHub:
+    """
+    Single owner of the slow sensor reads (multimeter, spectrometer, wavemeter, laser position).
+    Each source is read by its own poller; consumers get the latest timestamped value
+    from the cache without doing any I/O and can ask how old it is.
+    Numeric values are also kept in a time-indexed ring per source (one per element for
+    list values such as the wavenumbers), so events can be given the sensor value at
+    their own timestamp (see interpolate).
+    """
+    def __init__(self, history=1024):
+        self.condition = threading.Condition()
+        self.values = {} # name -> (value, timestamp)
+        self.history_capacity = history
+        self.histories = {} # name -> [TimeSeriesRing per element]
+        self.sources = {} # name -> (read_fn, interval)
+        self.changes_only = set() # Sources whose unchanged reads are not published
+        self.pollers = {}
+        self.read_counts = {}
+        self.error_counts = {}
+        self.last_errors = {}
+
+    def add_source(self, name, read_fn, interval, initial=None, changes_only=False):
+        """
+        Registers a source polled every `interval` seconds once the hub is started.
+        With read_fn=None the source is pushed (e.g. from a PV monitor) via publish().
+        changes_only: only publish reads that differ from the previous one, for sources
+        that are polled faster than they update (the sample then keeps its first read time).
+        """
+        self.sources[name] = (read_fn, interval)
+        if changes_only:
+            self.changes_only.add(name)
+        self.read_counts[name] = 0
+        self.error_counts[name] = 0
+        if initial is not None:
+            self.values[name] = (initial, 0.0)
+
+    def start(self):
+        for name, (read_fn, interval) in self.sources.items():
+            if read_fn is None or name in self.pollers:
+                continue
+            poller = SensorPoller(self, name, read_fn, interval, name in self.changes_only)
+            self.pollers[name] = poller
+            poller.start()
+        print(f"[SensorHub] Polling {', '.join(self.sources)}")
+
+    def stop(self):
+        for poller in self.pollers.values():
+            poller.stop()
+        for poller in self.pollers.values():
+            poller.join(timeout=2.0)
+        self.pollers = {}
+
+    def publish(self, name, value, timestamp=None):
+        """Stores a new value; pollers and monitor callbacks both end up here."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        with self.condition:
+            self.values[name] = (value, timestamp)
+            self.read_counts[name] = self.read_counts.get(name, 0) + 1
+            self._record_history(name, value, timestamp)
+            self.condition.notify_all()
+
+    def _record_history(self, name, value, timestamp):
+        elements = value if isinstance(value, (list, tuple, np.ndarray)) else [value]
+        try:
+            elements = [float(v) for v in elements]
+        except (TypeError, ValueError):
+            return # Not numeric (e.g. a failed read returning None), only cached
+        rings = self.histories.get(name)
+        if rings is None or len(rings) != len(elements):
+            rings = self.histories[name] = [TimeSeriesRing(self.history_capacity) for _ in elements]
+        for ring, v in zip(rings, elements):
+            ring.append(v, timestamp)
+
+    def _record_error(self, name, error):
+        with self.condition:
+            self.error_counts[name] = self.error_counts.get(name, 0) + 1
+            self.last_errors[name] = str(error)
+
+    def get(self, name, default=None):
+        """Latest value of a source, or default if it was never read."""
+        with self.condition:
+            entry = self.values.get(name)
+        return entry[0] if entry else default
+
+    def get_sample(self, name):
+        """(value, timestamp) of the latest read, or (None, 0.0)."""
+        with self.condition:
+            return self.values.get(name, (None, 0.0))
+
+    def age(self, name, now=None):
+        """Seconds since the source was last read (inf if never)."""
+        _, timestamp = self.get_sample(name)
+        if timestamp <= 0:
+            return float('inf')
+        return (now or time.time()) - timestamp
+
+    def wait_for_update(self, name, newer_than, timeout=None):
+        """
+        Blocks until the source has a value read after `newer_than` (epoch seconds).
+        Returns (value, timestamp), or the latest sample if the timeout expires.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.values.get(name, (None, 0.0))[1] > newer_than, timeout)
+            return self.values.get(name, (None, 0.0))
+
+    def get_history(self, name, index=0, since=None):
+        """(timestamps, values) kept for a source (element `index` of list values)."""
+        rings = self.histories.get(name)
+        if not rings or index >= len(rings):
+            return np.zeros(0), np.zeros(0)
+        return rings[index].arrays(since)
+
+    def interpolate(self, name, timestamps, index=0, method="linear", default=None):
+        """
+        Value of a source at each of `timestamps` (epoch seconds), from its history.
+        method="linear" interpolates between the reads around each timestamp,
+        method="previous" takes the last read at or before it (what the cache held then).
+        Timestamps outside the history get the first/last read. Without history all of
+        them get `default`, or the latest cached value if no default is given.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        times, values = self.get_history(name, index)
+        if len(times) == 0:
+            latest = default if default is not None else self.get(name)
+            if isinstance(latest, (list, tuple, np.ndarray)):
+                latest = latest[index] if index < len(latest) else None
+            return np.full(timestamps.shape, np.nan if latest is None else float(latest))
+        if np.any(np.diff(times) < 0): # Pushed sources may deliver out of order
+            order = np.argsort(times, kind="stable")
+            times, values = times[order], values[order]
+        if method == "previous":
+            idx = np.searchsorted(times, timestamps, side="right") - 1
+            return values[np.clip(idx, 0, len(values) - 1)]
+        return np.interp(timestamps, times, values)
+
+    def stats(self):
+        """Per-source age, read and error counts, for status displays."""
+        now = time.time()
+        return {
+            name: {
+                "age_s": self.age(name, now),
+                "interval_s": interval,
+                "reads": self.read_counts.get(name, 0),
+                "errors": self.error_counts.get(name, 0),
+                "last_error": self.last_errors.get(name),
+            }
+            for name, (_, interval) in self.sources.items()
+        }
+
+    # --- Reader interface, so the hub can stand in for the individual readers ---
+    def get_voltage(self):
+        return self.get("voltage", 0.0)
+
+    def get_spectrum(self):
+        return self.get("spectrum")
+
+    def get_wavenumbers(self):
+        return list(self.get("wavenumbers", [0.0] * 4))
+
+    def get_position(self):
+        return self.get("laser_position", 0.0)
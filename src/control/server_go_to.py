@@ -0,0 +1,89 @@
+import time
+import threading
+from src.control.laser_controller import LaserController
+
+class LocalStage:
+    """
+    Presents a laser server interface (MOV/qPOS returning plain values) as the
+    pipython-style device LaserController expects, so the loop can run on the server.
+    """
+    def __init__(self, interface):
+        self.interface = interface
+
+    def MOV(self, axis, target):
+        return self.interface.MOV(axis, target)
+
+    def qPOS(self, axis=None):
+        axis = axis or 1
+        return {axis: self.interface.qPOS(axis)}
+
+    def SVO(self, axis, state):
+        pass
+
+
+class GoToRunner:
+    """
+    Server side of the closed-loop go_to command. Runs LaserController next to the
+    hardware: one client call per target instead of network round trips per step.
+    A single controller is kept between calls, so its model and calibration carry over.
+    """
+    def __init__(self, interface, wavemeter, axis=1):
+        self.controller = LaserController(LocalStage(interface), wavemeter, axis=axis, config={})
+        self.lock = threading.Lock() # One go_to at a time
+        self.state = "idle"
+        self.started = 0.0
+        self.finished = 0.0
+
+    def go_to(self, target_wn, params=None, timeout_s=120.0):
+        """
+        Steps to target_wn with the given LaserController settings and blocks until it
+        settled, was aborted or timed out. Returns the final status().
+        """
+        params = dict(params or {})
+        if params.get("control_mode") == "server":
+            params["control_mode"] = "fixed" # Already on the server
+        with self.lock:
+            controller = self.controller
+            controller.update_config(params)
+            self.state = "moving"
+            self.started = time.time()
+            self.finished = 0.0
+            controller.set_wavenumber(float(target_wn))
+
+            deadline = self.started + timeout_s
+            while controller.is_moving and time.time() < deadline:
+                controller.control_thread.join(timeout=0.05)
+            if controller.is_moving:
+                controller.stop()
+                self.state = "timeout"
+            elif controller.stop_event.is_set():
+                self.state = "aborted"
+            else:
+                self.state = "settled"
+            self.finished = time.time()
+            return self.status()
+
+    def abort(self):
+        """Stops a running go_to; it returns with state 'aborted'."""
+        self.controller.stop_event.set()
+        return True
+
+    def status(self):
+        """Progress of the current (or last) go_to, for clients polling while it runs."""
+        controller = self.controller
+        end = self.finished or time.time()
+        try:
+            wavenumber = controller.read_wavenumber()
+            position = controller.device.qPOS(controller.axis)[controller.axis]
+        except Exception as e:
+            print(f"[GoTo] Status read failed: {e}")
+            wavenumber, position = 0.0, 0.0
+        return {
+            "state": self.state,
+            "target_wn": controller.target_wn,
+            "wavenumber": float(wavenumber),
+            "position": float(position),
+            "moves": controller.moves_last_target,
+            "elapsed_s": end - self.started if self.started else 0.0,
+            "settle": controller.last_settle or {},
+        }
@@ -0,0 +1,69 @@
+import math
+import time
+from collections import deque
+
+class SettleDetector:
+    """
+    Decides from the wavemeter stream when the laser has settled on a target.
+    Keeps a moving window of consecutive in-tolerance readings and declares the
+    laser stable once there are at least `min_samples` of them and the band
+    mean +- n_sigma * std lies inside the tolerance. Noisy readings therefore
+    need more samples, quiet ones settle after min_samples.
+    """
+    def __init__(self, tolerance, min_samples=3, window=20, n_sigma=2.0):
+        self.tolerance = tolerance
+        self.min_samples = max(int(min_samples), 1)
+        self.window = max(int(window), self.min_samples)
+        self.n_sigma = n_sigma
+        self.target = 0.0
+        self.samples = deque(maxlen=self.window)
+        self.start_time = 0.0
+        self.first_in_band = None
+
+    def reset(self, target, start_time=None):
+        """Starts watching for a new target (e.g. after set_wavenumber)."""
+        self.target = target
+        self.samples.clear()
+        self.start_time = start_time if start_time is not None else time.time()
+        self.first_in_band = None
+
+    def add(self, wavenumber, timestamp=None):
+        """Feeds one reading. Returns True once the statistics show the laser settled."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        if abs(wavenumber - self.target) >= self.tolerance:
+            # Left the band: start over
+            self.samples.clear()
+            self.first_in_band = None
+            return False
+
+        if self.first_in_band is None:
+            self.first_in_band = timestamp
+        self.samples.append(wavenumber)
+        if len(self.samples) < self.min_samples:
+            return False
+
+        mean, std = self.statistics()
+        return abs(mean - self.target) + self.n_sigma * std < self.tolerance
+
+    def statistics(self):
+        """(mean, std) of the readings in the window."""
+        n = len(self.samples)
+        if n == 0:
+            return 0.0, 0.0
+        mean = sum(self.samples) / n
+        if n < 2:
+            return mean, 0.0
+        variance = sum((x - mean) ** 2 for x in self.samples) / (n - 1)
+        return mean, math.sqrt(variance)
+
+    def metrics(self, now=None):
+        """Time-to-settle figures for the current target."""
+        now = now if now is not None else time.time()
+        mean, std = self.statistics()
+        return {
+            "time_to_settle_s": now - self.start_time,
+            "dwell_s": now - self.first_in_band if self.first_in_band is not None else 0.0,
+            "samples": len(self.samples),
+            "mean_wn": mean,
+            "std_wn": std,
+        }
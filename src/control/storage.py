@@ -0,0 +1,228 @@
+import csv
+import os
+import struct
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+def records_to_array(items, dtype):
+    """Converts a list of record dicts and/or structured arrays into one array of dtype."""
+    parts = []
+    dicts = []
+    for item in items:
+        if isinstance(item, np.ndarray):
+            if dicts:
+                parts.append(np.array(dicts, dtype=dtype))
+                dicts = []
+            parts.append(item.astype(dtype, copy=False))
+        else:
+            dicts.append(tuple(item[name] for name in dtype.names))
+    if dicts:
+        parts.append(np.array(dicts, dtype=dtype))
+    if not parts:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(parts)
+
+
+class CsvStorage:
+    """
+    Text backend: one CSV row per record. Appends to an existing file without a second header.
+    """
+    extension = ".csv"
+
+    def __init__(self, filename, dtype):
+        self.filename = filename
+        self.dtype = dtype
+        self.f = None
+        self.writer = None
+        self.fieldnames = None
+        self.headers_written = False
+
+    def open(self):
+        self.headers_written = os.path.exists(self.filename)
+        self.f = open(self.filename, 'a', newline='')
+        self.writer = csv.writer(self.f)
+
+    def write(self, items):
+        if not items:
+            return
+        if self.fieldnames is None:
+            first = items[0]
+            self.fieldnames = list(first.dtype.names) if isinstance(first, np.ndarray) else list(first.keys())
+        if not self.headers_written:
+            self.writer.writerow(self.fieldnames)
+            self.headers_written = True
+        for item in items:
+            if isinstance(item, np.ndarray):
+                self.writer.writerows(item[self.fieldnames].tolist())
+            else:
+                self.writer.writerow([item[k] for k in self.fieldnames])
+
+    def flush(self):
+        self.f.flush()
+
+    def sync(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def position(self):
+        """Bytes written so far."""
+        return self.f.tell()
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+
+class NpyStorage:
+    """
+    Binary backend: a single .npy file of structured records that grows by appending
+    typed chunks. The header is rewritten with the current row count on every flush,
+    so the file is a valid array (np.load) at each flush point.
+    """
+    extension = ".npy"
+
+    def __init__(self, filename, dtype):
+        self.filename = filename
+        self.dtype = np.dtype(dtype)
+        self.f = None
+        self.rows = 0
+        # Fixed header size (room for a 20 digit row count) so the shape can be rewritten in place
+        longest = len(self._header_text(10**20 - 1)) + 11
+        self.header_len = 64 * ((longest + 63) // 64)
+
+    def _header_text(self, rows):
+        return "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+            np.lib.format.dtype_to_descr(self.dtype), rows)
+
+    def open(self):
+        if os.path.exists(self.filename) and os.path.getsize(self.filename) >= self.header_len:
+            # Continue an existing file written by this backend
+            existing = np.load(self.filename, mmap_mode='r')
+            if existing.dtype != self.dtype:
+                raise ValueError(f"{self.filename} holds {existing.dtype}, expected {self.dtype}")
+            self.rows = len(existing)
+            del existing
+            self.f = open(self.filename, 'r+b')
+            self.f.seek(self.header_len + self.rows * self.dtype.itemsize)
+            self.f.truncate()
+        else:
+            self.f = open(self.filename, 'w+b')
+            self._write_header()
+
+    def _write_header(self):
+        prefix = np.lib.format.magic(1, 0) + struct.pack('<H', self.header_len - 10)
+        header = self._header_text(self.rows).ljust(self.header_len - len(prefix) - 1) + '\n'
+        self.f.seek(0)
+        self.f.write(prefix + header.encode('latin1'))
+        self.f.seek(0, os.SEEK_END)
+
+    def write(self, items):
+        block = records_to_array(items, self.dtype)
+        if len(block):
+            self.f.write(block.tobytes())
+            self.rows += len(block)
+
+    def flush(self):
+        self._write_header()
+        self.f.flush()
+
+    def sync(self):
+        self.flush()
+        os.fsync(self.f.fileno())
+
+    def position(self):
+        return self.header_len + self.rows * self.dtype.itemsize
+
+    def close(self):
+        if self.f:
+            self.flush()
+            self.f.close()
+            self.f = None
+
+
+class Hdf5Storage:
+    """
+    Binary backend: one resizable, chunked HDF5 dataset of structured records (requires h5py).
+    """
+    extension = ".h5"
+    dataset_name = "events"
+
+    def __init__(self, filename, dtype, chunk_rows=65536):
+        if h5py is None:
+            raise RuntimeError("HDF5 storage requires the h5py module.")
+        self.filename = filename
+        self.dtype = np.dtype(dtype)
+        self.chunk_rows = chunk_rows
+        self.h5 = None
+        self.dataset = None
+
+    def open(self):
+        self.h5 = h5py.File(self.filename, 'a')
+        if self.dataset_name in self.h5:
+            self.dataset = self.h5[self.dataset_name]
+        else:
+            self.dataset = self.h5.create_dataset(
+                self.dataset_name, shape=(0,), maxshape=(None,),
+                dtype=self.dtype, chunks=(self.chunk_rows,)
+            )
+
+    def write(self, items):
+        block = records_to_array(items, self.dtype)
+        if len(block):
+            n = self.dataset.shape[0]
+            self.dataset.resize((n + len(block),))
+            self.dataset[n:] = block
+
+    def flush(self):
+        self.h5.flush()
+
+    def sync(self):
+        self.h5.flush()
+        os.fsync(self.h5.id.get_vfd_handle())
+
+    def position(self):
+        return self.dataset.shape[0] * self.dtype.itemsize
+
+    def close(self):
+        if self.h5:
+            self.h5.close()
+            self.h5 = None
+
+
+STORAGE_BACKENDS = {
+    "csv": CsvStorage,
+    "npy": NpyStorage,
+    "hdf5": Hdf5Storage,
+}
+
+def make_storage(storage_format, filename, dtype):
+    if storage_format not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage format '{storage_format}'. Options: {list(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[storage_format](filename, dtype)
+
+def load_records(path, dtype=None):
+    """
+    Loads a record file written by NpyStorage or Hdf5Storage.
+    CSV files are read too when their dtype is given; columns are matched by header name.
+    """
+    if path.endswith(CsvStorage.extension):
+        if dtype is None:
+            raise ValueError("Reading CSV records requires their dtype.")
+        with open(path, 'r') as f:
+            header = f.readline().strip().split(',')
+        file_dtype = np.dtype([(name, dtype.fields[name][0]) for name in header])
+        data = np.loadtxt(path, delimiter=',', skiprows=1, dtype=file_dtype, ndmin=1)
+        return data.astype(dtype) if header != list(dtype.names) else data
+    if path.endswith(NpyStorage.extension):
+        return np.load(path)
+    if path.endswith(Hdf5Storage.extension):
+        if h5py is None:
+            raise RuntimeError("Reading HDF5 scans requires the h5py module.")
+        with h5py.File(path, 'r') as h5:
+            return h5[Hdf5Storage.dataset_name][:]
+    raise ValueError(f"Not a binary record file: {path}")
@@ -0,0 +1,146 @@
+import threading
+import time
+import numpy as np
+
+from src.devices.tagger import EVENT_DTYPE
+
+class EventRing:
+    """
+    Preallocated fixed-capacity ring buffer of event rows.
+    One producer (the tagger reader) writes batches, one consumer (the DAQ loop) reads them.
+    When the ring is full the rows that do not fit are dropped and counted as overflow.
+    """
+    def __init__(self, capacity=1 << 20, dtype=EVENT_DTYPE):
+        self.capacity = int(capacity)
+        self.buffer = np.empty(self.capacity, dtype=dtype)
+        self.head = 0 # Total rows written
+        self.tail = 0 # Total rows read
+
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+
+        self.overflow_rows = 0
+        self.overflow_batches = 0
+        self.high_water = 0
+
+    def __len__(self):
+        with self.lock:
+            return self.head - self.tail
+
+    def write(self, batch):
+        """Copies batch into the ring. Returns the number of rows stored."""
+        n = len(batch)
+        if n == 0:
+            return 0
+
+        with self.lock:
+            free = self.capacity - (self.head - self.tail)
+            if n > free:
+                self.overflow_rows += n - free
+                self.overflow_batches += 1
+                n = free
+                batch = batch[:n]
+
+            if n > 0:
+                start = self.head % self.capacity
+                first = min(n, self.capacity - start)
+                self.buffer[start:start + first] = batch[:first]
+                self.buffer[:n - first] = batch[first:]
+                self.head += n
+                self.high_water = max(self.high_water, self.head - self.tail)
+                self.not_empty.notify()
+        return n
+
+    def read(self, max_rows=None, timeout=None):
+        """
+        Returns a copy of up to max_rows buffered rows, waiting up to timeout
+        seconds for data. Returns an empty array if nothing arrived.
+        """
+        with self.lock:
+            if self.head == self.tail and timeout:
+                self.not_empty.wait(timeout)
+
+            n = self.head - self.tail
+            if max_rows is not None:
+                n = min(n, int(max_rows))
+
+            start = self.tail % self.capacity
+            first = min(n, self.capacity - start)
+            if first == n:
+                out = self.buffer[start:start + n].copy()
+            else:
+                out = np.concatenate((self.buffer[start:], self.buffer[:n - first]))
+            self.tail += n
+        return out
+
+    def stats(self):
+        with self.lock:
+            return {
+                "capacity": self.capacity,
+                "fill": self.head - self.tail,
+                "high_water": self.high_water,
+                "rows_written": self.head,
+                "overflow_rows": self.overflow_rows,
+                "overflow_batches": self.overflow_batches,
+            }
+
+
+class TaggerReader(threading.Thread):
+    """
+    Drains the tagger as fast as the card delivers and writes the batches into an EventRing,
+    independently of how often the DAQ loop processes them.
+    """
+    def __init__(self, tagger, ring, idle_sleep=0.0005):
+        super().__init__(daemon=True)
+        self.tagger = tagger
+        self.ring = ring
+        self.idle_sleep = idle_sleep
+        self.stop_event = threading.Event()
+
+        self.batches_read = 0
+        self.rows_read = 0
+        self.read_errors = 0
+
+    def run(self):
+        print("[Reader] Tagger reader started.")
+        reported_overflow = 0
+        last_report = 0.0
+
+        while not self.stop_event.is_set():
+            try:
+                batch = self.tagger.get_data(as_array=True)
+            except Exception as e:
+                self.read_errors += 1
+                print(f"[Reader] Error reading tagger: {e}")
+                self.stop_event.wait(0.1)
+                continue
+
+            if len(batch) == 0:
+                self.stop_event.wait(self.idle_sleep)
+                continue
+
+            self.batches_read += 1
+            self.rows_read += len(batch)
+            self.ring.write(batch)
+
+            # Warn about overflow at most once per second
+            if self.ring.overflow_rows != reported_overflow and time.time() - last_report > 1.0:
+                reported_overflow = self.ring.overflow_rows
+                last_report = time.time()
+                print(f"[Reader] Warning: ring overflow, {reported_overflow} rows dropped so far.")
+
+        print(f"[Reader] Tagger reader stopped. {self.rows_read} rows in {self.batches_read} batches.")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=2.0)
+
+    def stats(self):
+        stats = self.ring.stats()
+        stats.update({
+            "batches_read": self.batches_read,
+            "rows_read": self.rows_read,
+            "read_errors": self.read_errors,
+        })
+        return stats
@@ -0,0 +1,70 @@
+from collections import deque
+import numpy as np
+
+class WavenumberModel:
+    """
+    Online linear model of wavenumber vs. stage position, learned from the
+    (position, wavenumber) pairs the control loop measures anyway.
+    Samples are kept separately for both directions of travel, since the stage
+    shows hysteresis: the same position gives a different wavenumber depending
+    on the direction it was approached from.
+    """
+    def __init__(self, history=20, min_span=1e-5, max_jump=1.0, initial_slope=None):
+        self.samples = {1: deque(maxlen=history), -1: deque(maxlen=history)}
+        self.min_span = min_span # Minimum position spread (mm) before a fit is trusted
+        self.max_jump = max_jump # Largest single predicted move (mm)
+        self.initial_slope = initial_slope # cm^-1 per mm, used until a fit exists
+
+    def reset(self):
+        for samples in self.samples.values():
+            samples.clear()
+
+    def observe(self, position, wavenumber, direction):
+        """Adds a measurement taken after moving in `direction` (+1 / -1)."""
+        if direction not in self.samples or wavenumber <= 0:
+            return
+        samples = self.samples[direction]
+        if samples and abs(samples[-1][0] - position) < 1e-9:
+            # Same position again (dwell), keep only the newest reading
+            samples.pop()
+        samples.append((position, wavenumber))
+
+    def fit(self, direction):
+        """(slope, intercept) of the samples for one direction, or None if not enough spread."""
+        samples = self.samples[direction]
+        if len(samples) < 2:
+            return None
+        positions, wavenumbers = np.array(samples).T
+        if np.ptp(positions) < self.min_span:
+            return None
+        slope, intercept = np.polyfit(positions, wavenumbers, 1)
+        if slope == 0 or not np.isfinite(slope):
+            return None
+        return slope, intercept
+
+    def slope(self, direction):
+        fit = self.fit(direction) or self.fit(-direction)
+        return fit[0] if fit else self.initial_slope
+
+    def predict_position(self, position, wavenumber, target_wn, last_direction):
+        """
+        Position expected to reach target_wn, or None if the model cannot tell yet.
+        Continuing in the same direction: secant step from the current reading.
+        Reversing: the line fitted for the new direction, which includes the backlash.
+        """
+        slope = self.slope(last_direction or 1)
+        if not slope:
+            return None
+        direction = 1 if (target_wn - wavenumber) / slope > 0 else -1
+
+        fit = self.fit(direction)
+        secant = position + (target_wn - wavenumber) / (fit[0] if fit else slope)
+        predicted = secant
+        if direction != last_direction and fit is not None:
+            predicted = (target_wn - fit[1]) / fit[0]
+            if (predicted - position) * direction <= 0:
+                predicted = secant # Stale line, it points the wrong way
+
+        # Do not trust a large extrapolation in one go
+        jump = np.clip(predicted - position, -self.max_jump, self.max_jump)
+        return float(position + jump)
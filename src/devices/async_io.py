@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncDevice:
+    """
+    Awaitable wrapper around a blocking device. Calls to one device run one at a time
+    on the device's own worker thread (serial/VISA handles are not thread-safe), so
+    reads from different devices overlap instead of adding up.
+    A call that times out raises asyncio.TimeoutError; the blocking call itself
+    still finishes on the worker.
+    """
+    def __init__(self, device, name, timeout=5.0):
+        self.device = device
+        self.name = name
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"aio-{name}")
+
+    async def call(self, method, *args, timeout=None):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, functools.partial(getattr(self.device, method), *args))
+        return await asyncio.wait_for(future, timeout or self.timeout)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class AsyncLaser(AsyncDevice):
+    """Stage behind PIGCSDevice. With the binary transport, requests are pipelined on its connection."""
+    def _rpc(self):
+        proxy = getattr(self.device, 'proxy', None)
+        return proxy if hasattr(proxy, 'call_async') else None
+
+    async def _remote(self, method, *args, timeout=None):
+        future = asyncio.wrap_future(self._rpc().call_async(method, *args))
+        return await asyncio.wait_for(future, timeout or self.timeout)
+
+    async def qpos(self, axis=1, timeout=None):
+        if self._rpc():
+            return float(await self._remote("qPOS", axis, timeout=timeout))
+        return float((await self.call("qPOS", axis, timeout=timeout))[axis])
+
+    async def mov(self, axis, target, timeout=None):
+        if self._rpc():
+            return await self._remote("MOV", axis, float(target), timeout=timeout)
+        return await self.call("MOV", axis, float(target), timeout=timeout)
+
+
+class AsyncWavemeter(AsyncDevice):
+    """Wavemeter PVs through an EPICS client (caget)."""
+    def __init__(self, epics_client, name="wavemeter", timeout=5.0, pv='LaserLab:wavenumber_1'):
+        super().__init__(epics_client, name, timeout)
+        self.pv = pv
+
+    async def read(self, pv=None, timeout=None):
+        return float(await self.call("caget", pv or self.pv, timeout=timeout))
+
+
+class AsyncMultimeter(AsyncDevice):
+    async def read_voltage(self, timeout=None):
+        return float(await self.call("getVoltage", timeout=timeout))
+
+
+class DeviceIO:
+    """
+    Owns an asyncio loop on a background thread and the async device wrappers, with
+    blocking wrappers for synchronous callers (LaserController, scanner, pollers).
+    Devices not given are None and their reads raise.
+    """
+    def __init__(self, pi_device=None, epics_client=None, multimeter=None, timeout=5.0, axis=1):
+        self.timeout = timeout
+        self.axis = axis
+        self.laser = AsyncLaser(pi_device, "laser", timeout) if pi_device is not None else None
+        self.wavemeter = AsyncWavemeter(epics_client, timeout=timeout) if epics_client is not None else None
+        self.multimeter = AsyncMultimeter(multimeter, "multimeter", timeout) if multimeter is not None else None
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="device-io", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        """Starts a coroutine on the I/O loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Runs a coroutine on the I/O loop and blocks for its result."""
+        return self.submit(coro).result(timeout if timeout is not None else self.timeout + 1.0)
+
+    async def read_state_async(self):
+        """(position, wavenumber) read concurrently."""
+        position, wavenumber = await asyncio.gather(self.laser.qpos(self.axis), self.wavemeter.read())
+        return position, wavenumber
+
+    # --- Sync wrappers ---
+    def read_position(self):
+        return self.run(self.laser.qpos(self.axis))
+
+    def move(self, target):
+        return self.run(self.laser.mov(self.axis, target))
+
+    def read_wavenumber(self):
+        return self.run(self.wavemeter.read())
+
+    def read_voltage(self):
+        return self.run(self.multimeter.read_voltage())
+
+    def read_state(self):
+        return self.run(self.read_state_async())
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2.0)
+        for device in (self.laser, self.wavemeter, self.multimeter):
+            if device is not None:
+                device.close()
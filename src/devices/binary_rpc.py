@@ -0,0 +1,254 @@
+import socket
+import socketserver
+import struct
+import threading
+import itertools
+from concurrent.futures import Future
+
+# Frame: payload length, request id, frame type; then the payload
+HEADER = struct.Struct("!IIB")
+FRAME_REQUEST = 0
+FRAME_RESULT = 1
+FRAME_ERROR = 2
+MAX_PAYLOAD = 16 * 1024 * 1024
+
+class RPCError(Exception):
+    """Raised on the client when the server method failed or the connection broke."""
+    pass
+
+# --- Payload codec: tagged struct encoding of None, bool, int, float, str, bytes, list/tuple, dict ---
+
+def encode(value):
+    parts = []
+    _encode(value, parts)
+    return b"".join(parts)
+
+def _encode(value, parts):
+    if value is None:
+        parts.append(b"N")
+    elif value is True or value is False:
+        parts.append(b"T" if value else b"F")
+    elif isinstance(value, int):
+        parts.append(b"i" + struct.pack("!q", value))
+    elif isinstance(value, float):
+        parts.append(b"d" + struct.pack("!d", value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        parts.append(b"s" + struct.pack("!I", len(data)) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        parts.append(b"b" + struct.pack("!I", len(value)) + bytes(value))
+    elif isinstance(value, (list, tuple)):
+        parts.append(b"l" + struct.pack("!I", len(value)))
+        for item in value:
+            _encode(item, parts)
+    elif isinstance(value, dict):
+        parts.append(b"m" + struct.pack("!I", len(value)))
+        for key, item in value.items():
+            _encode(key, parts)
+            _encode(item, parts)
+    elif hasattr(value, "item"): # NumPy scalar
+        _encode(value.item(), parts)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__}")
+
+def decode(data):
+    value, offset = _decode(memoryview(data), 0)
+    return value
+
+def _decode(data, offset):
+    tag = bytes(data[offset:offset + 1])
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag == b"T":
+        return True, offset
+    if tag == b"F":
+        return False, offset
+    if tag == b"i":
+        return struct.unpack_from("!q", data, offset)[0], offset + 8
+    if tag == b"d":
+        return struct.unpack_from("!d", data, offset)[0], offset + 8
+    if tag in (b"s", b"b"):
+        (n,) = struct.unpack_from("!I", data, offset)
+        offset += 4
+        raw = bytes(data[offset:offset + n])
+        return (raw.decode("utf-8") if tag == b"s" else raw), offset + n
+    if tag == b"l":
+        (n,) = struct.unpack_from("!I", data, offset)
+        offset += 4
+        items = []
+        for _ in range(n):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return items, offset
+    if tag == b"m":
+        (n,) = struct.unpack_from("!I", data, offset)
+        offset += 4
+        result = {}
+        for _ in range(n):
+            key, offset = _decode(data, offset)
+            result[key], offset = _decode(data, offset)
+        return result, offset
+    raise ValueError(f"Unknown tag {tag!r}")
+
+# --- Framing ---
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+def send_frame(sock, request_id, frame_type, payload):
+    sock.sendall(HEADER.pack(len(payload), request_id, frame_type) + payload)
+
+def recv_frame(sock):
+    """Returns (request_id, frame_type, payload)."""
+    length, request_id, frame_type = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if length > MAX_PAYLOAD:
+        raise ConnectionError(f"Frame too large ({length} bytes)")
+    return request_id, frame_type, _recv_exact(sock, length)
+
+# --- Server ---
+
+class _RPCHandler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        # Requests on one connection run in order; the client does not wait for a
+        # response before sending the next one (pipelining)
+        while True:
+            try:
+                request_id, frame_type, payload = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            if frame_type != FRAME_REQUEST:
+                continue
+            try:
+                method, args = decode(payload)
+                result = self.server.dispatch(method, args)
+                reply = (FRAME_RESULT, encode(result))
+            except Exception as e:
+                reply = (FRAME_ERROR, encode(f"{type(e).__name__}: {e}"))
+            try:
+                send_frame(self.request, request_id, *reply)
+            except OSError:
+                return
+
+class BinaryRPCServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Serves the public methods of `instance` over persistent TCP connections,
+    one thread per connection (like register_instance on an XML-RPC server).
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, instance, host="0.0.0.0", port=8001):
+        self.instance = instance
+        super().__init__((host, port), _RPCHandler)
+
+    def dispatch(self, method, args):
+        if method.startswith("_"):
+            raise AttributeError(f"Method {method} is not exposed")
+        return getattr(self.instance, method)(*args)
+
+    def serve_in_background(self):
+        thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True)
+        thread.start()
+        return thread
+
+# --- Client ---
+
+class BinaryRPCClient:
+    """
+    Persistent connection to a BinaryRPCServer. Thread-safe: calls from several
+    threads are pipelined on the one socket and matched to their responses by
+    request id. Methods can be called like on xmlrpc.client.ServerProxy.
+    """
+    def __init__(self, host, port=8001, timeout=10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.ids = itertools.count(1)
+        self.send_lock = threading.Lock()
+        self.pending = {} # request id -> (socket it was sent on, Future)
+        self.pending_lock = threading.Lock()
+        self.sock = None
+        self.reader = None
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(None) # The reader blocks; call timeouts are on the futures
+        self.sock = sock
+        self.reader = threading.Thread(target=self._read_loop, args=(sock,), daemon=True)
+        self.reader.start()
+
+    def _read_loop(self, sock):
+        try:
+            while True:
+                request_id, frame_type, payload = recv_frame(sock)
+                with self.pending_lock:
+                    _, future = self.pending.pop(request_id, (None, None))
+                if future is None:
+                    continue
+                if frame_type == FRAME_RESULT:
+                    future.set_result(decode(payload))
+                else:
+                    future.set_exception(RPCError(decode(payload)))
+        except (ConnectionError, OSError) as e:
+            self._fail_pending(sock, e)
+
+    def _fail_pending(self, sock, error):
+        with self.send_lock:
+            if self.sock is sock:
+                self.sock = None
+        # Only the requests sent on this socket; a reconnect may already have new ones in flight
+        with self.pending_lock:
+            lost = [rid for rid, (s, _) in self.pending.items() if s is sock]
+            futures = [self.pending.pop(rid)[1] for rid in lost]
+        for future in futures:
+            if not future.done():
+                future.set_exception(RPCError(f"Connection lost: {error}"))
+
+    def call_async(self, method, *args):
+        """Sends a request without waiting; returns a Future for the result."""
+        future = Future()
+        payload = encode([method, list(args)])
+        with self.send_lock:
+            if self.sock is None:
+                self._connect()
+            request_id = next(self.ids) & 0xFFFFFFFF
+            with self.pending_lock:
+                self.pending[request_id] = (self.sock, future)
+            try:
+                send_frame(self.sock, request_id, FRAME_REQUEST, payload)
+            except OSError as e:
+                with self.pending_lock:
+                    self.pending.pop(request_id, None)
+                sock, self.sock = self.sock, None
+                sock.close()
+                raise RPCError(f"Send failed: {e}")
+        return future
+
+    def call(self, method, *args):
+        return self.call_async(method, *args).result(timeout=self.timeout)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args: self.call(name, *args)
+
+    def close(self):
+        with self.send_lock:
+            sock, self.sock = self.sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
@@ -15,17 +15,34 @@ if os.environ.get('SIMULATION', '0') == '1':
     LAB_COMPUTER_IP = 'localhost'
 import threading
 import xmlrpc.client
+from contextlib import nullcontext
+from src.devices.binary_rpc import BinaryRPCClient
+
+LAB_COMPUTER_BINARY_PORT = 8001
 
 class PIGCSDevice:
+    """
+    Client for laser_server.py.
+    transport 'xmlrpc': one HTTP request per call, serialized by a client lock.
+    transport 'binary': persistent TCP connection with pipelined calls (see binary_rpc).
+    """
     def __init__(self, controller_name='', initialization_params: dict = {}):
-        self.url = f"http://{LAB_COMPUTER_IP}:{LAB_COMPUTER_PORT}"
-        self.lock = Lock()
-
-        self.proxy = xmlrpc.client.ServerProxy(
-            self.url,
-            allow_none=True,
-            use_builtin_types=True
-        )
+        self.transport = initialization_params.get("transport", "xmlrpc")
+
+        if self.transport == "binary":
+            port = initialization_params.get("port", LAB_COMPUTER_BINARY_PORT)
+            self.url = f"tcp://{LAB_COMPUTER_IP}:{port}"
+            # The client matches responses to requests itself, no need to serialize calls here
+            self.lock = nullcontext()
+            self.proxy = BinaryRPCClient(LAB_COMPUTER_IP, port, timeout=initialization_params.get("timeout", 10.0))
+        else:
+            self.url = f"http://{LAB_COMPUTER_IP}:{LAB_COMPUTER_PORT}"
+            self.lock = Lock()
+            self.proxy = xmlrpc.client.ServerProxy(
+                self.url,
+                allow_none=True,
+                use_builtin_types=True
+            )
         print(f"[RemoteHW] Connected to persistent server proxy at {self.url}")
 
     def MOV(self, axis, target):
@@ -44,6 +61,26 @@ class PIGCSDevice:
     def SVO(self, axis, state):
         pass
 
+    def go_to(self, target_wn, params=None, timeout_s=120.0):
+        """
+        Server-side closed loop (LaserServerInterface.go_to): one call per target.
+        Does not take the client lock, so position polling and go_to_abort() keep working meanwhile.
+        """
+        if self.transport == "binary":
+            future = self.proxy.call_async("go_to", float(target_wn), params or {}, float(timeout_s))
+            return future.result(timeout=timeout_s + 10.0)
+        # ServerProxy is not thread-safe: a separate one for the long call
+        proxy = xmlrpc.client.ServerProxy(self.url, allow_none=True, use_builtin_types=True)
+        return proxy.go_to(float(target_wn), params or {}, float(timeout_s))
+
+    def go_to_status(self):
+        with self.lock:
+            return self.proxy.go_to_status()
+
+    def go_to_abort(self):
+        with self.lock:
+            return self.proxy.go_to_abort()
+
 # class PIGCSDevice:
 #     """
 #     Robust Remote Client. Connects to laser_server.py.
@@ -1,5 +1,8 @@
 import threading
 import time
+import numpy as np
+
+from src.utils.time_series import TimeSeriesRing
 try:
     import serial
 except ImportError:
@@ -23,8 +26,15 @@ if PV is not None:
 
 
 class HP_Multimeter:
-    def __init__(self, port):
-        self.device = serial.Serial(port, baudrate=9600, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_TWO, timeout=1)
+    def __init__(self, port, serial_device=None):
+        # serial_device: an already open port (or a stand-in such as MockSerialMultimeter)
+        if serial_device is not None:
+            self.device = serial_device
+        else:
+            self.device = serial.Serial(port, baudrate=9600, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_TWO, timeout=1)
+        self.burst_samples = 0
+        self.sample_period = 0.0
+        self.last_trigger_time = 0.0
         self.reset()
         time.sleep(0.25)
         self.setRemote()
@@ -53,15 +63,80 @@ class HP_Multimeter:
             response = 0.0
         return response
 
+    def configure_burst(self, samples=10, nplc=1, trigger_delay=0.0, line_frequency=50.0):
+        """
+        Configures the meter once for buffered DC voltage bursts: every READ? then takes
+        `samples` readings back to back (integration time nplc power-line cycles each)
+        instead of re-configuring the meter per reading like MEAS?.
+        The port timeout is raised to cover the burst and its transfer.
+        """
+        for command in ("CONF:VOLT:DC DEF,DEF", f"VOLT:DC:NPLC {nplc}", "TRIG:SOUR IMM",
+                        f"TRIG:DEL {trigger_delay}", f"SAMP:COUN {int(samples)}"):
+            self.device.write(command.encode() + b"\n")
+        self.burst_samples = int(samples)
+        self.sample_period = trigger_delay + nplc / line_frequency
+        self.device.timeout = self.burst_duration() + 1.0
+
+    def _char_time(self):
+        # 8 data bits, 2 stop bits, 1 start bit per character
+        return 11.0 / getattr(self.device, 'baudrate', 9600)
+
+    def burst_duration(self):
+        """Seconds from READ? until the whole answer has arrived: the acquisition plus the transfer."""
+        reading_chars = 16 # "+1.23456789E+00," per reading
+        return self.burst_samples * (self.sample_period + reading_chars * self._char_time())
+
+    def read_burst(self, fetch=False):
+        """
+        Triggers a burst (READ?) or fetches the last one (FETC?) and returns (voltages, timestamps).
+        Reading k is stamped trigger time + k * sample period; the trigger is when the
+        READ? command has been transferred. FETC? returns the readings of the last READ?.
+        """
+        command = b"FETC?\n" if fetch else b"READ?\n"
+        t_request = time.time()
+        self.device.write(command)
+        if not fetch:
+            self.last_trigger_time = t_request + len(command) * self._char_time()
+        try:
+            response = self.device.readline().decode('utf-8').strip('\r\n')
+            voltages = np.array([float(v) for v in response.split(',') if v], dtype=np.float64)
+        except Exception as expn:
+            print('uh oh, exception occurred reading the voltage burst', expn)
+            voltages = np.zeros(0, dtype=np.float64)
+        timestamps = self.last_trigger_time + self.sample_period * np.arange(len(voltages))
+        return voltages, timestamps
+
 class VoltageReader(threading.Thread):
-    def __init__(self, multimeter, refresh_rate=0.5):
-        super().__init__()
+    """
+    Reads the multimeter in the background. With burst_samples > 0 the meter is
+    configured once and streamed in buffered bursts (see HP_Multimeter.read_burst);
+    every reading goes into a timestamped ring and to the listeners.
+    """
+    def __init__(self, multimeter, refresh_rate=0.5, burst_samples=0, nplc=1, history=4096, line_frequency=50.0):
+        super().__init__(daemon=True)
         self.multimeter = multimeter
         self.refresh_rate = refresh_rate
+        self.burst_samples = burst_samples
+        self.nplc = nplc
+        self.line_frequency = line_frequency
         self.voltage = 0.0
+        self.history = TimeSeriesRing(history)
+        self.listeners = [] # callback(voltage, timestamp) per reading
         self.stop_event = threading.Event()
 
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _record(self, voltages, timestamps):
+        for voltage, timestamp in zip(voltages, timestamps):
+            self.history.append(voltage, timestamp)
+            for callback in self.listeners:
+                callback(float(voltage), float(timestamp))
+
     def run(self):
+        if self.burst_samples > 0:
+            self._run_burst()
+            return
         while not self.stop_event.is_set():
             try:
                 self.voltage = self.multimeter.getVoltage()
@@ -70,6 +145,15 @@ class VoltageReader(threading.Thread):
                 self.voltage = -69419.999999999999
                 time.sleep(self.refresh_rate)
 
+    def _run_burst(self):
+        self.multimeter.configure_burst(self.burst_samples, nplc=self.nplc, line_frequency=self.line_frequency)
+        while not self.stop_event.is_set():
+            voltages, timestamps = self.multimeter.read_burst()
+            if len(voltages) == 0:
+                self.stop_event.wait(self.refresh_rate) # Meter did not answer, do not hammer it
+                continue
+            self.voltage = float(voltages.mean())
+            self._record(voltages, timestamps)
 
     def stop(self):
         self.stop_event.set()
@@ -77,26 +161,70 @@ class VoltageReader(threading.Thread):
     def get_voltage(self):
         return self.voltage
 
+    def get_history(self, since=None):
+        """(timestamps, voltages) of the readings in the ring."""
+        return self.history.arrays(since)
+
+    def interval_averages(self, interval_s, since=None):
+        """Mean voltage per interval_s window: (window start times, means, counts); empty windows are left out."""
+        timestamps, voltages = self.history.arrays(since)
+        if len(timestamps) == 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+        windows = np.floor((timestamps - timestamps[0]) / interval_s).astype(np.int64)
+        counts = np.bincount(windows)
+        sums = np.bincount(windows, weights=voltages)
+        filled = counts > 0
+        starts = timestamps[0] + np.arange(len(counts)) * interval_s
+        return starts[filled], sums[filled] / counts[filled], counts[filled]
+
 class SpectrometreReader(threading.Thread):
     """
     Interface for the real Spectrometer Reader.
+    monitor=True subscribes to the PV (CA monitor) instead of polling caget every refresh_rate;
+    pv_factory builds the PV object (epics.PV by default, a stand-in in tests).
     """
-    def __init__(self, refresh_rate=0.2):
+    def __init__(self, refresh_rate=0.2, monitor=False, pv_factory=None, history=256):
         super().__init__()
         self.refresh_rate = refresh_rate
         self.spectrum = None
         self.pv_name = "LaserLab:spectrum_peak"
         self.stop_event = threading.Event()
 
+        self.monitor = monitor
+        self.history = TimeSeriesRing(history)
+        self.pv = None
+        if monitor:
+            pv_factory = pv_factory or PV
+            self.pv = pv_factory(self.pv_name, callback=self._on_update, auto_monitor=True)
+
+    def _on_update(self, pvname=None, value=None, **kwargs):
+        """CA monitor callback: runs on the EPICS thread, only stores the value."""
+        try:
+            value = float(value) if value is not None else 0.00
+        except (TypeError, ValueError):
+            return
+        self.spectrum = value
+        # The IOC's timestamp of the measurement, not when the callback ran
+        self.history.append(value, kwargs.get('timestamp') or time.time())
+
     def run(self):
+        if self.monitor:
+            # Values arrive through _on_update, nothing to poll
+            self.stop_event.wait()
+            return
         while not self.stop_event.is_set():
             self.spectrum = self.get_spec()
             time.sleep(self.refresh_rate)
 
     def stop(self):
         self.stop_event.set()
+        if self.pv is not None:
+            self.pv.clear_callbacks()
+            self.pv.disconnect()
 
     def get_spec(self):
+        if self.monitor:
+            return self.spectrum if self.spectrum is not None else 0.00
         try:
             spec = epics.caget(self.pv_name)
             spec = float(spec) if spec is not None else 0.00
@@ -110,12 +238,40 @@ class SpectrometreReader(threading.Thread):
 class WavenumberReader:
     """
     Interface for the real Wavemeter Reader.
+    monitor=True keeps the latest value and a short history per channel from PV monitor
+    callbacks, so get_wavenumbers() is a memory lookup instead of four PV.get() round trips.
     """
-    def __init__(self):
+    def __init__(self, monitor=False, pv_factory=None, history=256):
         super().__init__()
         self.wavenumbers = [0.0, 0.0, 0.0, 0.0]
+        self.monitor = monitor
+        self.histories = [TimeSeriesRing(history) for _ in wavenumbers_pv_names]
+        self.listeners = [] # Called as fn(wavenumbers, timestamp) on every monitor update
+        self.pvs = []
+        if monitor:
+            pv_factory = pv_factory or PV
+            self.pvs = [pv_factory(name, callback=self._on_update, auto_monitor=True)
+                        for name in wavenumbers_pv_names]
+
+    def add_listener(self, fn):
+        self.listeners.append(fn)
+
+    def _on_update(self, pvname=None, value=None, **kwargs):
+        """CA monitor callback: stores the value of the channel that changed."""
+        try:
+            i = wavenumbers_pv_names.index(pvname)
+            value = round(float(value), 5)
+        except (ValueError, TypeError):
+            return
+        timestamp = kwargs.get('timestamp') or time.time() # IOC time of the reading when available
+        self.wavenumbers[i] = value
+        self.histories[i].append(value, timestamp)
+        for fn in self.listeners:
+            fn(list(self.wavenumbers), timestamp)
 
     def get_wnum(self, i=1):
+        if self.monitor:
+            return self.wavenumbers[i - 1]
         try:
             return round(float(wavenumbers_pvs[i - 1].get()), 5)
         except Exception as e:
@@ -123,4 +279,15 @@ class WavenumberReader:
             return 0.00000
 
     def get_wavenumbers(self):
-        return [self.get_wnum(k) for k in range(1,5)]
\ No newline at end of file
+        if self.monitor:
+            return list(self.wavenumbers)
+        return [self.get_wnum(k) for k in range(1,5)]
+
+    def get_history(self, i=1, since=None):
+        """(timestamps, values) received for channel i (monitor mode)."""
+        return self.histories[i - 1].arrays(since)
+
+    def stop(self):
+        for pv in self.pvs:
+            pv.clear_callbacks()
+            pv.disconnect()
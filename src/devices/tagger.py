@@ -29,6 +29,63 @@ def flops_to_time(ft):
     return ft * quantization
 
 
+# Columnar batch format returned by get_data(as_array=True).
+# One row per packet: bunch/packet id, channel (-1 = trigger), ToF in seconds
+# since the bunch trigger, and absolute time in seconds since the epoch.
+EVENT_DTYPE = np.dtype([
+    ('bunch_id', np.int64),
+    ('channel', np.int8),
+    ('tof', np.float64),
+    ('timestamp', np.float64),
+])
+
+
+def empty_batch():
+    return np.empty(0, dtype=EVENT_DTYPE)
+
+
+def split_batch(batch):
+    """Returns (batch, triggers, events) like get_data(return_splitted=True)."""
+    is_trigger = batch['channel'] == -1
+    return batch, batch[is_trigger], batch[~is_trigger]
+
+
+def count_new_bunches(bunch_ids, previous_bunch):
+    """
+    Number of bunch id changes along bunch_ids, continuing from previous_bunch.
+    Vectorized form of the `if entry[0] != previous_bunch` check in DAQSystem._daq_loop.
+    """
+    if len(bunch_ids) == 0:
+        return 0
+    return int(bunch_ids[0] != previous_bunch) + int(np.count_nonzero(bunch_ids[1:] != bunch_ids[:-1]))
+
+
+def new_bunch_flags(bunch_ids, previous_bunch):
+    """Per-row form of count_new_bunches: True where the bunch id differs from the previous row's."""
+    flags = np.empty(len(bunch_ids), dtype=bool)
+    if len(bunch_ids):
+        flags[0] = bunch_ids[0] != previous_bunch
+        flags[1:] = bunch_ids[1:] != bunch_ids[:-1]
+    return flags
+
+
+def packets_to_batch(packets, read_time):
+    """
+    Vectorized conversion of raw card packets
+    [packet_number, events, channel, flops since last trigger] into an EVENT_DTYPE array.
+    The card gives no absolute clock, so timestamps are the host read time plus the ToF.
+    """
+    raw = np.asarray(packets, dtype=np.float64).reshape(len(packets), -1)
+    batch = np.empty(len(raw), dtype=EVENT_DTYPE)
+    batch['bunch_id'] = raw[:, 0]
+    batch['channel'] = raw[:, 2]
+    tof = flops_to_time(raw[:, 3])
+    tof[batch['channel'] == -1] = 0.0
+    batch['tof'] = tof
+    batch['timestamp'] = read_time + tof
+    return batch
+
+
 def compute_tof_from_data(data: pd.DataFrame):
     latest_trigger_time = 0
     tofs = []
@@ -81,11 +138,16 @@ class Tagger:
             self.card.stop()
             self.card = None
 
-    def get_data(self, timeout=5, return_splitted=False):
+    def get_data(self, timeout=5, return_splitted=False, as_array=False):
         """
         IF THERE IS NO EVENT IN THE BUNCH, IT GIVES THE TRIGGER
         IF THERE ARE EVENTS, IT WONT GIVE YOU THE TRIGGER.
+
+        With as_array=True the packets are returned as a single EVENT_DTYPE array
+        (see packets_to_batch) instead of a list of lists.
         """
+        if as_array:
+            return self._get_batch(return_splitted)
         # start = time.time()
         last_inp_data = 0
         # while time.time() - start < timeout:
@@ -124,6 +186,18 @@ class Tagger:
         else:
             raise ValueError
 
+    def _get_batch(self, return_splitted=False):
+        status, data = self.card.getPackets()
+        if status == 0:
+            batch = packets_to_batch(data, time.time()) if len(data) else empty_batch()
+        elif status == 1:  # no trigger seen yet
+            batch = empty_batch()
+        else:
+            raise ValueError
+        if return_splitted:
+            return split_batch(batch)
+        return batch
+
     def set_trigger_level(self, level):
         self.trigger_level = level
 
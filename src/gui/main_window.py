@@ -124,7 +124,10 @@ class MainWindow(QMainWindow):
                 params['step_size'],
                 params['stop_mode'],
                 params['stop_val'],
-                params['loops']
+                params['loops'],
+                min_bunches=params['min_bunches'],
+                max_bunches=params['max_bunches'],
+                refinement=params['refinement']
             )
             self.active_display_params = params['display']
 
@@ -138,6 +141,9 @@ class MainWindow(QMainWindow):
                 'step_size': params['step_size'],
                 'stop_mode': params['stop_mode'],
                 'stop_val': params['stop_val'],
+                'min_bunches': params['min_bunches'],
+                'max_bunches': params['max_bunches'],
+                'refinement': params['refinement'],
                 'loops': params['loops']
             })
             self.settings_manager.save_settings()
@@ -254,7 +260,7 @@ class MainWindow(QMainWindow):
         tof_data = None
 
         if self.update_counter % 10 == 0:
-             tof_data = self.daq.tof_buffer if hasattr(self.daq, 'tof_buffer') else []
+             tof_data = self.daq.tof_hist.snapshot()
 
         history = {
             'times': list(self.time_history),
@@ -263,16 +269,7 @@ class MainWindow(QMainWindow):
             'target_wn': list(self.target_wn_history),
             'volt': list(self.volt_history),
             'scan_data': self.daq.scanner.scan_progress,
-            'tof_buffer': tof_data
-        }
-        history = {
-            'times': list(self.time_history),
-            'rate': list(self.rate_history),
-            'wn': list(self.wn_history),
-            'target_wn': list(self.target_wn_history),
-            'volt': list(self.volt_history),
-            'scan_data': self.daq.scanner.scan_progress,
-            'tof_buffer': tof_data
+            'tof_hist': tof_data
         }
         self.plot_widget.update_plots(history)
 
@@ -295,6 +292,9 @@ class MainWindow(QMainWindow):
             'step_size': params['step_size'],
             'stop_mode': params['stop_mode'],
             'stop_val': params['stop_val'],
+            'min_bunches': params['min_bunches'],
+            'max_bunches': params['max_bunches'],
+            'refinement': params['refinement'],
             'loops': params['loops']
         })
         self.settings_manager.save_settings()
@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QDoubleSpinBox,
-                             QDialogButtonBox, QLabel)
+                             QDialogButtonBox, QLabel, QComboBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QSpinBox
 
@@ -54,6 +54,21 @@ class LaserControlDialog(QDialog):
         self.channel_spin.setValue(int(self.settings.get("wavechannel", 3)))
         self.form_layout.addRow("Wavemeter Channel:", self.channel_spin)
 
+        # Control Mode
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["fixed", "model", "server"])
+        self.mode_combo.setCurrentText(self.settings.get("control_mode", "fixed"))
+        self.mode_combo.setToolTip("fixed: fine/coarse steps. model: jump using the learned wavenumber-vs-position relation.\n"
+                                   "server: the laser server runs the loop next to the hardware (one call per target).")
+        self.form_layout.addRow("Control Mode:", self.mode_combo)
+
+        # Model Max Jump
+        self.max_jump_spin = QDoubleSpinBox()
+        self.max_jump_spin.setRange(0.001, 25.0)
+        self.max_jump_spin.setDecimals(3)
+        self.max_jump_spin.setValue(self.settings.get("model_max_jump", 1.0))
+        self.form_layout.addRow("Max Model Jump (mm):", self.max_jump_spin)
+
         self.layout.addLayout(self.form_layout)
 
         # Buttons
@@ -63,11 +78,15 @@ class LaserControlDialog(QDialog):
         self.layout.addWidget(self.buttons)
 
     def get_settings(self):
-        return {
+        settings = self.settings.copy() # Keep keys without a widget (e.g. model_initial_slope)
+        settings.update({
             "tolerance": self.tolerance_spin.value(),
             "step_fine": self.fine_step_spin.value(),
             "step_coarse": self.coarse_step_spin.value(),
             "poll_interval": self.poll_spin.value(),
             "required_stable_samples": self.stable_samples_spin.value(),
-            "wavechannel": self.channel_spin.value()
-        }
+            "wavechannel": self.channel_spin.value(),
+            "control_mode": self.mode_combo.currentText(),
+            "model_max_jump": self.max_jump_spin.value()
+        })
+        return settings
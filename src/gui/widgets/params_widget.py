@@ -1,9 +1,11 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QGroupBox,
-                             QLabel, QDoubleSpinBox, QComboBox, QPushButton)
+                             QLabel, QDoubleSpinBox, QComboBox, QPushButton, QSpinBox,
+                             QCheckBox)
 from PyQt5.QtCore import pyqtSignal
 
 class ParamsWidget(QWidget):
     settings_requested = pyqtSignal()
+    STOP_MODES = ['bunches', 'time', 'precision'] # Same order as the combo box
 
     def __init__(self, parent=None, settings_config=None):
         super().__init__(parent)
@@ -51,40 +53,80 @@ class ParamsWidget(QWidget):
         # Stop Mode
         layout_params.addWidget(QLabel("Stop Condition:"), 3, 0)
         self.combo_mode = QComboBox()
-        self.combo_mode.addItems(["Target Bunches", "Fixed Time (s)"])
+        self.combo_mode.addItems(["Target Bunches", "Fixed Time (s)", "Target Precision (rel.)"])
         # Set default mode
         mode = defaults.get("stop_mode", "bunches")
-        self.combo_mode.setCurrentIndex(0 if mode == "bunches" else 1)
+        self.combo_mode.setCurrentIndex(self.STOP_MODES.index(mode) if mode in self.STOP_MODES else 0)
+        self.combo_mode.currentIndexChanged.connect(self.update_mode_widgets)
         layout_params.addWidget(self.combo_mode, 3, 1)
 
         # Stop Value
         layout_params.addWidget(QLabel("Target Value:"), 4, 0)
         self.spin_stop_val = QDoubleSpinBox()
-        self.spin_stop_val.setRange(0.1, 1000000)
+        self.spin_stop_val.setRange(0.001, 1000000)
         self.spin_stop_val.setValue(defaults.get("stop_val", 100))
-        self.spin_stop_val.setDecimals(1)
+        self.spin_stop_val.setDecimals(3)
         layout_params.addWidget(self.spin_stop_val, 4, 1)
 
+        # Bunch limits (precision mode)
+        self.lbl_min_bunches = QLabel("Min Bunches:")
+        layout_params.addWidget(self.lbl_min_bunches, 5, 0)
+        self.spin_min_bunches = QSpinBox()
+        self.spin_min_bunches.setRange(0, 100000000)
+        self.spin_min_bunches.setValue(int(defaults.get("min_bunches", 100)))
+        layout_params.addWidget(self.spin_min_bunches, 5, 1)
+
+        self.lbl_max_bunches = QLabel("Max Bunches (0 = no limit):")
+        layout_params.addWidget(self.lbl_max_bunches, 6, 0)
+        self.spin_max_bunches = QSpinBox()
+        self.spin_max_bunches.setRange(0, 100000000)
+        self.spin_max_bunches.setValue(int(defaults.get("max_bunches", 10000)))
+        layout_params.addWidget(self.spin_max_bunches, 6, 1)
+
         # Loops
-        layout_params.addWidget(QLabel("Loops:"), 5, 0)
-        self.spin_loops = QDoubleSpinBox() # Using Double to allow integer but re-using style if easier, or QSpinBox
-        from PyQt5.QtWidgets import QSpinBox
+        layout_params.addWidget(QLabel("Loops:"), 7, 0)
         self.spin_loops = QSpinBox()
         self.spin_loops.setRange(1, 100)
         self.spin_loops.setValue(defaults.get("loops", 1))
-        layout_params.addWidget(self.spin_loops, 5, 1)
+        layout_params.addWidget(self.spin_loops, 7, 1)
+
+        # Adaptive refinement: finer bins around peaks after the coarse grid (thresholds from settings)
+        self.refinement = dict(defaults.get("refinement", {}))
+        self.chk_refine = QCheckBox("Refine around peaks, step (cm^-1):")
+        self.chk_refine.setChecked(self.refinement.get("passes", 0) > 0)
+        layout_params.addWidget(self.chk_refine, 8, 0)
+        self.spin_fine_step = QDoubleSpinBox()
+        self.spin_fine_step.setRange(0.000001, 1000)
+        self.spin_fine_step.setDecimals(6)
+        self.spin_fine_step.setSingleStep(0.000001)
+        self.spin_fine_step.setValue(self.refinement.get("fine_step", 0.1))
+        layout_params.addWidget(self.spin_fine_step, 8, 1)
 
         # Settings Button
         self.btn_settings = QPushButton("Laser Settings...")
         self.btn_settings.clicked.connect(self.settings_requested.emit)
-        layout_params.addWidget(self.btn_settings, 6, 0, 1, 2) # Span 2 columns
+        layout_params.addWidget(self.btn_settings, 9, 0, 1, 2) # Span 2 columns
 
         layout.addWidget(grp_params)
 
         self.param_widgets = [
             self.spin_start_wn, self.spin_end_wn, self.spin_step,
-            self.combo_mode, self.spin_stop_val, self.spin_loops, self.btn_settings
+            self.combo_mode, self.spin_stop_val, self.spin_min_bunches, self.spin_max_bunches,
+            self.spin_loops, self.chk_refine, self.spin_fine_step, self.btn_settings
         ]
+        self.update_mode_widgets()
+
+    def update_mode_widgets(self):
+        precision = self.STOP_MODES[self.combo_mode.currentIndex()] == 'precision'
+        for w in (self.lbl_min_bunches, self.spin_min_bunches, self.lbl_max_bunches, self.spin_max_bunches):
+            w.setVisible(precision)
+        self.spin_stop_val.setToolTip("Relative uncertainty of events/bunch, e.g. 0.05 for 5 %" if precision else "")
+        if precision:
+            if self.spin_stop_val.value() >= 1:
+                self.spin_stop_val.setValue(0.1) # A leftover bunch count or time means nothing here
+            self.spin_stop_val.setRange(0.001, 0.999)
+        else:
+            self.spin_stop_val.setRange(0.001, 1000000)
 
     def set_enabled(self, enabled):
         for w in self.param_widgets:
@@ -100,8 +142,27 @@ class ParamsWidget(QWidget):
         stop_val = self.spin_stop_val.value()
         loops = self.spin_loops.value()
 
-        mode_idx = self.combo_mode.currentIndex()
-        stop_mode = 'bunches' if mode_idx == 0 else 'time'
+        min_bunches = self.spin_min_bunches.value()
+        max_bunches = self.spin_max_bunches.value()
+
+        stop_mode = self.STOP_MODES[self.combo_mode.currentIndex()]
+
+        refinement = dict(self.refinement)
+        refinement["fine_step"] = self.spin_fine_step.value()
+        refinement["passes"] = max(refinement.get("passes", 0), 1) if self.chk_refine.isChecked() else 0
+
+        display = {
+            "Start WN": f"{start_wn:.6f} cm^-1",
+            "End WN": f"{end_wn:.6f} cm^-1",
+            "Step": f"{step_size:.6f} cm^-1",
+            "Mode": stop_mode,
+            "Value": f"{stop_val}",
+            "Loops": f"{loops}"
+        }
+        if stop_mode == 'precision':
+            display["Bunches"] = f"{min_bunches} - {max_bunches or 'no limit'}"
+        if refinement["passes"]:
+            display["Refinement"] = f"{refinement['passes']} pass(es), step {refinement['fine_step']:.6f} cm^-1"
 
         return {
             'start_wn': start_wn,
@@ -109,14 +170,9 @@ class ParamsWidget(QWidget):
             'step_size': step_size,
             'stop_mode': stop_mode,
             'stop_val': stop_val,
+            'min_bunches': min_bunches,
+            'max_bunches': max_bunches,
             'loops': loops,
-            # For display/tooltip
-            'display': {
-                "Start WN": f"{start_wn:.6f} cm^-1",
-                "End WN": f"{end_wn:.6f} cm^-1",
-                "Step": f"{step_size:.6f} cm^-1",
-                "Mode": stop_mode,
-                "Value": f"{stop_val}",
-                "Loops": f"{loops}"
-            }
+            'refinement': refinement,
+            'display': display # For display/tooltip
         }
@@ -170,8 +170,18 @@ class PlotWidget(QWidget):
             self.curves['volt'].setData(times, history['volt'])
 
         if 'tof' in self.curves:
+            tof_hist = history.get('tof_hist')
             tof_data = history.get('tof_buffer')
-            if tof_data is not None: # Only update if provided
+            if tof_hist is not None: # Live: pre-binned counts from the DAQ
+                in_range = int(tof_hist['counts'].sum())
+                if in_range > 0:
+                    edges = tof_hist['edges']
+                    density = tof_hist['counts'] / (in_range * np.diff(edges))
+                    self.curves['tof'].setData(edges, density)
+                else:
+                    self.curves['tof'].setData([], [])
+                self.plot_items['tof'].setTitle(f"ToF Histogram ({tof_hist['total']} events)")
+            elif tof_data is not None: # Offline: raw ToF values, only update if provided
                 if len(tof_data) > 0:
                     counts, bin_edges = np.histogram(tof_data, bins=50, density=True)
                     self.curves['tof'].setData(bin_edges, counts)
@@ -22,6 +22,8 @@ class LEDIndicator(QWidget):
 
 
 class StatusWidget(QWidget):
+    STALE_AFTER_S = 1.0 # Flag wavemeter readings older than this
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.init_ui()
@@ -79,7 +81,11 @@ class StatusWidget(QWidget):
         target_wn = daq_status['target_wn']
         measured_wn = daq_status['measured_wn']
 
-        self.lbl_status_wn.setText(f"Measured: {measured_wn:.6f} cm^-1\nTarget: {target_wn:.6f} cm^-1")
+        measured_text = f"Measured: {measured_wn:.6f} cm^-1"
+        age = daq_status.get('measured_wn_age')
+        if age is not None and age > self.STALE_AFTER_S:
+            measured_text += f" (stale: {age:.1f} s)"
+        self.lbl_status_wn.setText(f"{measured_text}\nTarget: {target_wn:.6f} cm^-1")
 
         if active_params_text:
              self.lbl_scan_info.setToolTip(active_params_text)
@@ -111,15 +117,8 @@ class StatusWidget(QWidget):
                 pct = int((daq_status['bins_completed'] / daq_status['total_bins']) * 100)
                 self.progress_bar.setValue(pct)
 
-            if daq_status['stop_value'] > 0:
-                if daq_status['stop_mode'] == 'events':
-                     bin_pct = (daq_status['accumulated'] / daq_status['stop_value']) * 100
-                     self.bin_progress.setValue(int(min(bin_pct, 100)))
-                elif daq_status['stop_mode'] == 'bunches':
-                     bin_pct = (daq_status['accumulated_bunches'] / daq_status['stop_value']) * 100
-                     self.bin_progress.setValue(int(min(bin_pct, 100)))
-                else:
-                     self.bin_progress.setValue(0)
+            # Fraction of the bin's stop condition (events, bunches, time or precision)
+            self.bin_progress.setValue(int(daq_status.get('bin_progress', 0.0) * 100))
         else:
             self.lbl_progress.setText("Status: Idle")
             self.led.set_color("red") # Off/Idle
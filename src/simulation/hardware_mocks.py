@@ -92,6 +92,49 @@ class MockPIGCSDevice:
                 else:
                     self.position[a] += direction * step
 
+class MockLaserServerInterface:
+    """
+    Stand-in for LASERLABCOMPUTER/laser_server.py's LaserServerInterface, driving a MockPIGCSDevice.
+    Exposes the same remote methods, so RPC transports can be tested and benchmarked locally.
+    """
+    def __init__(self, pi_device=None, command_delay=0.0, epics_params: dict = {}):
+        self.pi = pi_device or MockPIGCSDevice("Simulated_PI", initialization_params={"move_speed": 1000.0})
+        self.pi.SVO(1, True)
+        self.command_delay = command_delay # Emulated pause after each serial command
+        self.lock = threading.Lock()
+        self.epics = MockEpicsClient(self.pi, initialization_params=epics_params)
+        self.go_to_runner = None
+
+    def MOV(self, axis, target):
+        with self.lock:
+            self.pi.MOV(axis, float(target))
+            time.sleep(self.command_delay)
+        return True
+
+    def qPOS(self, axis):
+        with self.lock:
+            val = self.pi.qPOS(axis)[axis]
+            time.sleep(self.command_delay)
+        return float(val)
+
+    def ServerWaitOnTarget(self, axis):
+        return True
+
+    def _runner(self):
+        if self.go_to_runner is None:
+            from src.control.server_go_to import GoToRunner # Imports LaserController, which imports this module
+            self.go_to_runner = GoToRunner(self, self.epics)
+        return self.go_to_runner
+
+    def go_to(self, target_wn, params=None, timeout_s=120.0):
+        return self._runner().go_to(target_wn, params, timeout_s)
+
+    def go_to_status(self):
+        return self._runner().status()
+
+    def go_to_abort(self):
+        return self._runner().abort()
+
 # Mock epics
 class MockEpicsClient:
     """
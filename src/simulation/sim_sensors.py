@@ -38,6 +38,70 @@ class MockMultimeter:
     def get_voltage(self):
         return self.getVoltage()
 
+class MockSerialMultimeter:
+    """
+    Stand-in for the serial port of an HP 34401A, for HP_Multimeter(serial_device=...).
+    Answers the SCPI commands the driver sends (MEAS?, CONF, SAMP:COUN, TRIG, INIT,
+    READ?, FETC?); a burst takes samples * reading_time like the real meter.
+    """
+    def __init__(self, initialization_params: dict = {}):
+        self.noise_level = initialization_params.get("noise_level", 0.05)
+        # Seconds per reading; if not given it follows VOLT:DC:NPLC at 50 Hz
+        self.fixed_reading_time = initialization_params.get("reading_time")
+        self.reading_time = self.fixed_reading_time or 0.02
+        self.sample_count = 1
+        self.trigger_delay = 0.0
+        self.buffer = []
+        self.responses = []
+        self.commands = []
+        self.start_time = time.time()
+
+    def _reading(self):
+        elapsed = time.time() - self.start_time
+        return 2.5 + 2.0 * math.sin(elapsed * 0.5) + random.uniform(-self.noise_level, self.noise_level)
+
+    def _acquire(self):
+        self.buffer = []
+        time.sleep(self.trigger_delay)
+        for _ in range(self.sample_count):
+            time.sleep(self.reading_time)
+            self.buffer.append(self._reading())
+
+    def write(self, data):
+        command = data.decode().strip().upper()
+        self.commands.append(command)
+        if command == "*RST":
+            self.sample_count, self.trigger_delay = 1, 0.0
+        elif command == "*IDN?":
+            self.responses.append("HEWLETT-PACKARD,34401A,SIMULATED,VER-2.0")
+        elif command.startswith("MEAS:VOLT:DC?"):
+            time.sleep(self.reading_time)
+            self.responses.append(f"{self._reading():+.8E}")
+        elif command.startswith("VOLT:DC:NPLC"):
+            if self.fixed_reading_time is None:
+                self.reading_time = float(command.split()[1]) / 50.0
+        elif command.startswith("SAMP:COUN"):
+            self.sample_count = max(1, int(command.split()[1]))
+        elif command.startswith("TRIG:DEL"):
+            self.trigger_delay = float(command.split()[1])
+        elif command == "INIT":
+            self._acquire()
+        elif command == "READ?":
+            self._acquire()
+            self.responses.append(",".join(f"{v:+.8E}" for v in self.buffer))
+        elif command == "FETC?":
+            self.responses.append(",".join(f"{v:+.8E}" for v in self.buffer))
+        return len(data)
+
+    def readline(self):
+        # Commands without a response time out like the real port, just without the wait
+        if not self.responses:
+            return b""
+        return (self.responses.pop(0) + "\r\n").encode()
+
+    def close(self):
+        pass
+
 class MockSpectrometreReader(threading.Thread):
     """
     Simulates the EPICS Spectrometer Reader.
@@ -85,7 +149,10 @@ class MockWavenumberReader:
         if self.source:
              # Check channel if relevant, but for now we just map channel 1 to the source
              if i == 1:
-                if hasattr(self.source, 'get_wavenumber'):
+                if hasattr(self.source, 'read_wavenumber'):
+                    # Direct read: get_wavenumber may itself be served from this reader via the sensor hub
+                    base = self.source.read_wavenumber()
+                elif hasattr(self.source, 'get_wavenumber'):
                     base = self.source.get_wavenumber()
                 elif hasattr(self.source, 'get_wavelength'):
                     wl = self.source.get_wavelength()
@@ -101,4 +168,42 @@ class MockWavenumberReader:
         return base
 
     def get_wavenumbers(self):
-        return [self.get_wnum(i) for i in range(1, 5)]
\ No newline at end of file
+        return [self.get_wnum(i) for i in range(1, 5)]
+
+
+class MockPV:
+    """
+    Stand-in for epics.PV with monitor callbacks. put() plays the role of the IOC
+    pushing a new value: it updates the PV and calls the callbacks like a CA monitor.
+    """
+    def __init__(self, pvname, callback=None, auto_monitor=True, value=None):
+        self.pvname = pvname
+        self.value = value
+        self.auto_monitor = auto_monitor
+        self.connected = True
+        self.callbacks = {}
+        self.get_count = 0
+        if callback is not None:
+            self.add_callback(callback)
+
+    def add_callback(self, callback):
+        index = len(self.callbacks) + 1
+        self.callbacks[index] = callback
+        return index
+
+    def clear_callbacks(self):
+        self.callbacks = {}
+
+    def disconnect(self):
+        self.connected = False
+
+    def get(self):
+        self.get_count += 1
+        return self.value
+
+    def put(self, value, timestamp=None):
+        self.value = value
+        if self.auto_monitor and self.connected:
+            for callback in list(self.callbacks.values()):
+                callback(pvname=self.pvname, value=value,
+                         timestamp=timestamp if timestamp is not None else time.time())
@@ -2,6 +2,8 @@ import time
 import random
 import numpy as np
 
+from src.devices.tagger import EVENT_DTYPE, empty_batch, split_batch
+
 class MockTagger:
     """
     Simulates a Time Tagger device generating data at 50 Hz.
@@ -47,16 +49,31 @@ class MockTagger:
         self.started = False
         print("[SIM] Tagger stopped.")
 
-    def get_data(self, timeout=5, return_splitted=False):
+    def get_data(self, timeout=5, return_splitted=False, as_array=False):
         """
         Returns data in the exact format of the real Tagger wrapper:
         List of [packet_num, events, channel, relative_time, absolute_time]
+
+        With as_array=True the same packets are returned as one EVENT_DTYPE array.
         """
+        batch = self._generate_batch()
+
+        if as_array:
+            if return_splitted:
+                return split_batch(batch)
+            return batch
+
+        new_data = [[bunch_id, 0, channel, tof, ts] for bunch_id, channel, tof, ts in batch.tolist()]
+        if return_splitted:
+            new_triggers = [d for d in new_data if d[2] == -1]
+            new_events = [d for d in new_data if d[2] != -1]
+            return new_data, new_triggers, new_events
+        return new_data
+
+    def _generate_batch(self):
         if not self.started:
             time.sleep(0.01)
-            if return_splitted:
-                return [], [], []
-            return []
+            return empty_batch()
 
         current_time = time.time()
 
@@ -66,68 +83,47 @@ class MockTagger:
         # If we are polling faster than 50Hz, wait briefly and return nothing
         if time_since_last < self.period:
             time.sleep(0.001)
-            if return_splitted:
-                return [], [], []
-            return []
+            return empty_batch()
 
         # 2. Generate all bunches that "happened" since the last call
         # (This logic handles cases where the GUI lags slightly)
         num_new_bunches = int(time_since_last / self.period)
 
-        new_data = []
-        new_triggers = []
-        new_events = []
-
-        for _ in range(num_new_bunches):
-            # Advance the theoretical trigger time by exactly 20ms
-            self.last_trigger_time += self.period
-            trigger_ts = self.last_trigger_time
-
-            # --- Generate Trigger Event (Channel -1) ---
-            # Format: [packet_num, events, channel, relative_time, absolute_time]
-            self.global_packet_counter += 1
-            trigger_entry = [self.global_packet_counter, 0, -1, 0.0, trigger_ts]
-            new_data.append(trigger_entry)
-            new_triggers.append(trigger_entry)
-
-            # --- Generate Photon Events (Poisson) ---
-            num_events = np.random.poisson(self.mean_events_per_bunch)
-
-            if num_events > 0:
-                # Distribute events among peaks based on weights
-                peak_weights = [p['weight'] for p in self.peaks]
-                # Normalize weights to sum to 1.0
-                total_w = sum(peak_weights)
-                probs = [w / total_w for w in peak_weights]
-
-                # Determine how many events go to each peak
-                counts_per_peak = np.random.multinomial(num_events, probs)
-
-                all_delays = []
-                for i, count in enumerate(counts_per_peak):
-                    if count > 0:
-                        peak = self.peaks[i]
-                        d = np.random.normal(peak['mean'], peak['std'], count)
-                        all_delays.extend(d)
-
-                delays = np.array(all_delays)
-
-                # Filter to ensure they are within the 20ms window and positive
-                valid_mask = (delays > 0) & (delays < 0.020)
-                delays = np.sort(delays[valid_mask])
-
-                for delay in delays:
-                    # User requested only one channel (Channel 1)
-                    channel = 2
-                    absolute_ts = trigger_ts + delay
-
-                    event_entry = [self.global_packet_counter, 0, channel, delay, absolute_ts]
-                    new_data.append(event_entry)
-                    new_events.append(event_entry)
-
-        if return_splitted:
-            return new_data, new_triggers, new_events
-        return new_data
+        # Trigger times advance by exactly one period per bunch
+        trigger_ts = self.last_trigger_time + self.period * np.arange(1, num_new_bunches + 1)
+        bunch_ids = self.global_packet_counter + np.arange(1, num_new_bunches + 1, dtype=np.int64)
+        self.last_trigger_time = trigger_ts[-1]
+        self.global_packet_counter = int(bunch_ids[-1])
+
+        # --- Generate Photon Events (Poisson), distributed among peaks by weight ---
+        counts = np.random.poisson(self.mean_events_per_bunch, num_new_bunches)
+        event_bunch = np.repeat(np.arange(num_new_bunches), counts)
+
+        weights = np.array([p['weight'] for p in self.peaks])
+        means = np.array([p['mean'] for p in self.peaks])
+        stds = np.array([p['std'] for p in self.peaks])
+        peak_idx = np.random.choice(len(self.peaks), size=len(event_bunch), p=weights / weights.sum())
+        delays = np.random.normal(means[peak_idx], stds[peak_idx])
+
+        # Filter to ensure they are within the 20ms window and positive
+        valid_mask = (delays > 0) & (delays < 0.020)
+        event_bunch = event_bunch[valid_mask]
+        delays = delays[valid_mask]
+
+        # Each bunch: its trigger (Ch -1) first, then its events (Ch 2) sorted by delay
+        n_events = len(delays)
+        row_bunch = np.concatenate([np.arange(num_new_bunches), event_bunch])
+        row_delay = np.concatenate([np.zeros(num_new_bunches), delays])
+        is_event = np.concatenate([np.zeros(num_new_bunches, dtype=bool), np.ones(n_events, dtype=bool)])
+        order = np.lexsort((row_delay, is_event, row_bunch))
+
+        batch = np.empty(num_new_bunches + n_events, dtype=EVENT_DTYPE)
+        batch['bunch_id'] = bunch_ids[row_bunch[order]]
+        # User requested only one channel (Channel 2 on the card)
+        batch['channel'] = np.where(is_event[order], 2, -1)
+        batch['tof'] = row_delay[order]
+        batch['timestamp'] = trigger_ts[row_bunch[order]] + row_delay[order]
+        return batch
 
     # --- Dummy Methods to Satisfy Interface ---
     def set_trigger_level(self, level): pass
@@ -3,6 +3,12 @@ import csv
 import os
 import numpy as np
 
+from src.control.storage import load_records
+from src.control.data_saver import RECORD_DTYPE, EVENT_RECORD_DTYPE, SNAPSHOT_DTYPE
+
+# Data file extensions tried next to a *_meta.json, in order
+DATA_EXTENSIONS = [".csv", ".npy", ".h5"]
+
 class DataLoader:
     def __init__(self):
         pass
@@ -23,26 +29,61 @@ class DataLoader:
         base_dir = os.path.dirname(json_path)
         filename = os.path.basename(json_path)
 
-        if filename.endswith("_meta.json"):
-            csv_filename = filename.replace("_meta.json", ".csv")
-        else:
+        if not filename.endswith("_meta.json"):
              # Fallback or strict requirement? Let's try to guess or just fail
              # For now, let's assume standard naming.
              raise ValueError("Invalid metadata filename format. Expected *_meta.json")
 
-        csv_path = os.path.join(base_dir, csv_filename)
+        data_path = None
+        for extension in DATA_EXTENSIONS:
+            candidate = os.path.join(base_dir, filename.replace("_meta.json", extension))
+            if os.path.exists(candidate):
+                data_path = candidate
+                break
 
-        if not os.path.exists(csv_path):
+        if data_path is None:
              # Try checking for final_scan_... too if needed, but per requirements, start with standard
-             raise FileNotFoundError(f"Associated data file not found: {csv_path}")
-
-        data = self.process_data(csv_path)
+             raise FileNotFoundError(f"Associated data file not found: {os.path.join(base_dir, filename.replace('_meta.json', '.csv'))}")
+
+        if metadata.get("layout") == "normalized":
+            base, extension = os.path.splitext(data_path)
+            snapshot_path = f"{base}_snapshots{extension}"
+            data = self.process_records(self.join_snapshots(
+                load_records(data_path, EVENT_RECORD_DTYPE),
+                load_records(snapshot_path, SNAPSHOT_DTYPE)
+            ))
+        else:
+            data = self.process_data(data_path)
         return metadata, data
 
+    def join_snapshots(self, events, snapshots):
+        """
+        Rebuilds full RECORD_DTYPE rows from a normalized scan: each event row gets the
+        sensor values of the snapshot it references. Event timestamps are the snapshot's.
+        """
+        records = np.empty(len(events), dtype=RECORD_DTYPE)
+        order = np.argsort(snapshots['snapshot_id'], kind='stable')
+        ids = snapshots['snapshot_id'][order]
+        pos = np.searchsorted(ids, events['snapshot_id'])
+        pos = np.clip(pos, 0, max(len(ids) - 1, 0))
+        if len(events) and (len(ids) == 0 or np.any(ids[pos] != events['snapshot_id'])):
+            raise ValueError("Event rows reference snapshots missing from the snapshot table.")
+        matched = snapshots[order[pos]] if len(events) else snapshots[:0]
+
+        for name in ('bunch_id', 'channel', 'tof'):
+            records[name] = events[name]
+        for name in ('timestamp', 'voltage', 'spectrum_peak', 'wavemeter_wn', 'laser_target_wn', 'scan_bin_index'):
+            records[name] = matched[name]
+        return records
+
     def process_data(self, csv_path):
         """
         Parses the CSV file and reconstructs history arrays for plotting.
+        Binary scans (.npy/.h5) are loaded as record arrays and processed vectorized.
         """
+        if not csv_path.endswith(".csv"):
+            return self.process_records(load_records(csv_path))
+
         times = []
         wn_history = []
         target_wn_history = []
@@ -192,8 +233,8 @@ class DataLoader:
                 bin_idx = int(row['scan_bin_index'])
                 wn_target = float(row['laser_target_wn'])
 
-                # Initialize bin tracking
-                if bin_idx not in scan_bins:
+                # Initialize bin tracking (rows no bin counted have a negative index)
+                if bin_idx >= 0 and bin_idx not in scan_bins:
                     scan_bins[bin_idx] = {'events': 0, 'bunches': 0, 'wn': wn_target}
 
                 # Bunch transition logic
@@ -266,3 +307,45 @@ class DataLoader:
             'scan_data': final_scan_data,
             'tof_buffer': tof_buffer
         }
+
+    def process_records(self, records):
+        """
+        Vectorized equivalent of process_data for a structured record array
+        (RECORD_DTYPE fields), as written by the binary storage backends.
+        """
+        empty = {'times': [], 'rate': [], 'wn': [], 'target_wn': [], 'volt': [], 'scan_data': [], 'tof_buffer': []}
+        if len(records) == 0:
+            return empty
+
+        rel_time = records['timestamp'] - records['timestamp'][0]
+        bunch_ids = records['bunch_id']
+        is_event = records['channel'] == 2
+
+        # A bunch is a run of consecutive rows with the same bunch_id; its values come from its last row
+        run_end = np.flatnonzero(np.append(bunch_ids[1:] != bunch_ids[:-1], True))
+        events_cum = np.cumsum(is_event)
+        events_per_bunch = np.diff(np.concatenate(([0], events_cum[run_end])))
+
+        # Scan bins, sorted by bin index, named after the target of their first row
+        bin_idx = records['scan_bin_index']
+        bins, first_row, bin_of_row = np.unique(bin_idx, return_index=True, return_inverse=True)
+        bin_of_run = bin_of_row[run_end]
+        bin_events = np.bincount(bin_of_run, weights=events_per_bunch, minlength=len(bins))
+        bin_bunches = np.bincount(bin_of_run, minlength=len(bins))
+
+        final_scan_data = []
+        for b in range(len(bins)):
+            if bins[b] < 0:
+                continue # SCAN_BIN_EARLY / SCAN_BIN_OVERSHOOT rows, not counted in any bin
+            rate = float(bin_events[b] / bin_bunches[b]) if bin_bunches[b] > 0 else 0
+            final_scan_data.append((float(records['laser_target_wn'][first_row[b]]), rate, int(bin_events[b]), int(bin_bunches[b])))
+
+        return {
+            'times': rel_time[run_end].tolist(),
+            'rate': events_per_bunch.tolist(),
+            'wn': records['wavemeter_wn'][run_end].tolist(),
+            'target_wn': records['laser_target_wn'][run_end].tolist(),
+            'volt': records['voltage'][run_end].tolist(),
+            'scan_data': final_scan_data,
+            'tof_buffer': records['tof'][is_event].tolist()
+        }
@@ -11,16 +11,68 @@ class SettingsManager:
             "step_size": 0.5,
             "stop_mode": "bunches",
             "stop_val": 100,
-            "loops": 1
+            "min_bunches": 100,
+            "max_bunches": 10000,
+            "loops": 1,
+            "refinement": {
+                "passes": 0,
+                "fine_step": 0.1,
+                "rate_threshold": None,
+                "gradient_threshold": None,
+                "significance": 3.0
+            }
         },
         "gui_settings": {
             "window_width": 1200,
             "window_height": 800,
             "refresh_rate_ms": 500
         },
+        "daq_settings": {
+            "batch_mode": False,
+            "reader_thread": False,
+            "ring_capacity": 1048576,
+            "acquisition_process": False,
+            "shm_segments": 64,
+            "shm_segment_rows": 65536,
+            "drift_check_interval": 0.1,
+            "pipelined_scan": False,
+            "laser_transport": "xmlrpc",
+            "laser_binary_port": 8001,
+            "async_io": False,
+            "io_timeout": 5.0,
+            "epics_monitor": False,
+            "multimeter_burst": {
+                "samples": 0,
+                "nplc": 1,
+                "line_frequency": 50.0,
+                "history": 4096
+            },
+            "sensor_hub": {
+                "voltage_interval": 0.5,
+                "spectrum_interval": 0.2,
+                "wavemeter_interval": 0.05,
+                "position_interval": 0.0,
+                "history": 1024,
+                "event_interpolation": "linear",
+                "annotation_holdback_s": 1.0
+            },
+            "tof_histogram": {
+                "bins": 200,
+                "tof_min": 0.0,
+                "tof_max": 0.02,
+                "scale": "linear"
+            }
+        },
         "data_settings": {
             "default_save_dir": "data",
-            "auto_save": True
+            "auto_save": True,
+            "storage_format": "csv",
+            "normalized": False,
+            "durability": {
+                "mode": "batch",
+                "interval_s": 5.0,
+                "interval_mb": 64.0
+            }
         },
         "simulation_settings": {
             "tagger": {
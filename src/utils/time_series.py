@@ -0,0 +1,45 @@
+import threading
+import numpy as np
+
+class TimeSeriesRing:
+    """
+    Fixed-capacity ring of (timestamp, value) samples. The newest sample is a
+    memory lookup; older ones are overwritten once the ring is full.
+    """
+    def __init__(self, capacity=256):
+        self.capacity = int(capacity)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self.count = 0 # Samples ever written
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, value, timestamp):
+        with self.lock:
+            i = self.count % self.capacity
+            self.timestamps[i] = timestamp
+            self.values[i] = value
+            self.count += 1
+
+    def latest(self):
+        """(value, timestamp) of the newest sample, or (None, 0.0) if empty."""
+        with self.lock:
+            if self.count == 0:
+                return None, 0.0
+            i = (self.count - 1) % self.capacity
+            return float(self.values[i]), float(self.timestamps[i])
+
+    def arrays(self, since=None):
+        """Copies of (timestamps, values) in time order, optionally only samples after `since`."""
+        with self.lock:
+            n = len(self)
+            start = self.count - n
+            idx = np.arange(start, self.count) % self.capacity
+            timestamps = self.timestamps[idx]
+            values = self.values[idx]
+        if since is not None:
+            keep = timestamps > since
+            timestamps, values = timestamps[keep], values[keep]
+        return timestamps, values
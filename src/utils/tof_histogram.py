@@ -0,0 +1,101 @@
+import threading
+import numpy as np
+
+class ToFHistogram:
+    """
+    Streaming time-of-flight histogram with fixed bin edges.
+    Batches are added with np.bincount, so the cost of an update depends on the batch,
+    not on the length of the scan. Counts are kept for the whole scan and for the
+    current scan bin; readers get copies through snapshot().
+    """
+    SCALES = ('linear', 'log')
+
+    def __init__(self, n_bins=200, tof_min=0.0, tof_max=0.020, scale='linear'):
+        if scale not in self.SCALES:
+            raise ValueError(f"Unknown histogram scale '{scale}'. Options: {self.SCALES}")
+        if tof_max <= tof_min:
+            raise ValueError("tof_max must be larger than tof_min.")
+        if scale == 'log' and tof_min <= 0:
+            raise ValueError("Log bins need tof_min > 0.")
+
+        self.n_bins = int(n_bins)
+        self.tof_min = float(tof_min)
+        self.tof_max = float(tof_max)
+        self.scale = scale
+
+        if scale == 'log':
+            self.edges = np.geomspace(self.tof_min, self.tof_max, self.n_bins + 1)
+            self._offset = np.log(self.tof_min)
+            self._width = (np.log(self.tof_max) - self._offset) / self.n_bins
+        else:
+            self.edges = np.linspace(self.tof_min, self.tof_max, self.n_bins + 1)
+            self._offset = self.tof_min
+            self._width = (self.tof_max - self.tof_min) / self.n_bins
+
+        self.lock = threading.Lock()
+        self.scan_bin_index = None
+        self.reset()
+
+    def _bin_indices(self, tofs):
+        if self.scale == 'log':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.log(tofs)
+        else:
+            values = tofs
+        return np.floor((values - self._offset) / self._width)
+
+    def add(self, tofs, scan_bin_index=None):
+        """
+        Adds an array of ToF values. A change of scan_bin_index starts a new per-bin histogram.
+        Values outside [tof_min, tof_max) count as under-/overflow.
+        """
+        tofs = np.asarray(tofs, dtype=np.float64)
+        idx = self._bin_indices(tofs)
+        # NaN compares false on both sides and lands in neither under- nor overflow
+        under = int(np.count_nonzero(idx < 0))
+        over = int(np.count_nonzero(idx >= self.n_bins))
+        counts = np.bincount(idx[(idx >= 0) & (idx < self.n_bins)].astype(np.intp), minlength=self.n_bins)
+
+        with self.lock:
+            if scan_bin_index is not None and scan_bin_index != self.scan_bin_index:
+                self._reset_bin()
+                self.scan_bin_index = scan_bin_index
+            self.counts += counts
+            self.bin_counts += counts
+            self.underflow += under
+            self.overflow += over
+            self.total += len(tofs)
+
+    def _reset_bin(self):
+        self.bin_counts = np.zeros(self.n_bins, dtype=np.int64)
+
+    def reset_bin(self):
+        """Clears the histogram of the current scan bin only."""
+        with self.lock:
+            self._reset_bin()
+
+    def reset(self):
+        """Clears all counts, e.g. at the start of a scan."""
+        with self.lock:
+            self.counts = np.zeros(self.n_bins, dtype=np.int64)
+            self.underflow = 0
+            self.overflow = 0
+            self.total = 0
+            self.scan_bin_index = None
+            self._reset_bin()
+
+    def snapshot(self, per_bin=False):
+        """
+        Returns a copy safe to use from another thread:
+        {'edges', 'counts', 'total', 'underflow', 'overflow', 'scan_bin_index'}.
+        per_bin selects the counts of the current scan bin instead of the whole scan.
+        """
+        with self.lock:
+            return {
+                'edges': self.edges,
+                'counts': (self.bin_counts if per_bin else self.counts).copy(),
+                'total': self.total,
+                'underflow': self.underflow,
+                'overflow': self.overflow,
+                'scan_bin_index': self.scan_bin_index,
+            }
@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import time
+import asyncio
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.devices.async_io import DeviceIO
+from src.devices.binary_rpc import BinaryRPCServer, BinaryRPCClient
+from src.simulation.hardware_mocks import MockLaserServerInterface
+
+class SlowStage:
+    def __init__(self, delay):
+        self.delay = delay
+        self.position = 0.5
+
+    def qPOS(self, axis=None):
+        time.sleep(self.delay)
+        return {axis: self.position}
+
+    def MOV(self, axis, target):
+        self.position = target
+
+class SlowWavemeter:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def caget(self, pvname):
+        time.sleep(self.delay)
+        return 16650.0
+
+class SlowMultimeter:
+    def getVoltage(self):
+        time.sleep(1.0)
+        return 1.0
+
+class TestDeviceIO(unittest.TestCase):
+    def setUp(self):
+        self.io = DeviceIO(SlowStage(0.1), SlowWavemeter(0.1), SlowMultimeter(), timeout=0.5)
+
+    def tearDown(self):
+        self.io.close()
+
+    def test_independent_reads_overlap(self):
+        t0 = time.time()
+        position, wavenumber = self.io.read_state()
+        elapsed = time.time() - t0
+        self.assertEqual((position, wavenumber), (0.5, 16650.0))
+        self.assertLess(elapsed, 0.18) # Not 0.2 s for the two reads in a row
+
+    def test_sync_wrappers(self):
+        self.io.move(0.75)
+        self.assertEqual(self.io.read_position(), 0.75)
+        self.assertEqual(self.io.read_wavenumber(), 16650.0)
+
+    def test_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            self.io.read_voltage()
+
+class TestDeviceIOBinaryTransport(unittest.TestCase):
+    def test_requests_in_flight_on_one_connection(self):
+        interface = MockLaserServerInterface(command_delay=0.0)
+        server = BinaryRPCServer(interface, "127.0.0.1", 0)
+        server.serve_in_background()
+        device = type("Device", (), {})()
+        device.proxy = BinaryRPCClient("127.0.0.1", server.server_address[1])
+        io = DeviceIO(device, timeout=2.0)
+        try:
+            io.move(0.25)
+            async def many():
+                return await asyncio.gather(*(io.laser.qpos(1) for _ in range(50)))
+            positions = io.run(many())
+            self.assertEqual(len(positions), 50)
+            self.assertAlmostEqual(positions[-1], 0.25, places=6)
+        finally:
+            io.close()
+            device.proxy.close()
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.bin_store import BinStore
+
+class TestBinStore(unittest.TestCase):
+    def test_fuzzy_match_merges_loops(self):
+        store = BinStore(tolerance=0.01)
+        for wn in (100.0, 100.5, 101.0):
+            store.add(wn, 10, 5)
+        # Reverse loop with small numeric drift lands in the same bins
+        for wn in (101.004, 100.4999, 99.995):
+            store.add(wn, 2, 1)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.snapshot(), [(100.0, 2.0, 12, 6), (100.5, 2.0, 12, 6), (101.0, 2.0, 12, 6)])
+
+    def test_picks_closest_and_inserts_sorted(self):
+        store = BinStore(tolerance=0.05)
+        store.add(10.0, 1, 1)
+        store.add(10.08, 1, 1)
+        self.assertEqual(store.find(10.05), 1)
+        self.assertIsNone(store.find(9.9))
+
+        key, events, bunches = store.add(9.5, 3, 0)
+        self.assertEqual((key, events, bunches), (9.5, 3, 0))
+        wns, rates, ev, bu = store.as_arrays()
+        np.testing.assert_array_equal(wns, [9.5, 10.0, 10.08])
+        np.testing.assert_array_equal(rates, [0.0, 1.0, 1.0])
+        np.testing.assert_array_equal(ev, [3, 1, 1])
+
+        store.clear()
+        self.assertEqual(store.snapshot(), [])
+
+if __name__ == '__main__':
+    unittest.main()
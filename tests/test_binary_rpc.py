@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.devices.binary_rpc import BinaryRPCServer, BinaryRPCClient, RPCError, encode, decode
+from src.simulation.hardware_mocks import MockLaserServerInterface
+
+class Echo:
+    def echo(self, *args):
+        return list(args)
+
+    def fail(self):
+        raise ValueError("broken")
+
+class TestCodec(unittest.TestCase):
+    def test_round_trip(self):
+        value = [None, True, False, -3, 2.5, "wn", b"\x00\x01", {"pos": 1.25, 1: [1, 2]}]
+        self.assertEqual(decode(encode(value)), value)
+
+    def test_tuple_becomes_list(self):
+        self.assertEqual(decode(encode((1, 2.0))), [1, 2.0])
+
+class TestBinaryRPC(unittest.TestCase):
+    def setUp(self):
+        self.interface = MockLaserServerInterface()
+        self.interface.echo = Echo().echo
+        self.interface.fail = Echo().fail
+        self.server = BinaryRPCServer(self.interface, "127.0.0.1", 0)
+        self.server.serve_in_background()
+        self.client = BinaryRPCClient("127.0.0.1", self.server.server_address[1], timeout=5.0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_laser_calls(self):
+        self.assertTrue(self.client.MOV(1, 0.25))
+        self.assertAlmostEqual(self.client.qPOS(1), 0.25, places=6)
+
+    def test_errors_are_raised_on_client(self):
+        with self.assertRaises(RPCError):
+            self.client.fail()
+        with self.assertRaises(RPCError):
+            self.client.call("_private")
+        # The connection survives a failed call
+        self.assertEqual(self.client.echo(1), [1])
+
+    def test_pipelined_responses_match_requests(self):
+        futures = [self.client.call_async("echo", i) for i in range(200)]
+        self.assertEqual([f.result(timeout=5.0) for f in futures], [[i] for i in range(200)])
+
+    def test_concurrent_callers_share_connection(self):
+        results = {}
+        def worker(n):
+            results[n] = [self.client.echo(n, i) for i in range(50)]
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        for n in range(4):
+            self.assertEqual(results[n], [[n, i] for i in range(50)])
+
+    def test_reconnects_after_close(self):
+        self.client.close()
+        self.assertEqual(self.client.echo("again"), ["again"])
+
+if __name__ == '__main__':
+    unittest.main()
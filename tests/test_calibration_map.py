@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.calibration_map import CalibrationMap
+from src.control.daq_system import DAQSystem
+from src.control.laser_controller import LaserController
+from src.simulation.hardware_mocks import MockPIGCSDevice, MockEpicsClient
+
+class TestCalibrationMap(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "calibration.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_interpolation_and_range(self):
+        cal = CalibrationMap(max_extrapolation_wn=1.0)
+        self.assertIsNone(cal.lookup(100.0))
+        cal.record(1.0, 100.0)
+        cal.record(2.0, 110.0)
+        self.assertAlmostEqual(cal.lookup(105.0), 1.5)
+        self.assertAlmostEqual(cal.lookup(110.5), 2.05)
+        self.assertIsNone(cal.lookup(120.0))
+
+    def test_refresh_replaces_nearby_and_expiry(self):
+        cal = CalibrationMap(merge_wn=0.05, max_age_s=100.0)
+        now = time.time()
+        cal.record(1.0, 100.0, timestamp=now - 500)
+        cal.record(2.0, 110.0, timestamp=now)
+        cal.record(1.1, 100.02, timestamp=now) # Drifted: replaces the old point
+        self.assertEqual(len(cal), 2)
+        self.assertAlmostEqual(cal.lookup(100.02), 1.1)
+
+        cal.record(3.0, 120.0, timestamp=now - 500)
+        self.assertEqual(cal.expire(now), 1)
+        self.assertEqual(len(cal), 2)
+
+    def test_persistence(self):
+        cal = CalibrationMap(self.path)
+        cal.record(1.0, 100.0)
+        cal.record(2.0, 110.0)
+        cal.save()
+
+        loaded = CalibrationMap(self.path)
+        self.assertEqual(len(loaded), 2)
+        self.assertAlmostEqual(loaded.lookup(102.5), 1.25)
+
+    def test_table_from_another_device_is_not_used(self):
+        cal = CalibrationMap(self.path, device="MockPIGCSDevice")
+        cal.record(1.0, 100.0)
+        cal.record(2.0, 110.0)
+        cal.save()
+
+        real = CalibrationMap(self.path, device="PIGCSDevice")
+        self.assertEqual(len(real), 0)
+        real.record(5.0, 100.0)
+        real.save() # Does not overwrite the simulated table
+        self.assertEqual(len(CalibrationMap(self.path, device="MockPIGCSDevice")), 2)
+
+    def test_simulation_uses_its_own_file(self):
+        daq = DAQSystem(config={"simulation_mode": True,
+                                "control_settings": {"laser": {"calibration_file": self.path}}})
+        self.assertEqual(daq.laser.calibration.filename, os.path.join(self.test_dir, "calibration_sim.json"))
+        self.assertEqual(daq.laser.calibration.device, "MockPIGCSDevice")
+
+    def test_first_move_lands_within_tolerance(self):
+        device = MockPIGCSDevice(initialization_params={"move_speed": 1000.0})
+        device.SVO(1, True)
+        epics = MockEpicsClient(device, initialization_params={"noise_level": 0.0})
+        laser = LaserController(device, epics, config={
+            "tolerance": 0.01, "required_stable_samples": 1, "calibration_file": self.path
+        })
+        # Points from an earlier scan (100 cm^-1 per mm)
+        laser.calibration.record(0.1, 16610.0)
+        laser.calibration.record(0.3, 16630.0)
+
+        laser.set_wavenumber(16625.0)
+        deadline = time.time() + 10.0
+        while laser.is_moving and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertAlmostEqual(laser.read_wavenumber(), 16625.0, delta=0.01)
+        self.assertEqual(laser.moves_last_target, 1)
+        # The settle was added and persisted
+        self.assertEqual(len(CalibrationMap(self.path)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from LASERLABCOMPUTER.command_scheduler import CommandScheduler
+
+class FakeController:
+    """Serial device stand-in that records when each command started."""
+    def __init__(self, service_time=0.002):
+        self.service_time = service_time
+        self.position = 0.0
+        self.starts = []
+        self.reads = 0
+
+    def MOV(self, axis, target):
+        self.starts.append(time.time())
+        time.sleep(self.service_time)
+        self.position = target
+
+    def qPOS(self, axis):
+        self.starts.append(time.time())
+        self.reads += 1
+        time.sleep(self.service_time)
+        return self.position
+
+class TestCommandScheduler(unittest.TestCase):
+    def setUp(self):
+        self.device = FakeController()
+        self.scheduler = CommandScheduler("test", min_gap_s=0.02, position_cache_s=0.05)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_minimum_gap_between_commands(self):
+        for i in range(5):
+            self.scheduler.move(self.device.MOV, 1, float(i))
+        gaps = [b - a for a, b in zip(self.device.starts, self.device.starts[1:])]
+        self.assertTrue(all(gap >= 0.02 for gap in gaps), gaps)
+        self.assertEqual(self.device.position, 4.0)
+
+    def test_position_cache_and_invalidation(self):
+        self.assertEqual(self.scheduler.read_position(self.device.qPOS, 1), 0.0)
+        self.assertEqual(self.scheduler.read_position(self.device.qPOS, 1), 0.0)
+        self.assertEqual(self.device.reads, 1)
+
+        self.scheduler.move(self.device.MOV, 1, 2.5)
+        self.assertEqual(self.scheduler.read_position(self.device.qPOS, 1), 2.5)
+        self.assertEqual(self.device.reads, 2)
+
+    def test_read_queued_before_a_move_is_not_cached(self):
+        scheduler = CommandScheduler("nogap", min_gap_s=0.0, position_cache_s=10.0)
+        try:
+            self.device.service_time = 0.02
+            early = threading.Thread(target=scheduler.read_position, args=(self.device.qPOS, 1))
+            early.start()
+            time.sleep(0.005) # The read is queued (running) before the move
+            scheduler.move(self.device.MOV, 1, 5.0)
+            early.join()
+            self.assertEqual(scheduler.read_position(self.device.qPOS, 1), 5.0)
+        finally:
+            scheduler.stop()
+
+    def test_concurrent_reads_share_one_query(self):
+        self.scheduler.position_cache_s = 0.0
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.scheduler.read_position(self.device.qPOS, 1)))
+                   for _ in range(8)]
+        self.scheduler.submit(time.sleep, 0.05) # Keep the queue busy so the reads pile up
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(results, [0.0] * 8)
+        self.assertEqual(self.device.reads, 1)
+
+    def test_measure_gap_finds_the_controller_minimum(self):
+        class GapController(FakeController):
+            """Refuses commands that arrive less than 15 ms after the previous one ended."""
+            def __init__(self):
+                super().__init__(service_time=0.001)
+                self.last_end = 0.0
+
+            def qPOS(self, axis):
+                if time.time() - self.last_end < 0.015:
+                    self.last_end = time.time()
+                    raise IOError("controller busy")
+                value = super().qPOS(axis)
+                self.last_end = time.time()
+                return value
+
+        device = GapController()
+        gap, results = self.scheduler.measure_gap(device.qPOS, 1, candidates=(0.05, 0.03, 0.01, 0.0), repeats=3)
+        self.assertEqual(gap, 0.03)
+        self.assertGreater(results[0.01][1], 0)
+        self.assertEqual(self.scheduler.stats()["measured_gap_s"], 0.03)
+        self.assertEqual(self.scheduler.min_gap_s, 0.02) # Not applied
+
+    def test_errors_and_stats(self):
+        def broken():
+            raise IOError("serial timeout")
+        with self.assertRaises(IOError):
+            self.scheduler.call(broken)
+        self.scheduler.move(self.device.MOV, 1, 1.0)
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["commands"], 2)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreater(stats["mean_latency_s"], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
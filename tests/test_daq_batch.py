@@ -0,0 +1,213 @@
+import unittest
+import os
+import sys
+import shutil
+import threading
+import time
+import tempfile
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.daq_system import DAQSystem, count_new_bunches
+from src.control.data_saver import (DataSaver, RECORD_DTYPE, EVENT_RECORD_DTYPE,
+                                   SCAN_BIN_EARLY, SCAN_BIN_OVERSHOOT)
+from src.control.storage import load_records
+from src.devices.tagger import EVENT_DTYPE
+
+class BlockCollector:
+    def __init__(self, normalized=False):
+        self.normalized = normalized
+        self.blocks = []
+        self.snapshots = []
+
+    def add_block(self, block):
+        self.blocks.append(block)
+
+    def add_snapshot(self, values):
+        self.snapshots.append(values)
+        return len(self.snapshots) - 1
+
+    def stop(self):
+        self.stopped_with = len(self.blocks)
+
+def make_batch(rows):
+    batch = np.empty(len(rows), dtype=EVENT_DTYPE)
+    for i, (bunch_id, channel, tof) in enumerate(rows):
+        batch[i] = (bunch_id, channel, tof, 1000.0 + bunch_id + tof)
+    return batch
+
+class TestDAQBatch(unittest.TestCase):
+    def setUp(self):
+        config = {"simulation_mode": True, "daq_settings": {"batch_mode": True}}
+        self.daq = DAQSystem(config=config)
+
+    def test_count_new_bunches(self):
+        self.assertEqual(count_new_bunches(np.array([], dtype=np.int64), 3), 0)
+        self.assertEqual(count_new_bunches(np.array([3, 3, 4, 4, 5]), 3), 2)
+        self.assertEqual(count_new_bunches(np.array([3, 3, 4, 4, 5]), -1), 3)
+
+    def test_process_batch_counts_and_block(self):
+        batch = make_batch([
+            (1, -1, 0.0),                    # Empty bunch
+            (2, 2, 0.001), (2, 2, 0.002),    # Bunch with two events
+            (3, 2, 0.003),
+            (4, 1, 0.004),                   # Other channels are ignored
+        ])
+        saver = BlockCollector()
+        self.daq.saver = saver
+        self.daq.scanner.is_accumulating = True
+
+        self.daq._process_batch(batch, 1.5, 2.5, [10.0, 20.0, 30.0, 40.0])
+
+        self.assertEqual(self.daq.events_processed, 3)
+        self.assertEqual(self.daq.scanner.accumulated_events, 3)
+        self.assertEqual(self.daq.scanner.accumulated_bunches, 3)
+        self.assertAlmostEqual(self.daq.get_instant_rate(), 1.0)
+        self.assertEqual(self.daq.tof_hist.snapshot()['total'], 3)
+
+        self.assertEqual(len(saver.blocks), 1)
+        block = saver.blocks[0]
+        self.assertEqual(block.dtype, RECORD_DTYPE)
+        np.testing.assert_array_equal(block['bunch_id'], [1, 2, 2, 3])
+        self.assertTrue(np.all(block['wavemeter_wn'] == 10.0 * self.daq.wavechannel))
+
+        # A bunch continuing into the next batch is not counted twice
+        self.daq._process_batch(make_batch([(3, 2, 0.005), (5, 2, 0.001)]), 1.5, 2.5, [0.0] * 4)
+        self.assertEqual(self.daq.scanner.accumulated_events, 5)
+        self.assertEqual(self.daq.scanner.accumulated_bunches, 4)
+
+    def test_normalized_block_references_snapshot(self):
+        saver = BlockCollector(normalized=True)
+        self.daq.saver = saver
+        self.daq.scanner.is_accumulating = True
+
+        self.daq._process_batch(make_batch([(1, -1, 0.0), (2, 2, 0.001)]), 1.5, None, [10.0, 20.0, 30.0, 40.0])
+        self.daq._process_batch(make_batch([(3, 2, 0.002)]), 1.6, None, [10.0, 20.0, 30.0, 40.0])
+
+        self.assertEqual(len(saver.snapshots), 2)
+        self.assertEqual(saver.snapshots[1]['voltage'], 1.6)
+        self.assertTrue(np.isnan(saver.snapshots[0]['spectrum_peak']))
+        self.assertEqual(saver.blocks[0].dtype, EVENT_RECORD_DTYPE)
+        np.testing.assert_array_equal(saver.blocks[0]['snapshot_id'], [0, 0])
+        np.testing.assert_array_equal(saver.blocks[1]['snapshot_id'], [1])
+
+    def test_rows_are_saved_with_the_bin_that_counted_them(self):
+        saver = BlockCollector()
+        self.daq.saver = saver
+        scanner = self.daq.scanner
+        scanner.configure(0, 1, 1, stop_mode='events', stop_value=2)
+        scanner._start_accumulating()
+        scanner.bin_start_time = 1002.0 # make_batch timestamps: 1000 + bunch_id + tof
+
+        batch = make_batch([(1, -1, 0.0), (2, 2, 0.1), (3, 2, 0.1), (3, 2, 0.2), (4, 2, 0.1)])
+        self.daq._process_batch(batch, 1.0, None, [0.0] * 4)
+
+        np.testing.assert_array_equal(saver.blocks[0]['scan_bin_index'],
+                                      [SCAN_BIN_EARLY, 0, 0, SCAN_BIN_OVERSHOOT, SCAN_BIN_OVERSHOOT])
+        self.assertEqual(scanner.accumulated_events, 2)
+        self.assertEqual(scanner.accumulated_bunches, 2)
+        self.assertEqual(scanner.early_bunches, 1)
+        self.assertEqual(scanner.overshoot_events, 2)
+        self.assertEqual(self.daq.tof_hist.snapshot()['total'], 2)
+
+    def test_normalized_snapshot_per_bin(self):
+        saver = BlockCollector(normalized=True)
+        self.daq.saver = saver
+        scanner = self.daq.scanner
+        scanner.configure(0, 1, 1, stop_mode='events', stop_value=1)
+        scanner._start_accumulating()
+        scanner.bin_start_time = 1002.0
+
+        self.daq._process_batch(make_batch([(1, 2, 0.0), (2, 2, 0.1), (3, 2, 0.1)]), 1.0, None, [0.0] * 4)
+        self.assertEqual([snapshot['scan_bin_index'] for snapshot in saver.snapshots],
+                         [SCAN_BIN_EARLY, 0, SCAN_BIN_OVERSHOOT])
+        np.testing.assert_array_equal(np.concatenate(saver.blocks)['snapshot_id'], [0, 1, 2])
+
+    def test_events_get_sensor_values_at_their_timestamp(self):
+        saver = BlockCollector()
+        self.daq.saver = saver
+        self.daq.scanner.is_accumulating = True
+        channel = int(self.daq.wavechannel - 1)
+        for t, v in [(1000.0, 1.0), (1004.0, 5.0)]:
+            self.daq.sensor_hub.publish("voltage", v, t)
+            wns = [0.0] * 4
+            wns[channel] = 16000.0 + v
+            self.daq.sensor_hub.publish("wavenumbers", wns, t)
+
+        # make_batch timestamps: 1000 + bunch_id + tof
+        self.daq._process_batch(make_batch([(1, 2, 0.0), (3, 2, 0.0)]), 9.9, None, [0.0] * 4)
+        block = saver.blocks[0]
+        np.testing.assert_allclose(block['voltage'], [2.0, 4.0])
+        np.testing.assert_allclose(block['wavemeter_wn'], [16002.0, 16004.0])
+        self.assertTrue(np.all(np.isnan(block['spectrum_peak']))) # No history, cached value
+
+        self.daq.event_interpolation = "off"
+        self.daq._process_batch(make_batch([(4, 2, 0.0)]), 9.9, None, [0.0] * 4)
+        self.assertEqual(saver.blocks[1]['voltage'][0], 9.9)
+
+    def test_blocks_wait_for_sensor_reads_after_their_events(self):
+        saver = BlockCollector()
+        self.daq.saver = saver
+        self.daq.scanner.is_accumulating = True
+        self.daq.annotation_holdback = 60.0
+        self.daq.sensor_hub.publish("voltage", 1.0, 1000.0)
+
+        self.daq._process_batch(make_batch([(2, 2, 0.0)]), 1.0, None, [0.0] * 4) # Event at 1002
+        self.assertEqual(saver.blocks, []) # Held until the voltage is read past the event
+
+        self.daq.sensor_hub.publish("voltage", 3.0, 1004.0)
+        self.daq._release_blocks()
+        self.assertEqual(len(saver.blocks), 1)
+        self.assertAlmostEqual(saver.blocks[0]['voltage'][0], 2.0)
+
+        self.daq._process_batch(make_batch([(9, 2, 0.0)]), 1.0, None, [0.0] * 4)
+        self.daq._release_blocks(force=True) # Scan end
+        self.assertEqual(len(saver.blocks), 2)
+
+    def test_stop_saves_blocks_from_the_last_loop_iteration(self):
+        saver = BlockCollector()
+        self.daq.saver = saver
+        self.daq.scanner.is_accumulating = True
+        self.daq.annotation_holdback = 60.0
+        self.daq.sensor_hub.publish("voltage", 1.0, 1000.0)
+
+        def last_iteration():
+            # The loop is still finishing a batch when stop() is called
+            while self.daq.running:
+                time.sleep(0.001)
+            time.sleep(0.05)
+            self.daq._process_batch(make_batch([(5, 2, 0.0)]), 1.0, None, [0.0] * 4)
+        self.daq.running = True
+        self.daq.daq_thread = threading.Thread(target=last_iteration)
+        self.daq.daq_thread.start()
+        self.daq.stop()
+
+        self.assertEqual(len(saver.blocks), 1)
+        self.assertEqual(saver.stopped_with, 1)
+        self.assertEqual(len(self.daq.pending_blocks), 0)
+
+    def test_per_entry_record_without_spectrum_loads(self):
+        path = os.path.join(tempfile.mkdtemp(), "scan.csv")
+        saver = DataSaver(path, storage_format="csv")
+        saver.start()
+        record = {'timestamp': 1.0, 'channel': 2, 'tof': 0.001, 'voltage': 1.5, 'spectrum_peak': None,
+                  'wavemeter_wn': 16666.0, 'laser_target_wn': 16666.0, 'scan_bin_index': 0, 'bunch_id': 1}
+        self.daq._save_record(saver, record, None)
+        saver.stop()
+
+        data = load_records(path, RECORD_DTYPE)
+        self.assertEqual(len(data), 1)
+        self.assertTrue(np.isnan(data['spectrum_peak'][0]))
+        shutil.rmtree(os.path.dirname(path))
+
+    def test_not_accumulating_only_updates_rate(self):
+        self.daq.saver = BlockCollector()
+        self.daq._process_batch(make_batch([(1, -1, 0.0), (2, 2, 0.001)]), 0.0, 0.0, [0.0] * 4)
+        self.assertEqual(self.daq.scanner.accumulated_events, 0)
+        self.assertEqual(self.daq.saver.blocks, [])
+        self.assertAlmostEqual(self.daq.get_instant_rate(), 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,11 +5,13 @@ import csv
 import shutil
 import tempfile
 import sys
+import numpy as np
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.utils.data_loader import DataLoader
+from src.control.data_saver import DataSaver, RECORD_DTYPE, SCAN_BIN_EARLY, SCAN_BIN_OVERSHOOT
 
 class TestDataLoader(unittest.TestCase):
     def setUp(self):
@@ -89,5 +91,67 @@ class TestDataLoader(unittest.TestCase):
 
         print("Test Passed: DataLoader correctly parsed bunches and rates.")
 
+    def test_binary_scan_matches_csv(self):
+        headers = list(RECORD_DTYPE.names)
+        rows = [
+            (99.9, 2, 80.0, 1.0, 0.0, 990.0, 1000.0, SCAN_BIN_EARLY, 0), # Laser still moving
+            (100.0, -1, 0.0, 1.0, 0.0, 1000.0, 1000.0, 0, 1),
+            (100.1, -1, 0.0, 5.0, 0.0, 1500.0, 1500.0, 10, 101),
+            (100.2, 2, 123.4, 5.1, 0.0, 1500.1, 1500.0, 10, 102),
+            (100.3, 2, 200.0, 5.2, 0.0, 1500.2, 1500.0, 10, 103),
+            (100.3, 2, 210.0, 5.2, 0.0, 1500.2, 1500.0, 10, 103),
+            (100.4, 2, 50.0, 5.3, 0.0, 1500.3, 1500.5, 11, 104),
+            (100.5, 2, 60.0, 5.3, 0.0, 1500.3, 1500.5, SCAN_BIN_OVERSHOOT, 105), # Bin 11 already full
+        ]
+
+        csv_path = os.path.join(self.test_dir, "scan_a.csv")
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+
+        timestamp = "20250101_130000"
+        json_path = os.path.join(self.test_dir, f"scan_{timestamp}_meta.json")
+        with open(json_path, 'w') as f:
+            json.dump({"timestamp": timestamp}, f)
+        np.save(os.path.join(self.test_dir, f"scan_{timestamp}.npy"), np.array(rows, dtype=RECORD_DTYPE))
+
+        from_csv = self.loader.process_data(csv_path)
+        _, from_npy = self.loader.load_scan(json_path)
+
+        for key in from_csv:
+            if key == 'times':
+                np.testing.assert_allclose(from_npy[key], from_csv[key])
+            else:
+                self.assertEqual(from_npy[key], from_csv[key], key)
+        # Rows no bin counted are not part of the scan
+        self.assertEqual([entry[3] for entry in from_npy['scan_data']], [1, 3, 1])
+
+    def test_normalized_scan_joins_snapshots(self):
+        timestamp = "20250101_140000"
+        json_path = os.path.join(self.test_dir, f"scan_{timestamp}_meta.json")
+        with open(json_path, 'w') as f:
+            json.dump({"timestamp": timestamp, "layout": "normalized"}, f)
+
+        saver = DataSaver(
+            os.path.join(self.test_dir, f"scan_{timestamp}.csv"),
+            snapshot_filename=os.path.join(self.test_dir, f"scan_{timestamp}_snapshots.csv")
+        )
+        saver.start()
+        snap_a = saver.add_snapshot({'timestamp': 100.0, 'voltage': 1.0, 'spectrum_peak': 0.0,
+                                     'wavemeter_wn': 1000.0, 'laser_target_wn': 1000.0, 'scan_bin_index': 0})
+        saver.add_event({'bunch_id': 1, 'channel': -1, 'tof': 0.0, 'snapshot_id': snap_a})
+        snap_b = saver.add_snapshot({'timestamp': 100.2, 'voltage': 5.0, 'spectrum_peak': 0.0,
+                                     'wavemeter_wn': 1500.1, 'laser_target_wn': 1500.0, 'scan_bin_index': 10})
+        for bunch_id, channel, tof in ((101, -1, 0.0), (102, 2, 123.4), (103, 2, 200.0), (103, 2, 210.0)):
+            saver.add_event({'bunch_id': bunch_id, 'channel': channel, 'tof': tof, 'snapshot_id': snap_b})
+        saver.stop()
+
+        _, data = self.loader.load_scan(json_path)
+        self.assertEqual(data['rate'], [0, 0, 1, 2])
+        self.assertEqual(data['volt'], [1.0, 5.0, 5.0, 5.0])
+        self.assertEqual(data['scan_data'], [(1000.0, 0.0, 0, 1), (1500.0, 1.0, 3, 3)])
+        self.assertEqual(data['tof_buffer'], [123.4, 200.0, 210.0])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import os
+import csv
+import shutil
+import tempfile
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.data_saver import DataSaver, DurabilityPolicy, RECORD_DTYPE, EVENT_RECORD_DTYPE, SNAPSHOT_DTYPE
+from src.control.storage import NpyStorage, Hdf5Storage, load_records, h5py
+
+def make_block(n, start_bunch=0):
+    block = np.zeros(n, dtype=RECORD_DTYPE)
+    block['timestamp'] = 100.0 + np.arange(n)
+    block['channel'] = 2
+    block['tof'] = 1e-3
+    block['bunch_id'] = start_bunch + np.arange(n) // 2
+    return block
+
+def make_record(bunch_id):
+    return {
+        'timestamp': 500.0, 'channel': -1, 'tof': 0.0, 'voltage': 1.0, 'spectrum_peak': 0.0,
+        'wavemeter_wn': 16666.0, 'laser_target_wn': 16666.0, 'scan_bin_index': 3, 'bunch_id': bunch_id
+    }
+
+class TestDataSaver(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_saver(self, saver, items):
+        saver.start()
+        for item in items:
+            if isinstance(item, np.ndarray):
+                saver.add_block(item)
+            else:
+                saver.add_event(item)
+        saver.stop()
+
+    def test_npy_storage_blocks_and_dicts(self):
+        path = os.path.join(self.test_dir, "scan.npy")
+        final = os.path.join(self.test_dir, "final_scan.npy")
+        saver = DataSaver(path, final_filename=final, storage_format="npy")
+        self.run_saver(saver, [make_block(5), make_record(10), make_block(3, start_bunch=20)])
+
+        data = np.load(path)
+        self.assertEqual(data.dtype, RECORD_DTYPE)
+        self.assertEqual(len(data), 9)
+        self.assertEqual(data['bunch_id'][5], 10)
+        self.assertEqual(data['scan_bin_index'][5], 3)
+        np.testing.assert_array_equal(np.load(final), data)
+
+    def test_npy_storage_appends_to_existing_file(self):
+        path = os.path.join(self.test_dir, "scan.npy")
+        for start in (0, 100):
+            storage = NpyStorage(path, RECORD_DTYPE)
+            storage.open()
+            storage.write([make_block(4, start_bunch=start)])
+            storage.close()
+
+        data = np.load(path)
+        self.assertEqual(len(data), 8)
+        self.assertEqual(data['bunch_id'][-1], 101)
+
+    @unittest.skipUnless(h5py, "h5py not installed")
+    def test_hdf5_storage_round_trip(self):
+        path = os.path.join(self.test_dir, "scan.h5")
+        saver = DataSaver(path, storage_format="hdf5")
+        self.run_saver(saver, [make_block(5), make_record(10)])
+
+        # Reopening appends to the same dataset
+        storage = Hdf5Storage(path, RECORD_DTYPE, chunk_rows=4)
+        storage.open()
+        storage.write([make_block(3, start_bunch=20)])
+        storage.flush()
+        self.assertEqual(storage.position(), 9 * RECORD_DTYPE.itemsize)
+        storage.close()
+
+        data = load_records(path)
+        self.assertEqual(data.dtype, RECORD_DTYPE)
+        self.assertEqual(len(data), 9)
+        self.assertEqual(data['bunch_id'][5], 10)
+        np.testing.assert_array_equal(data['bunch_id'][6:], [20, 20, 21])
+
+    def test_csv_storage_in_memory_mode(self):
+        path = os.path.join(self.test_dir, "scan.csv")
+        final = os.path.join(self.test_dir, "final_scan.csv")
+        saver = DataSaver(path, final_filename=final, save_continuously=False)
+        self.run_saver(saver, [make_record(1), make_block(2)])
+
+        self.assertFalse(os.path.exists(path))
+        with open(final) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0].keys()), list(RECORD_DTYPE.names))
+        self.assertEqual(int(rows[2]['bunch_id']), 0)
+
+    def test_normalized_layout_writes_two_tables(self):
+        path = os.path.join(self.test_dir, "scan.npy")
+        snapshots = os.path.join(self.test_dir, "scan_snapshots.npy")
+        final = os.path.join(self.test_dir, "final_scan_snapshots.npy")
+        saver = DataSaver(path, storage_format="npy", snapshot_filename=snapshots, final_snapshot_filename=final)
+        saver.start()
+        for i in range(3):
+            snapshot_id = saver.add_snapshot({**make_record(0), 'timestamp': 10.0 + i})
+            block = np.zeros(4, dtype=EVENT_RECORD_DTYPE)
+            block['snapshot_id'] = snapshot_id
+            saver.add_block(block)
+        saver.stop()
+
+        events = np.load(path)
+        snaps = np.load(snapshots)
+        self.assertEqual(events.dtype, EVENT_RECORD_DTYPE)
+        self.assertEqual(snaps.dtype, SNAPSHOT_DTYPE)
+        np.testing.assert_array_equal(np.unique(events['snapshot_id']), snaps['snapshot_id'])
+        np.testing.assert_array_equal(snaps['timestamp'], [10.0, 11.0, 12.0])
+        np.testing.assert_array_equal(np.load(final), snaps)
+
+class TestDurabilityPolicy(unittest.TestCase):
+    def test_interval_mode_waits_for_time_or_size(self):
+        policy = DurabilityPolicy(mode='interval', interval_s=10.0, interval_mb=1.0)
+        policy.last_sync = 0.0
+        policy.record_write(1000, now=1.0)
+        self.assertFalse(policy.should_sync(5.0))
+        self.assertTrue(policy.should_sync(10.0))
+
+        policy.record_write(2 * 1024 * 1024, now=2.0)
+        self.assertTrue(policy.should_sync(3.0))
+
+        policy.record_sync(0.01, now=3.0)
+        self.assertEqual(policy.unsynced_bytes, 0)
+        self.assertAlmostEqual(policy.max_loss_window, 2.0)
+        self.assertFalse(policy.should_sync(100.0))
+
+    def test_stop_mode_never_syncs_early(self):
+        policy = DurabilityPolicy(mode='stop')
+        policy.record_write(10**9, now=0.0)
+        self.assertFalse(policy.should_sync(1e6))
+        self.assertIsNone(policy.loss_window_bound(1.0))
+
+    def test_unknown_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            DurabilityPolicy(mode='never')
+
+    def test_saver_reports_fsyncs(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "scan.npy")
+            saver = DataSaver(path, storage_format="npy", durability=DurabilityPolicy(mode='stop'))
+            saver.start()
+            saver.add_block(make_block(10))
+            saver.stop()
+
+            stats = saver.get_stats()
+            self.assertEqual(stats["fsync_count"], 1) # Only the final sync
+            self.assertEqual(stats["unsynced_bytes"], 0)
+            self.assertEqual(len(np.load(path)), 10)
+        finally:
+            shutil.rmtree(test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
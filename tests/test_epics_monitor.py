@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.devices.sensors import WavenumberReader, SpectrometreReader, wavenumbers_pv_names
+from src.simulation.sim_sensors import MockPV
+from src.utils.time_series import TimeSeriesRing
+
+class PVFactory:
+    """Creates MockPVs and remembers them by name."""
+    def __init__(self):
+        self.pvs = {}
+
+    def __call__(self, pvname, **kwargs):
+        pv = MockPV(pvname, **kwargs)
+        self.pvs[pvname] = pv
+        return pv
+
+class TestEpicsMonitor(unittest.TestCase):
+    def test_wavenumbers_come_from_callbacks(self):
+        factory = PVFactory()
+        reader = WavenumberReader(monitor=True, pv_factory=factory, history=4)
+        pushed = []
+        reader.add_listener(lambda wns, ts: pushed.append(wns))
+
+        factory.pvs[wavenumbers_pv_names[0]].put(16666.123456)
+        factory.pvs[wavenumbers_pv_names[2]].put(12625.2)
+        for value in (1.0, 2.0, 3.0, 4.0, 5.0):
+            factory.pvs[wavenumbers_pv_names[3]].put(value)
+
+        self.assertEqual(reader.get_wavenumbers(), [16666.12346, 0.0, 12625.2, 5.0])
+        self.assertEqual(reader.get_wnum(3), 12625.2)
+        # Reads never touch the PVs
+        self.assertEqual(sum(pv.get_count for pv in factory.pvs.values()), 0)
+        self.assertEqual(len(pushed), 7)
+
+        _, values = reader.get_history(4)
+        np.testing.assert_array_equal(values, [2.0, 3.0, 4.0, 5.0])
+
+        reader.stop()
+        factory.pvs[wavenumbers_pv_names[0]].put(1.0)
+        self.assertEqual(reader.get_wnum(1), 16666.12346)
+
+    def test_spectrometer_monitor(self):
+        factory = PVFactory()
+        reader = SpectrometreReader(monitor=True, pv_factory=factory)
+        self.assertEqual(reader.get_spec(), 0.0)
+        factory.pvs[reader.pv_name].put(16670.5)
+        self.assertEqual(reader.get_spec(), 16670.5)
+        self.assertEqual(reader.history.latest()[0], 16670.5)
+        reader.stop()
+
+    def test_history_uses_the_ioc_timestamp(self):
+        factory = PVFactory()
+        wavemeter = WavenumberReader(monitor=True, pv_factory=factory)
+        spectrometer = SpectrometreReader(monitor=True, pv_factory=factory)
+        pushed = []
+        wavemeter.add_listener(lambda wns, ts: pushed.append(ts))
+
+        # Measured at t=500, the callback runs later on the EPICS thread
+        factory.pvs[wavenumbers_pv_names[0]].put(16666.1, timestamp=500.0)
+        factory.pvs[spectrometer.pv_name].put(16670.5, timestamp=501.0)
+        timestamps, _ = wavemeter.get_history(1)
+        np.testing.assert_array_equal(timestamps, [500.0])
+        self.assertEqual(pushed, [500.0])
+        self.assertEqual(spectrometer.history.latest()[1], 501.0)
+        wavemeter.stop()
+        spectrometer.stop()
+
+class TestTimeSeriesRing(unittest.TestCase):
+    def test_wraparound_and_since(self):
+        ring = TimeSeriesRing(3)
+        self.assertEqual(ring.latest(), (None, 0.0))
+        for t in range(5):
+            ring.append(t * 10.0, float(t))
+        timestamps, values = ring.arrays()
+        np.testing.assert_array_equal(timestamps, [2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(values, [20.0, 30.0, 40.0])
+        np.testing.assert_array_equal(ring.arrays(since=2.5)[1], [30.0, 40.0])
+        self.assertEqual(ring.latest(), (40.0, 4.0))
+
+if __name__ == '__main__':
+    unittest.main()
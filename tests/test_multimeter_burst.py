@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.devices.sensors import HP_Multimeter, VoltageReader
+from src.simulation.sim_sensors import MockSerialMultimeter
+
+class TestMultimeterBurst(unittest.TestCase):
+    def setUp(self):
+        self.port = MockSerialMultimeter({"reading_time": 0.001, "noise_level": 0.0})
+        self.meter = HP_Multimeter("COM1", serial_device=self.port)
+
+    def test_single_reading_still_works(self):
+        voltage = self.meter.getVoltage()
+        self.assertTrue(0.0 < voltage < 5.0)
+
+    def test_configure_once_then_read_bursts(self):
+        self.meter.configure_burst(samples=8, nplc=0.2)
+        self.assertIn("SAMP:COUN 8", self.port.commands)
+        self.assertIn("TRIG:SOUR IMM", self.port.commands)
+        configured = len(self.port.commands)
+
+        voltages, timestamps = self.meter.read_burst()
+        self.assertEqual(len(voltages), 8)
+        self.assertEqual(len(timestamps), 8)
+        self.assertTrue(np.all(np.diff(timestamps) > 0))
+        # Reading a burst is a single command, no re-configuration
+        self.assertEqual(self.port.commands[configured:], ["READ?"])
+
+        fetched, _ = self.meter.read_burst(fetch=True)
+        np.testing.assert_allclose(fetched, voltages, rtol=1e-7)
+
+    def test_burst_timestamps_and_timeout(self):
+        self.meter.configure_burst(samples=100, nplc=10)
+        # 100 readings of 0.2 s plus ~18 ms transfer each, more than the default 1 s
+        self.assertGreater(self.port.timeout, 100 * (0.2 + 0.018))
+
+        self.meter.configure_burst(samples=4, nplc=1, trigger_delay=0.005)
+        t_request = time.time()
+        voltages, timestamps = self.meter.read_burst()
+        # Reading k at trigger + k * (delay + 1 PLC), independent of the transfer time
+        np.testing.assert_allclose(np.diff(timestamps), 0.025, atol=1e-6)
+        self.assertAlmostEqual(timestamps[0], t_request, delta=0.01)
+        _, fetched = self.meter.read_burst(fetch=True)
+        np.testing.assert_array_equal(fetched, timestamps)
+
+    def test_failed_burst_returns_empty(self):
+        self.port.readline = lambda: b"garbage\r\n"
+        voltages, timestamps = self.meter.read_burst()
+        self.assertEqual(len(voltages), 0)
+        self.assertEqual(len(timestamps), 0)
+
+    def test_reader_streams_into_history(self):
+        received = []
+        reader = VoltageReader(self.meter, burst_samples=5, nplc=0.05, history=1000) # 1 ms, as the port
+        reader.add_listener(lambda v, ts: received.append(ts))
+        reader.start()
+        try:
+            deadline = time.time() + 2.0
+            while len(received) < 50 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            reader.stop()
+            reader.join(timeout=2.0)
+
+        self.assertGreaterEqual(len(received), 50)
+        timestamps, voltages = reader.get_history()
+        self.assertEqual(len(timestamps), len(received))
+        self.assertTrue(np.all(np.diff(timestamps) >= 0))
+        self.assertAlmostEqual(reader.get_voltage(), voltages[-5:].mean(), places=6)
+
+    def test_interval_averages(self):
+        reader = VoltageReader(self.meter, burst_samples=5, history=100)
+        reader._record([1.0, 3.0, 10.0, 20.0, 5.0], [0.0, 0.5, 1.1, 1.9, 3.2])
+        starts, means, counts = reader.interval_averages(1.0)
+        np.testing.assert_allclose(starts, [0.0, 1.0, 3.0])
+        np.testing.assert_allclose(means, [2.0, 15.0, 5.0])
+        np.testing.assert_array_equal(counts, [2, 2, 1])
+
+if __name__ == '__main__':
+    unittest.main()
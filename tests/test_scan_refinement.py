@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.scan_refinement import refine_scan_points
+from src.control.scanner import Scanner
+from tests.test_scanner import StableLaser
+
+class TestRefineScanPoints(unittest.TestCase):
+    def setUp(self):
+        # Flat baseline of 0.1 events/bunch with a peak at 3.0
+        self.wns = np.arange(0.0, 7.0, 1.0)
+        self.bunches = np.full(7, 1000)
+        self.events = np.array([100, 95, 105, 400, 98, 102, 100])
+
+    def test_significant_peak_is_refined_on_both_sides(self):
+        points = refine_scan_points(self.wns, self.events, self.bunches, fine_step=0.25)
+        np.testing.assert_allclose(points, [2.25, 2.5, 2.75, 3.25, 3.5, 3.75])
+
+    def test_flat_baseline_gives_nothing(self):
+        events = np.array([100, 95, 105, 98, 98, 102, 100])
+        self.assertEqual(len(refine_scan_points(self.wns, events, self.bunches, fine_step=0.25)), 0)
+
+    def test_gradient_and_rate_criteria(self):
+        points = refine_scan_points(self.wns, self.events, self.bunches, fine_step=0.5,
+                                    gradient_threshold=0.2, significance=None)
+        np.testing.assert_allclose(points, [2.5, 3.5])
+        points = refine_scan_points(self.wns, self.events, self.bunches, fine_step=0.5,
+                                    rate_threshold=0.5, significance=None)
+        self.assertEqual(len(points), 0)
+
+    def test_points_near_measured_bins_are_dropped(self):
+        wns = np.append(self.wns, 2.52)
+        events = np.append(self.events, 250)
+        bunches = np.append(self.bunches, 1000)
+        points = refine_scan_points(wns, events, bunches, fine_step=0.25, min_spacing=0.05)
+        self.assertNotIn(2.5, points)
+
+class TestScannerRefinement(unittest.TestCase):
+    def test_refinement_pass_appends_bins(self):
+        scanner = Scanner(StableLaser(), drift_check_interval=30.0)
+        scanner.configure(0, 4, 1, stop_mode='bunches', stop_value=100,
+                          refinement={"passes": 1, "fine_step": 0.5})
+        scanner.start()
+        try:
+            deadline = time.time() + 5.0
+            while scanner.is_alive() and time.time() < deadline:
+                if scanner.is_accumulating:
+                    peak = abs(scanner.current_wavenumber - 2.0) < 1e-9
+                    scanner.report_batch(400 if peak else 10, 100)
+                time.sleep(0.001)
+            scanner.join(timeout=1.0)
+        finally:
+            scanner.stop()
+
+        wns = [p[0] for p in scanner.scan_progress]
+        self.assertEqual(wns, [0.0, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0])
+        self.assertEqual(scanner.total_bins, 7)
+        self.assertEqual(scanner.bins_completed, 7)
+
+if __name__ == '__main__':
+    unittest.main()
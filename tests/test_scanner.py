@@ -0,0 +1,238 @@
+import unittest
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.control.scanner import Scanner, ROW_EARLY, ROW_IN_BIN, ROW_LATE
+
+class StableLaser:
+    """Laser stand-in that is always on target."""
+    def __init__(self):
+        self.tolerance = 0.01
+        self.target_wn = 0.0
+        self.moves = []
+
+    def set_wavenumber(self, wn):
+        self.target_wn = wn
+        self.moves.append(wn)
+
+    def is_stable(self):
+        return True
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+class TestScannerCounting(unittest.TestCase):
+    def setUp(self):
+        self.scanner = Scanner(StableLaser())
+
+    def test_report_batch_ignored_when_idle(self):
+        self.scanner.report_batch(10, 2)
+        self.assertEqual(self.scanner.accumulated_events, 0)
+        self.assertEqual(self.scanner.accumulated_bunches, 0)
+
+    def test_batch_straddling_event_target_is_split(self):
+        self.scanner.configure(0, 1, 1, stop_mode='events', stop_value=100)
+        self.scanner._start_accumulating()
+
+        self.scanner.report_batch(60, 6)
+        self.assertFalse(self.scanner.target_reached)
+
+        # 40 of these 80 events complete the bin, the rest is overshoot
+        self.scanner.report_batch(80, 8)
+        self.assertTrue(self.scanner.target_reached)
+        self.assertEqual(self.scanner.accumulated_events, 100)
+        self.assertEqual(self.scanner.accumulated_bunches, 10)
+        self.assertEqual(self.scanner.overshoot_events, 40)
+        self.assertEqual(self.scanner.overshoot_bunches, 4)
+
+        # Everything after the target is overshoot
+        self.scanner.report_batch(5, 1)
+        self.assertEqual(self.scanner.accumulated_events, 100)
+        self.assertEqual(self.scanner.overshoot_events, 45)
+        self.assertTrue(self.scanner._check_stop_condition(time.time()))
+
+    def test_bunch_target(self):
+        self.scanner.configure(0, 1, 1, stop_mode='bunches', stop_value=10)
+        self.scanner._start_accumulating()
+        self.scanner.report_batch(30, 15)
+        self.assertEqual(self.scanner.accumulated_bunches, 10)
+        self.assertEqual(self.scanner.accumulated_events, 20)
+        self.assertEqual(self.scanner.overshoot_bunches, 5)
+
+    def test_batches_from_before_the_bin_are_not_credited(self):
+        self.scanner.configure(0, 1, 1, stop_mode='events', stop_value=100)
+        start = self.scanner._start_accumulating()
+        self.scanner.report_batch(10, 1, timestamp=start - 0.5)
+        self.scanner.report_batch(3, 1, timestamp=start + 0.1)
+        self.assertEqual(self.scanner.accumulated_events, 3)
+        self.assertEqual(self.scanner.early_events, 10)
+
+    def test_batch_straddling_the_bin_start_is_split(self):
+        self.scanner.configure(0, 1, 1, stop_mode='events', stop_value=100)
+        start = self.scanner._start_accumulating()
+        # A quarter of this batch was acquired before the bin started
+        self.scanner.report_batch(40, 8, timestamp=start + 0.3, first_timestamp=start - 0.1)
+        self.assertEqual(self.scanner.accumulated_events, 30)
+        self.assertEqual(self.scanner.accumulated_bunches, 6)
+        self.assertEqual(self.scanner.early_events, 10)
+        self.assertEqual(self.scanner.early_bunches, 2)
+        self.assertEqual(self.scanner.overshoot_events, 0)
+
+    def test_rows_are_split_exactly_at_the_bin_boundaries(self):
+        self.scanner.configure(0, 1, 1, stop_mode='events', stop_value=3)
+        start = self.scanner._start_accumulating()
+        timestamps = start + np.array([-0.2, -0.1, 0.1, 0.1, 0.2, 0.3, 0.3, 0.4])
+        events = np.array([0, 1, 0, 1, 1, 1, 1, 1])
+        bunches = np.array([1, 0, 1, 0, 1, 1, 0, 1])
+
+        placement = self.scanner.report_rows(timestamps, events, bunches)
+        # The third in-bin event ends the bin, the rows after it are overshoot
+        np.testing.assert_array_equal(placement, [ROW_EARLY, ROW_EARLY, ROW_IN_BIN, ROW_IN_BIN,
+                                                  ROW_IN_BIN, ROW_IN_BIN, ROW_LATE, ROW_LATE])
+        self.assertTrue(self.scanner.target_reached)
+        self.assertEqual((self.scanner.early_events, self.scanner.early_bunches), (1, 1))
+        self.assertEqual((self.scanner.accumulated_events, self.scanner.accumulated_bunches), (3, 3))
+        self.assertEqual((self.scanner.overshoot_events, self.scanner.overshoot_bunches), (2, 1))
+
+        placement = self.scanner.report_rows(start + np.array([0.5]), [1], [1])
+        np.testing.assert_array_equal(placement, [ROW_LATE])
+        self.assertEqual(self.scanner.overshoot_events, 3)
+
+    def test_rows_in_time_and_precision_modes(self):
+        self.scanner.configure(0, 1, 1, stop_mode='time', stop_value=1.0)
+        start = self.scanner._start_accumulating()
+        placement = self.scanner.report_rows(start + np.array([0.5, 0.9, 1.1]), [1, 1, 1], [1, 0, 1])
+        np.testing.assert_array_equal(placement, [ROW_IN_BIN, ROW_IN_BIN, ROW_LATE])
+        self.assertEqual(self.scanner.accumulated_events, 2)
+        self.assertTrue(self.scanner.target_reached)
+
+        # 50 % relative uncertainty needs 4 events, and at least 2 bunches
+        self.scanner.configure(0, 1, 1, stop_mode='precision', stop_value=0.5, min_bunches=2)
+        start = self.scanner._start_accumulating()
+        timestamps = start + np.linspace(0.1, 0.2, 7)
+        placement = self.scanner.report_rows(timestamps, [1, 1, 1, 1, 0, 1, 1], [1, 0, 0, 0, 1, 0, 0])
+        np.testing.assert_array_equal(placement, [ROW_IN_BIN] * 5 + [ROW_LATE] * 2)
+        self.assertEqual(self.scanner.accumulated_bunches, 2)
+
+    def test_time_mode_overshoot(self):
+        self.scanner.configure(0, 1, 1, stop_mode='time', stop_value=1.0)
+        start = self.scanner._start_accumulating()
+        self.scanner.report_batch(5, 1, timestamp=start + 0.5)
+        self.scanner.report_batch(7, 1, timestamp=start + 1.5)
+        self.assertEqual(self.scanner.accumulated_events, 5)
+        self.assertEqual(self.scanner.overshoot_events, 7)
+        self.assertTrue(self.scanner.target_reached)
+
+    def test_precision_mode_stops_at_target_uncertainty(self):
+        # 10 % relative uncertainty needs 100 events
+        self.scanner.configure(0, 1, 1, stop_mode='precision', stop_value=0.1, min_bunches=5, max_bunches=1000)
+        self.scanner._start_accumulating()
+        self.scanner.report_batch(60, 3)
+        self.assertFalse(self.scanner.target_reached)
+        self.assertAlmostEqual(self.scanner.bin_progress(), 0.6)
+
+        # 40 more events are needed: 2 of these 4 bunches
+        self.scanner.report_batch(80, 4)
+        self.assertTrue(self.scanner.target_reached)
+        self.assertEqual(self.scanner.accumulated_events, 100)
+        self.assertEqual(self.scanner.accumulated_bunches, 5)
+        self.assertEqual(self.scanner.overshoot_bunches, 2)
+
+    def test_precision_mode_rejects_stop_value_of_one_or_more(self):
+        with self.assertRaises(ValueError):
+            self.scanner.configure(0, 1, 1, stop_mode='precision', stop_value=100)
+
+    def test_eta_averages_completed_bins_only(self):
+        self.scanner.configure(0, 1, 1, stop_mode='bunches', stop_value=10)
+        now = time.time()
+        self.scanner.total_bins = 4
+        self.scanner.start_timestamp = now - 30.0
+        self.scanner.bins_completed = 2
+        self.scanner.last_bin_completed_at = now - 10.0 # 10 s per bin, current bin running for 10 s
+        self.scanner._start_accumulating()
+        self.scanner.report_batch(0, 5) # Half of the current bin
+        self.assertAlmostEqual(self.scanner.get_status()["eta_seconds"], 15.0)
+
+    def test_precision_mode_min_and_max_bunches(self):
+        self.scanner.configure(0, 1, 1, stop_mode='precision', stop_value=0.1, min_bunches=20, max_bunches=50)
+        self.scanner._start_accumulating()
+        # Plenty of events, but fewer bunches than the minimum
+        self.scanner.report_batch(500, 10)
+        self.assertFalse(self.scanner.target_reached)
+        self.scanner.report_batch(500, 10)
+        self.assertTrue(self.scanner.target_reached)
+        self.assertEqual(self.scanner.accumulated_bunches, 20)
+
+        # Off resonance: the bin ends at max_bunches
+        self.scanner._start_accumulating()
+        self.scanner.report_batch(3, 60)
+        self.assertTrue(self.scanner.target_reached)
+        self.assertEqual(self.scanner.accumulated_bunches, 50)
+        self.assertEqual(self.scanner.overshoot_bunches, 10)
+
+class TestScannerWakeup(unittest.TestCase):
+    def test_bin_completes_on_report_not_on_poll(self):
+        # Drift checks so rare that only the pipeline notification can end the bin
+        scanner = Scanner(StableLaser(), drift_check_interval=30.0)
+        scanner.configure(0, 0, 1, stop_mode='events', stop_value=100)
+        scanner.start()
+        try:
+            self.assertTrue(wait_for(lambda: scanner.is_accumulating))
+            t0 = time.time()
+            scanner.report_batch(100, 10)
+            self.assertTrue(wait_for(lambda: scanner.bins_completed == 1))
+            self.assertLess(time.time() - t0, 0.5)
+            self.assertEqual(scanner.scan_progress, [(0.0, 10.0, 100, 10)])
+        finally:
+            scanner.stop()
+
+    def test_stop_wakes_accumulation(self):
+        scanner = Scanner(StableLaser(), drift_check_interval=30.0)
+        scanner.configure(0, 0, 1, stop_mode='events', stop_value=100)
+        scanner.start()
+        self.assertTrue(wait_for(lambda: scanner.is_accumulating))
+        t0 = time.time()
+        scanner.stop()
+        self.assertLess(time.time() - t0, 0.5)
+        self.assertFalse(scanner.is_alive())
+
+class TestScannerPipelining(unittest.TestCase):
+    def test_plan_covers_all_loops(self):
+        scanner = Scanner(StableLaser())
+        scanner.configure(0, 2, 1, loops=2)
+        self.assertEqual([(l, i, float(wn)) for l, i, wn in scanner.build_plan()],
+                         [(0, 0, 0.0), (0, 1, 1.0), (0, 2, 2.0), (1, 0, 2.0), (1, 1, 1.0), (1, 2, 0.0)])
+
+    def test_next_target_sent_when_bin_completes(self):
+        laser = StableLaser()
+        scanner = Scanner(laser, drift_check_interval=30.0, pipelined=True)
+        loops_done = []
+        # Bookkeeping of the last bin of a loop runs after the next move was sent
+        scanner.configure(0, 1, 1, stop_mode='events', stop_value=10, loops=2,
+                          loop_callback=lambda n: loops_done.append((n, list(laser.moves))))
+        scanner.start()
+        try:
+            for _ in range(4):
+                done = scanner.bins_completed
+                self.assertTrue(wait_for(lambda: scanner.is_accumulating))
+                scanner.report_batch(10, 1)
+                self.assertTrue(wait_for(lambda: scanner.bins_completed == done + 1))
+            scanner.join(timeout=2.0)
+        finally:
+            scanner.stop()
+
+        # One move per bin: the pipelined move is not repeated when the bin starts
+        self.assertEqual([float(wn) for wn in laser.moves], [0.0, 1.0, 1.0, 0.0])
+        self.assertEqual(loops_done[0], (1, laser.moves[:3]))
+
+if __name__ == '__main__':
+    unittest.main()
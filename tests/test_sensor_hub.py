@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.sensor_hub import SensorHub
+from src.control.laser_controller import LaserController
+from src.simulation.hardware_mocks import MockPIGCSDevice, MockEpicsClient
+
+class CountingSource:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def read(self):
+        self.calls += 1
+        if self.fail:
+            raise IOError("no reply")
+        return float(self.calls)
+
+class TestSensorHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = SensorHub()
+
+    def tearDown(self):
+        self.hub.stop()
+
+    def test_poller_publishes_timestamped_values(self):
+        source = CountingSource()
+        self.hub.add_source("voltage", source.read, 0.01, initial=0.0)
+        self.assertEqual(self.hub.get_voltage(), 0.0)
+        self.assertEqual(self.hub.age("voltage"), float('inf'))
+
+        t0 = time.time()
+        self.hub.start()
+        value, timestamp = self.hub.wait_for_update("voltage", t0, timeout=1.0)
+        self.assertGreaterEqual(value, 1.0)
+        self.assertGreater(timestamp, t0)
+        self.assertLess(self.hub.age("voltage"), 1.0)
+
+    def test_failed_reads_keep_last_value_and_age(self):
+        source = CountingSource(fail=True)
+        self.hub.add_source("spectrum", source.read, 0.01)
+        self.hub.publish("spectrum", 5.0, timestamp=time.time() - 10.0)
+        self.hub.start()
+        time.sleep(0.05)
+
+        stats = self.hub.stats()["spectrum"]
+        self.assertGreater(stats["errors"], 0)
+        self.assertEqual(self.hub.get_spectrum(), 5.0)
+        self.assertGreater(stats["age_s"], 9.0)
+
+    def test_wait_for_update_times_out(self):
+        self.hub.publish("wavenumbers", [1.0, 2.0, 3.0, 4.0], timestamp=100.0)
+        value, timestamp = self.hub.wait_for_update("wavenumbers", 200.0, timeout=0.02)
+        self.assertEqual(timestamp, 100.0)
+        self.assertEqual(self.hub.get_wavenumbers(), [1.0, 2.0, 3.0, 4.0])
+
+    def test_history_and_interpolation(self):
+        self.hub.add_source("voltage", None, None, initial=0.0)
+        self.hub.add_source("wavenumbers", None, None, initial=[0.0] * 4)
+        for t, v in [(100.0, 1.0), (101.0, 3.0), (102.0, 2.0)]:
+            self.hub.publish("voltage", v, t)
+            self.hub.publish("wavenumbers", [v, 10 * v, 0.0, 0.0], t)
+        self.hub.publish("spectrum", None, 100.0) # Not numeric: cached only
+
+        timestamps, values = self.hub.get_history("voltage")
+        np.testing.assert_array_equal(timestamps, [100.0, 101.0, 102.0])
+        self.assertEqual(len(self.hub.get_history("spectrum")[0]), 0)
+
+        events = np.array([99.0, 100.5, 101.0, 101.75, 105.0])
+        np.testing.assert_allclose(self.hub.interpolate("voltage", events), [1.0, 2.0, 3.0, 2.25, 2.0])
+        np.testing.assert_allclose(self.hub.interpolate("voltage", events, method="previous"),
+                                   [1.0, 1.0, 3.0, 3.0, 2.0])
+        np.testing.assert_allclose(self.hub.interpolate("wavenumbers", events, index=1), [10.0, 20.0, 30.0, 22.5, 20.0])
+
+    def test_interpolation_without_history_uses_cache(self):
+        self.hub.add_source("voltage", None, None, initial=0.5)
+        np.testing.assert_array_equal(self.hub.interpolate("voltage", [1.0, 2.0]), [0.5, 0.5])
+        np.testing.assert_array_equal(self.hub.interpolate("voltage", [1.0], default=4.0), [4.0])
+
+    def test_laser_reads_hub_cache(self):
+        device = MockPIGCSDevice()
+        laser = LaserController(device, MockEpicsClient(device), sensor_hub=self.hub)
+        self.hub.publish("wavenumbers", [123.0, 0.0, 0.0, 0.0])
+        self.assertEqual(laser.get_wavenumber(), 123.0)
+        # Direct read bypasses the cache
+        self.assertAlmostEqual(laser.read_wavenumber(), 16600.0, delta=0.01)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.laser_controller import LaserController
+from src.devices.binary_rpc import BinaryRPCServer, BinaryRPCClient
+from src.simulation.hardware_mocks import MockLaserServerInterface
+
+PARAMS = {"tolerance": 0.05, "step_fine": 0.005, "step_coarse": 0.1,
+          "poll_interval": 0.01, "required_stable_samples": 2}
+
+class RemoteStage:
+    """PIGCSDevice stand-in using the binary transport against a local server."""
+    def __init__(self, client):
+        self.proxy = client
+
+    def qPOS(self, axis=None):
+        return {axis or 1: self.proxy.qPOS(axis or 1)}
+
+    def MOV(self, axis, target):
+        return self.proxy.MOV(axis, float(target))
+
+    def go_to(self, target_wn, params=None, timeout_s=120.0):
+        return self.proxy.call_async("go_to", target_wn, params or {}, timeout_s).result(timeout=timeout_s + 10.0)
+
+    def go_to_abort(self):
+        return self.proxy.go_to_abort()
+
+class TestServerGoTo(unittest.TestCase):
+    def setUp(self):
+        self.interface = MockLaserServerInterface(epics_params={"noise_level": 0.001})
+
+    def test_go_to_settles_and_reports(self):
+        result = self.interface.go_to(16601.0, PARAMS, 20.0)
+        self.assertEqual(result["state"], "settled")
+        self.assertAlmostEqual(result["wavenumber"], 16601.0, delta=0.05)
+        self.assertGreater(result["moves"], 0)
+        self.assertEqual(self.interface.go_to_status()["state"], "settled")
+
+    def test_abort(self):
+        params = dict(PARAMS, step_fine=1e-5) # Far too slow to arrive
+        worker = threading.Thread(target=lambda: setattr(self, "result", self.interface.go_to(16650.0, params, 20.0)))
+        worker.start()
+        time.sleep(0.3)
+        self.assertEqual(self.interface.go_to_status()["state"], "moving")
+        self.interface.go_to_abort()
+        worker.join(timeout=5.0)
+        self.assertEqual(self.result["state"], "aborted")
+
+    def test_client_server_mode_over_binary_rpc(self):
+        server = BinaryRPCServer(self.interface, "127.0.0.1", 0)
+        server.serve_in_background()
+        client = BinaryRPCClient("127.0.0.1", server.server_address[1])
+        try:
+            laser = LaserController(RemoteStage(client), self.interface.epics,
+                                    config=dict(PARAMS, control_mode="server"))
+            laser.set_wavenumber(16601.0)
+            laser.control_thread.join(timeout=20.0)
+            self.assertFalse(laser.is_moving)
+            self.assertAlmostEqual(laser.read_wavenumber(), 16601.0, delta=0.05)
+            self.assertEqual(laser.last_settle["moves"], laser.moves_last_target)
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import random
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.settle_detector import SettleDetector
+from src.control.sensor_hub import SensorHub
+from src.control.laser_controller import LaserController
+from src.simulation.hardware_mocks import MockPIGCSDevice, MockEpicsClient
+
+class TestSettleDetector(unittest.TestCase):
+    def test_quiet_signal_settles_after_min_samples(self):
+        detector = SettleDetector(0.05, min_samples=3)
+        detector.reset(100.0, start_time=0.0)
+        self.assertFalse(detector.add(100.001, 1.0))
+        self.assertFalse(detector.add(99.999, 1.1))
+        self.assertTrue(detector.add(100.000, 1.2))
+
+        metrics = detector.metrics(now=1.2)
+        self.assertAlmostEqual(metrics["time_to_settle_s"], 1.2)
+        self.assertAlmostEqual(metrics["dwell_s"], 0.2)
+        self.assertEqual(metrics["samples"], 3)
+
+    def test_noisy_signal_needs_more_evidence(self):
+        detector = SettleDetector(0.05, min_samples=3, n_sigma=2.0)
+        detector.reset(100.0)
+        # In band, but the spread says a reading could fall outside
+        for wn in (100.04, 99.96, 100.04):
+            self.assertFalse(detector.add(wn))
+
+    def test_leaving_band_restarts(self):
+        detector = SettleDetector(0.05, min_samples=2)
+        detector.reset(100.0)
+        detector.add(100.0)
+        self.assertFalse(detector.add(100.2))
+        self.assertEqual(detector.metrics()["samples"], 0)
+        self.assertFalse(detector.add(100.0))
+        self.assertTrue(detector.add(100.0))
+
+class TestSettleControlLoop(unittest.TestCase):
+    def test_dwell_scales_with_poll_interval(self):
+        random.seed(1)
+        device = MockPIGCSDevice(initialization_params={"move_speed": 1000.0})
+        device.SVO(1, True)
+        epics = MockEpicsClient(device, initialization_params={"noise_level": 0.001})
+        laser = LaserController(device, epics, config={
+            "tolerance": 0.05, "poll_interval": 0.01, "required_stable_samples": 4
+        })
+
+        # Already on target: only the dwell remains, no more fixed 0.5 s sleeps
+        laser.set_wavenumber(epics.caget("wavenumber"))
+        deadline = time.time() + 5.0
+        while laser.is_moving and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertFalse(laser.is_moving)
+        self.assertEqual(laser.last_settle["moves"], 0)
+        self.assertEqual(laser.last_settle["samples"], 4)
+        self.assertLess(laser.last_settle["time_to_settle_s"], 0.5)
+
+    def test_repeated_polls_of_a_frozen_wavemeter_do_not_settle(self):
+        device = MockPIGCSDevice()
+        device.SVO(1, True)
+        hub = SensorHub()
+        reading = [16600.0, 0.0, 0.0, 0.0]
+        hub.add_source("wavenumbers", lambda: list(reading), 0.01, changes_only=True)
+        laser = LaserController(device, MockEpicsClient(device), sensor_hub=hub, config={
+            "tolerance": 0.05, "poll_interval": 0.01, "required_stable_samples": 4
+        })
+        hub.start()
+        try:
+            laser.set_wavenumber(16600.0)
+            time.sleep(0.3)
+            # ~30 polls of one reading are one sample, not a settled laser
+            self.assertTrue(laser.is_moving)
+            self.assertIsNone(laser.last_settle)
+            self.assertGreater(hub.age("wavenumbers"), 0.2)
+
+            # The wavemeter updates again: distinct readings settle it
+            for k in range(1, 6):
+                reading[0] = 16600.0 + k * 1e-4
+                time.sleep(0.03)
+            deadline = time.time() + 2.0
+            while laser.is_moving and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertFalse(laser.is_moving)
+            self.assertEqual(laser.last_settle["samples"], 4)
+        finally:
+            laser.stop()
+            hub.stop()
+
+if __name__ == '__main__':
+    unittest.main()
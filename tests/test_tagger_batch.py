@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.devices.tagger import EVENT_DTYPE, packets_to_batch, flops_to_time
+from src.simulation.sim_tagger import MockTagger
+
+class TestTaggerBatch(unittest.TestCase):
+    def test_packets_to_batch(self):
+        # [packet_number, events, channel, flops since last trigger]
+        packets = [[7, 0, -1, 999], [8, 1, 2, 30000], [8, 2, 2, 45000]]
+        batch = packets_to_batch(packets, read_time=100.0)
+
+        self.assertEqual(batch.dtype, EVENT_DTYPE)
+        np.testing.assert_array_equal(batch['bunch_id'], [7, 8, 8])
+        np.testing.assert_array_equal(batch['channel'], [-1, 2, 2])
+        # Triggers carry no ToF, events are converted from flops to seconds
+        self.assertEqual(batch['tof'][0], 0.0)
+        self.assertAlmostEqual(batch['tof'][1], flops_to_time(30000))
+        self.assertAlmostEqual(batch['timestamp'][2], 100.0 + flops_to_time(45000))
+
+    def test_mock_batch_matches_list_format(self):
+        tagger = MockTagger(initialization_params={"repetition_rate": 1000.0, "mean_events_per_bunch": 5.0})
+        tagger.start_reading()
+        time.sleep(0.02)
+
+        batch, triggers, events = tagger.get_data(as_array=True, return_splitted=True)
+        self.assertEqual(batch.dtype, EVENT_DTYPE)
+        self.assertGreater(len(triggers), 0)
+        self.assertEqual(len(triggers) + len(events), len(batch))
+
+        # Every bunch starts with its trigger and bunch ids never decrease
+        self.assertTrue(np.all(np.diff(batch['bunch_id']) >= 0))
+        first_rows = np.unique(batch['bunch_id'], return_index=True)[1]
+        self.assertTrue(np.all(batch['channel'][first_rows] == -1))
+        self.assertTrue(np.all((events['tof'] > 0) & (events['tof'] < 0.020)))
+
+        time.sleep(0.01)
+        data = tagger.get_data()
+        self.assertTrue(all(len(d) == 5 for d in data))
+        self.assertEqual(data[0][0], batch['bunch_id'][-1] + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.tagger_reader import EventRing, TaggerReader
+from src.control.acquisition_process import SharedEventRing, AcquisitionProcess
+from src.devices.tagger import EVENT_DTYPE
+from src.simulation.sim_tagger import MockTagger
+
+def make_rows(start, n):
+    rows = np.zeros(n, dtype=EVENT_DTYPE)
+    rows['bunch_id'] = np.arange(start, start + n)
+    return rows
+
+class TestEventRing(unittest.TestCase):
+    def test_wraparound_preserves_order(self):
+        ring = EventRing(capacity=8)
+        self.assertEqual(ring.write(make_rows(0, 6)), 6)
+        np.testing.assert_array_equal(ring.read(max_rows=4)['bunch_id'], [0, 1, 2, 3])
+
+        # Wraps around the end of the buffer
+        ring.write(make_rows(6, 5))
+        out = ring.read()
+        np.testing.assert_array_equal(out['bunch_id'], np.arange(4, 11))
+        self.assertEqual(len(ring), 0)
+
+    def test_overflow_is_counted(self):
+        ring = EventRing(capacity=4)
+        ring.write(make_rows(0, 3))
+        self.assertEqual(ring.write(make_rows(3, 3)), 1)
+
+        stats = ring.stats()
+        self.assertEqual(stats["overflow_rows"], 2)
+        self.assertEqual(stats["overflow_batches"], 1)
+        self.assertEqual(stats["high_water"], 4)
+        np.testing.assert_array_equal(ring.read()['bunch_id'], [0, 1, 2, 3])
+
+    def test_read_times_out_empty(self):
+        ring = EventRing(capacity=4)
+        t0 = time.time()
+        self.assertEqual(len(ring.read(timeout=0.05)), 0)
+        self.assertGreaterEqual(time.time() - t0, 0.04)
+
+class TestTaggerReader(unittest.TestCase):
+    def test_reader_drains_mock_tagger(self):
+        tagger = MockTagger(initialization_params={"repetition_rate": 1000.0, "mean_events_per_bunch": 2.0})
+        tagger.start_reading()
+        ring = EventRing(capacity=1 << 16)
+        reader = TaggerReader(tagger, ring)
+        reader.start()
+        time.sleep(0.1)
+        reader.stop()
+
+        rows = ring.read()
+        self.assertEqual(len(rows), reader.rows_read)
+        self.assertGreater(np.count_nonzero(rows['channel'] == -1), 50)
+        self.assertTrue(np.all(np.diff(rows['bunch_id']) >= 0))
+
+class TestAcquisitionProcess(unittest.TestCase):
+    def test_shared_ring_segments(self):
+        ring = SharedEventRing(n_segments=2, segment_rows=4, create=True)
+        try:
+            reader = SharedEventRing(n_segments=2, segment_rows=4, name=ring.name)
+            reader.write_segment(0, make_rows(0, 3))
+            reader.write_segment(1, make_rows(3, 4))
+            self.assertFalse(reader.has_free_segment(2))
+
+            np.testing.assert_array_equal(ring.read_segment(0, 3)['bunch_id'], [0, 1, 2])
+            ring.release(0)
+            self.assertTrue(reader.has_free_segment(2))
+            reader.close()
+        finally:
+            ring.close()
+            ring.unlink()
+
+    def test_process_delivers_blocks(self):
+        acquisition = AcquisitionProcess(
+            simulation_mode=True,
+            tagger_params={"repetition_rate": 1000.0, "mean_events_per_bunch": 2.0},
+            n_segments=8, segment_rows=1024
+        )
+        acquisition.start()
+        try:
+            rows, n_events, n_bunches = [], 0, 0
+            deadline = time.time() + 10.0
+            while time.time() < deadline and n_bunches < 50:
+                block, ev, bu = acquisition.read(timeout=0.1)
+                rows.append(block)
+                n_events += ev
+                n_bunches += bu
+        finally:
+            acquisition.stop()
+
+        rows = np.concatenate(rows)
+        self.assertGreaterEqual(n_bunches, 50)
+        self.assertEqual(n_events, np.count_nonzero(rows['channel'] == 2))
+        self.assertTrue(np.all(np.isin(rows['channel'], [-1, 2])))
+
+    def test_stop_returns_blocks_in_flight(self):
+        acquisition = AcquisitionProcess(
+            simulation_mode=True,
+            tagger_params={"repetition_rate": 1000.0, "mean_events_per_bunch": 2.0},
+            n_segments=64, segment_rows=1024
+        )
+        acquisition.start()
+        time.sleep(0.5) # Blocks are announced but never read
+        rows, n_events, n_bunches = acquisition.stop()
+
+        self.assertGreater(len(rows), 0)
+        self.assertEqual(len(rows), acquisition.rows_received)
+        self.assertEqual(n_events, np.count_nonzero(rows['channel'] == 2))
+        self.assertGreater(n_bunches, 0)
+        self.assertEqual(acquisition.stop()[1], 0) # Already stopped
+
+if __name__ == '__main__':
+    unittest.main()
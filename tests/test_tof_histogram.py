@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.tof_histogram import ToFHistogram
+
+class TestToFHistogram(unittest.TestCase):
+    def test_linear_bins_match_numpy(self):
+        hist = ToFHistogram(n_bins=20, tof_min=0.0, tof_max=0.02)
+        tofs = np.random.uniform(0.0, 0.02, 5000)
+        hist.add(tofs[:2000])
+        hist.add(tofs[2000:])
+
+        expected, _ = np.histogram(tofs, bins=hist.edges)
+        snap = hist.snapshot()
+        np.testing.assert_array_equal(snap['counts'], expected)
+        self.assertEqual(snap['total'], 5000)
+
+    def test_out_of_range_counted(self):
+        hist = ToFHistogram(n_bins=10, tof_min=1e-6, tof_max=1e-2, scale='log')
+        hist.add([1e-7, 2e-6, 5e-4, 0.5, np.nan])
+        snap = hist.snapshot()
+        self.assertEqual(snap['underflow'], 1)
+        self.assertEqual(snap['overflow'], 1)
+        self.assertEqual(snap['counts'].sum(), 2)
+        self.assertEqual(snap['total'], 5)
+
+    def test_per_bin_reset(self):
+        hist = ToFHistogram(n_bins=4, tof_min=0.0, tof_max=4.0)
+        hist.add([0.5, 1.5], scan_bin_index=0)
+        hist.add([2.5], scan_bin_index=1)
+        np.testing.assert_array_equal(hist.snapshot(per_bin=True)['counts'], [0, 0, 1, 0])
+        np.testing.assert_array_equal(hist.snapshot()['counts'], [1, 1, 1, 0])
+
+        # Snapshots are copies
+        snap = hist.snapshot()
+        snap['counts'][:] = 0
+        self.assertEqual(hist.snapshot()['counts'].sum(), 3)
+
+        hist.reset()
+        self.assertEqual(hist.snapshot()['total'], 0)
+        self.assertIsNone(hist.snapshot()['scan_bin_index'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.control.wavenumber_model import WavenumberModel
+from src.control.laser_controller import LaserController
+from src.simulation.hardware_mocks import MockPIGCSDevice, MockEpicsClient
+
+def stage_wn(position, direction):
+    """Linear stage with backlash: 100 cm^-1/mm, 0.2 cm^-1 lower when approached from above."""
+    return 16600.0 + 100.0 * position - (0.2 if direction < 0 else 0.0)
+
+class TestWavenumberModel(unittest.TestCase):
+    def test_no_prediction_without_data(self):
+        model = WavenumberModel()
+        self.assertIsNone(model.predict_position(0.0, 16600.0, 16610.0, 0))
+        model.observe(0.0, 16600.0, 1)
+        self.assertIsNone(model.predict_position(0.0, 16600.0, 16610.0, 1))
+
+    def test_secant_hits_linear_target(self):
+        model = WavenumberModel(max_jump=10.0)
+        for position in (0.0, 0.01):
+            model.observe(position, stage_wn(position, 1), 1)
+        predicted = model.predict_position(0.01, stage_wn(0.01, 1), 16650.0, 1)
+        self.assertAlmostEqual(predicted, 0.5, places=6)
+
+    def test_max_jump_limits_extrapolation(self):
+        model = WavenumberModel(max_jump=0.1, initial_slope=100.0)
+        self.assertAlmostEqual(model.predict_position(0.0, 16600.0, 16700.0, 1), 0.1)
+
+    def test_reversal_uses_line_of_new_direction(self):
+        model = WavenumberModel(max_jump=10.0)
+        for position in (0.0, 0.1, 0.2):
+            model.observe(position, stage_wn(position, 1), 1)
+        for position in (0.5, 0.4):
+            model.observe(position, stage_wn(position, -1), -1)
+        for position in (0.45, 0.5):
+            model.observe(position, stage_wn(position, 1), 1)
+
+        # Going down again from 0.5: the downward line includes the backlash
+        predicted = model.predict_position(0.5, stage_wn(0.5, 1), 16630.0, 1)
+        self.assertAlmostEqual(stage_wn(predicted, -1), 16630.0, places=6)
+
+class TestModelControlLoop(unittest.TestCase):
+    def test_model_mode_converges_in_few_moves(self):
+        device = MockPIGCSDevice(initialization_params={"move_speed": 1000.0})
+        device.SVO(1, True)
+        epics = MockEpicsClient(device, initialization_params={"noise_level": 0.0})
+        laser = LaserController(device, epics, config={
+            "control_mode": "model", "tolerance": 0.01, "required_stable_samples": 1,
+            "model_initial_slope": 80.0, "model_max_jump": 5.0
+        })
+
+        laser.set_wavenumber(16620.0)
+        deadline = time.time() + 20.0
+        while laser.is_moving and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertFalse(laser.is_moving)
+        self.assertAlmostEqual(laser.read_wavenumber(), 16620.0, delta=0.01)
+        self.assertLessEqual(laser.moves_last_target, 5)
+
+if __name__ == '__main__':
+    unittest.main()